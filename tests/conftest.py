@@ -0,0 +1,5 @@
+import os
+import sys
+
+# 단일 스크립트(utm_log_sender.py)를 테스트에서 import할 수 있도록 저장소 루트를 경로에 추가
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
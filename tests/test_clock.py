@@ -0,0 +1,43 @@
+import json
+import re
+from datetime import datetime
+
+import pytest
+
+import utm_log_sender as uls
+
+MICROSECONDS = r'\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d\.\d{6}'
+
+
+def test_default_iso_time_matches_isoformat():
+    clock = uls.CachedClock()
+    before = datetime.now()
+    value = clock.iso_time()
+    after = datetime.now()
+    assert re.fullmatch(MICROSECONDS, value)
+    assert before <= datetime.fromisoformat(value) <= after  # 캐시된 tick이 아닌 현재 마이크로초
+
+
+def test_reduced_precision_is_opt_in():
+    assert re.fullmatch(r'\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d\.\d{3}', uls.CachedClock(timespec='milliseconds').iso_time())
+    assert re.fullmatch(r'\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d', uls.CachedClock(1.0, 'seconds').iso_time())
+    with pytest.raises(ValueError):
+        uls.CachedClock(timespec='nanoseconds')
+    with pytest.raises(ValueError):
+        uls.CachedClock(0)
+
+
+def test_template_and_dict_timestamps_share_width():
+    sender = uls.UTMLogSender('127.0.0.1', 9)
+    assert re.fullmatch(MICROSECONDS, sender.generate_utm_event()['timestamp'])
+    datagram = uls.TemplateEventEncoder('host1').encode_batch(1)[0]
+    assert re.fullmatch(MICROSECONDS, json.loads(datagram.split(b': ', 1)[1])['timestamp'])
+
+
+def test_tick_caches_fields_per_formatter_class():
+    clock = uls.CachedClock(3600)
+    formatter = uls.Rfc5424Formatter('host1', clock=clock)
+    fields = clock.fields(formatter)
+    assert clock.fields(uls.Rfc5424Formatter('host2', clock=clock)) is fields
+    assert clock.now().second == clock.now().microsecond == 0  # tick 시작 시각으로 내림
+    assert clock.syslog_time() == clock.now().strftime("%b %d %H:%M:%S").encode()
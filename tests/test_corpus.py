@@ -0,0 +1,69 @@
+import pytest
+
+import utm_log_sender as uls
+
+
+def test_round_trip_and_timestamp_offsets(tmp_path):
+    path = str(tmp_path / 'corpus.bin')
+    rfc3164 = b'<134>Jan 02 03:04:05 host: {"a": 1}\n'
+    rfc5424 = b'<134>1 2024-01-02T03:04:05.000000+00:00 host utm-sender - - -\n'
+    plain = b'no priority\n'
+    assert uls.ReplayCorpus.write(path, [[rfc3164, rfc5424], [], [plain]]) == \
+        (3, len(rfc3164) + len(rfc5424) + len(plain))
+    
+    corpus = uls.ReplayCorpus(path)
+    try:
+        assert len(corpus) == 3
+        assert corpus.total_bytes == len(rfc3164) + len(rfc5424) + len(plain)
+        records = [bytes(corpus.view[offset:offset + length]) for offset, length in zip(corpus.offsets, corpus.lengths)]
+        assert records == [rfc3164, rfc5424, plain]
+        # RFC 3164 타임스탬프가 있는 레코드만 갱신 대상
+        assert corpus.timestamp_offsets[0] == corpus.offsets[0] + len(b'<134>')
+        assert list(corpus.timestamp_offsets[1:]) == [0, 0]
+        
+        corpus.rewrite_timestamps(0, len(corpus), b'Dec 31 23:59:59')
+        records = [bytes(corpus.view[offset:offset + length]) for offset, length in zip(corpus.offsets, corpus.lengths)]
+        assert records == [b'<134>Dec 31 23:59:59 host: {"a": 1}\n', rfc5424, plain]
+    finally:
+        corpus.close()
+    
+    # ACCESS_COPY 매핑이므로 원본 파일은 그대로
+    corpus = uls.ReplayCorpus(path)
+    try:
+        assert bytes(corpus.view[corpus.offsets[0]:corpus.offsets[0] + corpus.lengths[0]]) == rfc3164
+    finally:
+        corpus.close()
+
+
+def test_empty_corpus(tmp_path):
+    path = str(tmp_path / 'empty.bin')
+    assert uls.ReplayCorpus.write(path, []) == (0, 0)
+    corpus = uls.ReplayCorpus(path)
+    try:
+        assert len(corpus) == 0
+        assert corpus.total_bytes == 0
+    finally:
+        corpus.close()
+
+
+def test_rejects_foreign_file(tmp_path):
+    path = tmp_path / 'other.bin'
+    path.write_bytes(b'not a corpus file at all')
+    with pytest.raises(ValueError):
+        uls.ReplayCorpus(str(path))
+
+
+def test_generate_corpus_matches_sequence_and_count(tmp_path):
+    path = str(tmp_path / 'generated.bin')
+    sender = uls.UTMLogSender('127.0.0.1', 9, generator='template', sequence=True, seed=7)
+    sender.generate_corpus(path, 2500)
+    corpus = uls.ReplayCorpus(path)
+    try:
+        assert len(corpus) == 2500
+        for index in (0, 1, 2499):
+            offset, length = corpus.offsets[index], corpus.lengths[index]
+            record = bytes(corpus.view[offset:offset + length])
+            assert record.startswith(b'<') and record.endswith(b'\n')
+            assert uls.SequenceStamper.FIELD.search(record).groups() == (b'corpus', b'%d' % index)
+    finally:
+        corpus.close()
@@ -0,0 +1,111 @@
+import json
+import socket
+import threading
+
+import pytest
+
+import utm_log_sender as uls
+
+
+@pytest.fixture
+def channels():
+    left, right = socket.socketpair()
+    coordinator, agent = uls.ControlChannel(left), uls.ControlChannel(right)
+    yield coordinator, agent
+    coordinator.close()
+    agent.close()
+
+
+def test_control_channel_json_lines(channels):
+    coordinator, agent = channels
+    coordinator.send('hello', version=1)
+    coordinator.send('plan', run={'count': 10}, note='한글')
+    assert agent.receive() == {'type': 'hello', 'version': 1}
+    assert agent.expect('plan') == {'type': 'plan', 'run': {'count': 10}, 'note': '한글'}
+
+
+def test_control_channel_unexpected_message(channels):
+    coordinator, agent = channels
+    coordinator.send('stats', second=1)
+    with pytest.raises(ValueError):
+        agent.expect('ready')
+    coordinator.socket.shutdown(socket.SHUT_WR)
+    assert agent.receive() is None
+    with pytest.raises(ValueError):
+        agent.expect('plan')
+
+
+def test_agent_link_timeline():
+    link = uls._AgentLink(uls.Destination('127.0.0.1', 1), None, {'hostname': 'a', 'cpus': 2}, 0.001, 0.0)
+    assert link.at(1) == (0, 0, 0)
+    link.timeline += [(10, 100, 0), (25, 250, 1)]
+    assert link.at(0) == (0, 0, 0)
+    assert link.at(2) == (25, 250, 1)
+    assert link.at(5) == (25, 250, 1)  # 보고가 끝난 에이전트는 마지막 값 유지
+
+
+def test_coordinator_runs_plan_on_local_agents(tmp_path):
+    sink = uls.UDPSink('127.0.0.1', 0)
+    servers = [socket.create_server(('127.0.0.1', 0)) for _ in range(2)]
+    
+    def serve(server):
+        connection, _ = server.accept()
+        channel = uls.ControlChannel(connection)
+        try:
+            uls._serve_coordinator(channel, token='secret')
+        finally:
+            channel.close()
+    
+    agents = [threading.Thread(target=serve, args=(server,), daemon=True) for server in servers]
+    for agent in agents:
+        agent.start()
+    report = tmp_path / 'report.json'
+    try:
+        coordinator = uls.UTMLogSender(*sink.address, generator='template', sequence=True)
+        weights = [uls.Destination(*server.getsockname(), weight) for server, weight in zip(servers, (3, 1))]
+        coordinator.coordinate_agents(weights, count=1001, start_delay=0.2, report_file=str(report), token='secret')
+        for agent in agents:
+            agent.join(timeout=10)
+        received = 0
+        for _ in range(100):
+            received += sink.receive(timeout=0.05)
+            if received >= 1001:
+                break
+    finally:
+        for server in servers:
+            server.close()
+        sink.socket.close()
+    
+    result = json.loads(report.read_text(encoding='utf-8'))
+    assert [agent['count'] for agent in result['agents']] == [751, 250]  # 가중치 비율, 나머지는 앞에서부터
+    assert [agent['packets'] for agent in result['agents']] == [751, 250]
+    assert result['total']['packets'] == 1001
+    assert received == 1001
+    assert sink.stats()['sequence_gaps'] == 0
+
+
+@pytest.mark.parametrize('token', [None, 'wrong'])
+def test_agent_rejects_coordinator_without_token(channels, token):
+    coordinator, agent = channels
+    coordinator.send('hello', version=1, token=token)
+    with pytest.raises(ValueError):
+        uls._serve_coordinator(agent, token='secret')
+    assert coordinator.expect('error')['message']
+
+
+def test_agent_ignores_unknown_plan_options(channels, monkeypatch):
+    coordinator, agent = channels
+    created = {}
+    
+    class Sender:
+        def __init__(self, **options):
+            created.update(options)
+            raise ValueError("stop")
+    
+    monkeypatch.setattr(uls, 'UTMLogSender', Sender)
+    coordinator.send('hello', version=1)
+    coordinator.send('plan', start_at=0, hostname='h', run={},
+                     options={'target_port': 6123, 'tls_ca': '/etc/shadow', 'profile_interval': 0.001, 'evil': 1})
+    with pytest.raises(ValueError):
+        uls._serve_coordinator(agent, tls_ca='agent-ca.pem')
+    assert created == {'target_port': 6123, 'tls_ca': 'agent-ca.pem'}
@@ -0,0 +1,63 @@
+import json
+
+import pytest
+
+import utm_log_sender as uls
+
+
+def events(sender: uls.UTMLogSender, count: int, hostname: str = None):
+    """인코딩된 rfc3164-json 데이터그램을 시각 필드를 뺀 이벤트 dict로 되돌립니다."""
+    decoded = []
+    for datagram in sender.encode_logs(count, hostname):
+        event = json.loads(datagram.split(b': ', 1)[1])
+        event.pop('timestamp')
+        decoded.append(event)
+    return decoded
+
+
+def generator_modes():
+    modes = ['dict', 'template', 'session']
+    try:
+        import numpy  # noqa: F401
+        modes.append('numpy')
+    except ImportError:
+        pass
+    return modes
+
+
+@pytest.mark.parametrize('generator', generator_modes())
+def test_seed_makes_streams_reproducible(generator):
+    first = events(uls.UTMLogSender('127.0.0.1', 9, generator=generator, seed=42), 300)
+    second = events(uls.UTMLogSender('127.0.0.1', 9, generator=generator, seed=42), 300)
+    assert first == second
+    other = events(uls.UTMLogSender('127.0.0.1', 9, generator=generator, seed=43), 300)
+    assert first != other
+
+
+@pytest.mark.parametrize('generator', generator_modes())
+def test_workers_get_independent_streams(generator):
+    sender = uls.UTMLogSender('127.0.0.1', 9, generator=generator, seed=42)
+    assert events(sender, 100, 'worker1') != events(sender, 100, 'worker2')
+
+
+@pytest.mark.parametrize('generator', generator_modes())
+def test_event_fields_are_in_range(generator):
+    sender = uls.UTMLogSender('127.0.0.1', 9, generator=generator, seed=1)
+    for event in events(sender, 2000):
+        assert event['event_type'] in uls.EVENT_TYPES
+        assert 1024 <= event['source_port'] <= 65535
+        assert event['threat_level'] in uls.SYSLOG_SEVERITIES
+        assert event['user'].startswith('user_') and event['session_id'].startswith('sess_')
+        assert 100 <= event['bytes_sent'] <= 1000000
+        assert event['message'] == (f"UTM event: {event['event_type']} from {event['source_ip']} "
+                                    f"to {event['destination_ip']}")
+
+
+# session 모드는 이벤트 종류가 세션 시나리오를 따르므로 가중치를 무시함
+@pytest.mark.parametrize('generator', [mode for mode in generator_modes() if mode != 'session'])
+def test_event_weights_restrict_event_types(generator):
+    sender = uls.UTMLogSender('127.0.0.1', 9, generator=generator, seed=1)
+    sender.set_event_weights({'ips_alert': 3, 'web_filter': 1})
+    types = [event['event_type'] for event in events(sender, 2000)]
+    assert set(types) == {'ips_alert', 'web_filter'}
+    assert 0.65 < types.count('ips_alert') / len(types) < 0.85
@@ -0,0 +1,141 @@
+import json
+import socket
+
+import pytest
+
+import utm_log_sender as uls
+
+
+def body(datagram: bytes) -> bytes:
+    """RFC 3164 헤더("<PRI>Mmm dd HH:MM:SS host: ")를 뗀 본문"""
+    return datagram.split(b': ', 1)[1]
+
+
+@pytest.fixture
+def sender():
+    receiver = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    receiver.bind(('127.0.0.1', 0))
+    receiver.settimeout(1.0)
+    sender = uls.UTMLogSender('127.0.0.1', receiver.getsockname()[1])
+    sender.connect()
+    yield sender, receiver
+    sender.disconnect()
+    receiver.close()
+
+
+def test_registry_names():
+    assert list(uls.FORMATTERS) == ['rfc3164-json', 'rfc5424', 'cef', 'leef', 'kv']
+    for name, formatter in uls.FORMATTERS.items():
+        assert formatter.name == name
+
+
+@pytest.mark.parametrize('name', list(uls.FORMATTERS))
+def test_template_output_is_one_line_per_event(name):
+    formatter = uls.FORMATTERS[name]('host1')
+    encoder = uls.TemplateEventEncoder('host1', formatter=formatter)
+    for datagram in encoder.encode_batch(200):
+        assert datagram.startswith(b'<')
+        assert datagram.endswith(b'\n') and datagram.count(b'\n') == 1
+        assert b'%' not in datagram  # 채우지 않은 템플릿 자리가 없어야 함
+
+
+def test_rfc3164_template_matches_json_dumps():
+    sender = uls.UTMLogSender('127.0.0.1', 9)
+    formatter = sender.get_formatter()
+    events = list(sender.generate_utm_event_generator(50, sender.get_rng()))
+    for event, datagram in zip(events, formatter.encode_events(events)):
+        decoded = json.loads(body(datagram))
+        assert list(decoded) == list(event)
+        decoded.pop('timestamp')
+        event = dict(event)
+        event.pop('timestamp')
+        assert decoded == event
+        priority = int(datagram[1:datagram.index(b'>')])
+        assert priority == formatter.facility * 8 + uls.SYSLOG_SEVERITIES[event['threat_level']]
+
+
+def test_rfc3164_record_keeps_every_key():
+    formatter = uls.Rfc3164JsonFormatter('host1')
+    record = {'timestamp': 'caller-time', 'message': 'caller message', 'note': 'hello',
+              'nested': {'a': [1, None]}, 'user': 'alice', 'count': 3}
+    assert json.loads(body(formatter.encode_record(record))) == record
+
+
+@pytest.mark.parametrize('name', list(uls.FORMATTERS))
+@pytest.mark.parametrize('record', [
+    {},
+    {'event_type': 'custom', 'note': 'hello'},
+    {'user': 'alice', 'threat_level': 42, 1: None, 'flag': True},
+    {'message': 'line1\nline2', 'weird key!': 'value'},
+])
+def test_record_with_odd_dicts_is_single_line(name, record):
+    datagram = uls.FORMATTERS[name]('host1').encode_record(record)
+    assert datagram.startswith(b'<134>')  # local0 + informational (threat_level 없음/알 수 없음)
+    assert datagram.endswith(b'\n') and datagram.count(b'\n') == 1
+
+
+def test_rfc5424_record_escapes_sd_params():
+    datagram = uls.Rfc5424Formatter('host1').encode_record(
+        {'event_type': 'custom event', 'path': 'C:\\temp "x" ]', 'message': 'free text'})
+    text = datagram.decode()
+    assert ' utm-sender - custom_event [utm@32473 ' in text
+    assert 'path="C:\\\\temp \\"x\\" \\]"' in text
+    assert text.endswith('] free text\n')
+    assert uls.Rfc5424Formatter('host1').encode_record({}).endswith(b' utm-sender - - -\n')
+
+
+def test_cef_record_escapes_header_and_extension():
+    datagram = uls.CefFormatter('host1').encode_record(
+        {'event_type': 'a|b', 'threat_level': 'high', 'query': 'x=1\\y'})
+    text = datagram.decode()
+    assert 'CEF:0|GamjaPower|UTM Log Sender|2.0|a\\|b|a\\|b|8|' in text
+    assert 'query=x\\=1\\\\y' in text
+    assert '|Unknown|' in uls.CefFormatter('host1').encode_record({'a': 1}).decode()
+
+
+def test_leef_record_escapes_tabs():
+    text = uls.LeefFormatter('host1').encode_record({'event_type': 'custom', 'value': 'a\tb'}).decode()
+    assert text.endswith('|custom|event_type=custom\tvalue=a\\tb\n')
+
+
+def test_kv_record_quotes_strings():
+    text = uls.KeyValueFormatter('host1').encode_record({'count': 3, 'name': 'say "hi"'}).decode()
+    assert text.endswith(' count=3 name="say \\"hi\\""\n')
+
+
+@pytest.mark.parametrize('name', list(uls.FORMATTERS))
+def test_sequence_field_keeps_format_parseable(name):
+    formatter = uls.FORMATTERS[name]('host1')
+    stamper = uls.SequenceStamper('127.0.0.1:514', formatter)
+    encoder = uls.TemplateEventEncoder('host1', formatter=formatter)
+    for expected, datagram in enumerate(stamper.stamp_many(encoder.encode_batch(3))):
+        assert datagram.endswith(b'\n') and datagram.count(b'\n') == 1
+        match = [m for m in uls.SequenceStamper.FIELD.finditer(datagram)][-1]
+        assert match.groups() == (b'127.0.0.1:514', b'%d' % expected)
+        if name == 'rfc3164-json':
+            assert json.loads(body(datagram))['seq'] == f'127.0.0.1:514:{expected}'
+        elif name == 'rfc5424':
+            assert b'[utm@32473 seq="127.0.0.1:514:%d" ' % expected in datagram
+
+
+def test_sequence_field_in_empty_json_object():
+    stamper = uls.SequenceStamper('main', uls.Rfc3164JsonFormatter('host1'))
+    datagram = stamper.stamp(uls.Rfc3164JsonFormatter('host1').encode_record({}))
+    assert json.loads(body(datagram)) == {'seq': 'main:0'}
+
+
+def test_send_log_accepts_arbitrary_dict(sender):
+    sender, receiver = sender
+    assert sender.send_log({'event_type': 'custom', 'note': 'hello'})
+    assert sender.send_log({'user': 'alice'})
+    assert json.loads(body(receiver.recv(65536))) == {'event_type': 'custom', 'note': 'hello'}
+    assert json.loads(body(receiver.recv(65536))) == {'user': 'alice'}
+
+
+def test_send_log_batch_drops_only_bad_records(sender):
+    sender, receiver = sender
+    valid = sender.generate_utm_event()
+    assert sender.send_log_batch([valid, {'a': 1}, None, 5]) == 2
+    sender.transmitter.flush()
+    assert json.loads(body(receiver.recv(65536))) == valid
+    assert json.loads(body(receiver.recv(65536))) == {'a': 1}
@@ -0,0 +1,134 @@
+import json
+import random
+import subprocess
+import sys
+
+import pytest
+
+import utm_log_sender as uls
+
+SCRIPT = uls.__file__
+
+
+@pytest.mark.parametrize('spec, expected', [
+    ('1400', {'distribution': 'fixed', 'size': 1400}),
+    ('200-8192', {'distribution': 'uniform', 'min': 200, 'max': 8192}),
+    ('fixed:512', {'distribution': 'fixed', 'size': 512}),
+    ('uniform:200:1400', {'distribution': 'uniform', 'min': 200, 'max': 1400}),
+    ('normal:600', {'distribution': 'normal', 'mean': 600.0}),
+    ('normal:600:150:300:900', {'distribution': 'normal', 'mean': 600.0, 'stddev': 150.0, 'min': 300, 'max': 900}),
+])
+def test_parse(spec, expected):
+    assert uls.PayloadSizer.parse(spec) == expected
+
+
+@pytest.mark.parametrize('spec', ['', 'abc', 'normal:1:2:3', 'uniform:1', '-5', 'gamma:1'])
+def test_parse_invalid(spec):
+    with pytest.raises(ValueError):
+        uls.PayloadSizer.parse(spec)
+
+
+@pytest.mark.parametrize('spec', [
+    {'distribution': 'uniform', 'min': 8192, 'max': 200},  # 뒤집힌 범위
+    {'distribution': 'fixed', 'size': 70000},  # UDP 최대 페이로드 초과
+    {'distribution': 'uniform', 'min': 0, 'max': 65508},
+    {'distribution': 'normal', 'mean': 600, 'min': 900, 'max': 300},
+    {'distribution': 'fixed', 'size': -1},
+    {'distribution': 'fixed'},
+    {'distribution': 'zipf', 'size': 10},
+])
+def test_invalid_distributions(spec):
+    with pytest.raises(ValueError):
+        uls.PayloadSizer.from_dict(spec)
+
+
+def test_limit_for_packed_datagrams():
+    limit = uls.DatagramPacker.for_mtu(1500).max_size
+    assert limit == 1472
+    assert uls.PayloadSizer.from_dict({'distribution': 'fixed', 'size': 1472}, limit=limit).size == 1472
+    with pytest.raises(ValueError):
+        uls.PayloadSizer.from_dict({'distribution': 'fixed', 'size': 1473}, limit=limit)
+    sizer = uls.PayloadSizer.from_dict({'distribution': 'normal', 'mean': 1400, 'stddev': 500}, limit=limit)
+    assert max(sizer.draw_sizes(1000)) <= limit  # max를 생략하면 한도에서 자름
+
+
+def test_boundary_sizes_are_accepted():
+    assert uls.PayloadSizer.from_dict({'distribution': 'fixed', 'size': uls.PayloadSizer.MAX_DATAGRAM}).size == 65507
+    sizer = uls.PayloadSizer.from_dict({'distribution': 'uniform', 'min': 500, 'max': 500}, rng=random.Random(1))
+    assert set(sizer.draw_sizes(10)) == {500}
+
+
+@pytest.mark.parametrize('spec, low, high', [
+    ({'distribution': 'fixed', 'size': 1400}, 1400, 1400),
+    ({'distribution': 'uniform', 'min': 300, 'max': 1200}, 300, 1200),
+    ({'distribution': 'normal', 'mean': 800, 'stddev': 200, 'min': 400, 'max': 1200}, 400, 1200),
+])
+def test_apply_hits_target_sizes_and_keeps_json(spec, low, high):
+    sizer = uls.PayloadSizer.from_dict(spec, rng=random.Random(3))
+    formatter = uls.Rfc3164JsonFormatter('host1')
+    datagrams = uls.TemplateEventEncoder('host1', rng=random.Random(3), formatter=formatter).encode_batch(200)
+    for original, data in zip(datagrams, sizer.apply(datagrams, formatter)):
+        # 목표보다 긴 데이터그램은 그대로, 나머지는 분포 범위 안의 크기로 채움
+        assert data == original if len(original) >= high else low <= len(data) <= high
+        assert data.endswith(b'"}\n')
+        body = json.loads(data.split(b': ', 1)[1])
+        assert body['message'].startswith('UTM event: ')
+        assert data == original or set(body['pad']) <= set('abcdefghijklmnopqrstuvwxyz ')
+
+
+@pytest.mark.parametrize('record', [{'a': 'x', 'n': 3}, {'l': [1, 2]}, {'nested': {'k': None}}, {}])
+def test_apply_keeps_encoded_records_parseable(record):
+    sizer = uls.PayloadSizer.from_dict({'distribution': 'fixed', 'size': 300}, rng=random.Random(5))
+    formatter = uls.Rfc3164JsonFormatter('host1')
+    data = sizer.apply([formatter.encode_record(record)], formatter)[0]
+    assert len(data) == 300
+    body = json.loads(data.split(b': ', 1)[1])
+    assert set(body.pop('pad')) <= set('abcdefghijklmnopqrstuvwxyz ')
+    assert body == record
+
+
+@pytest.mark.parametrize('name', sorted(uls.FORMATTERS))
+def test_apply_pads_through_formatter_field(name):
+    formatter = uls.FORMATTERS[name]('host1')
+    original = formatter.encode_record({'a': 'x', 'n': 3})
+    data = uls.PayloadSizer.from_dict({'distribution': 'fixed', 'size': 400}, rng=random.Random(5)).apply(
+        [original], formatter)[0]
+    assert len(data) == 400 and data.endswith(b'\n')
+    # 채움 필드는 원래 레코드 뒤에 붙고 본문은 바뀌지 않음
+    assert data.startswith(original.rstrip(b'}\n'))
+    assert b'pad' in data[len(original) - 3:]
+
+
+def test_apply_never_truncates():
+    sizer = uls.PayloadSizer.from_dict({'distribution': 'fixed', 'size': 10})
+    data = b'<134>Jan 02 03:04:05 host: a long message\n'
+    assert sizer.apply([data]) == [data]
+
+
+def test_packer_boundaries():
+    packer = uls.DatagramPacker(100)
+    exact = [b'a' * 49 + b'\n', b'b' * 49 + b'\n']
+    assert packer.pack(exact) == ([exact[0] + exact[1]], [2])
+    packed, counts = packer.pack(exact + [b'c\n'])
+    assert counts == [2, 1]
+    oversized = b'x' * 150 + b'\n'
+    packed, counts = packer.pack([b'a\n', oversized, b'b\n'])
+    assert packed == [b'a\n', oversized, b'b\n']  # 한도보다 긴 메시지는 단독 전송
+    assert counts == [1, 1, 1]
+    assert packer.pack([]) == ([], [])
+    assert uls.DatagramPacker.for_mtu(1500, 40).max_size == 1432
+    with pytest.raises(ValueError):
+        uls.DatagramPacker(0)
+
+
+@pytest.mark.parametrize('args', [
+    ['--payload-size', '8192-200'],
+    ['--payload-size', 'fixed:70000'],
+    ['--payload-size', '1500', '--pack'],
+    ['--payload-size', '65500', '--sequence'],
+])
+def test_cli_rejects_invalid_sizes(args):
+    result = subprocess.run([sys.executable, SCRIPT, '--host', '127.0.0.1', '--port', '9', '--count', '1',
+                             '--max-speed'] + args, capture_output=True, text=True, timeout=60)
+    assert result.returncode == 1
+    assert '❌ 크기 분포' in result.stdout
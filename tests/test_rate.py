@@ -0,0 +1,112 @@
+import time
+
+import pytest
+
+import utm_log_sender as uls
+
+
+def test_constant_profile():
+    profile = uls.RateProfile.constant(500)
+    assert profile.rate_at(0) == profile.rate_at(3600) == 500
+
+
+def test_linear_profile_with_end_and_duration():
+    profile = uls.RateProfile.from_dict({'type': 'linear', 'start': 1000, 'end': 5000, 'duration': 100})
+    assert profile.slope == pytest.approx(40.0)
+    assert profile.rate_at(0) == 1000
+    assert profile.rate_at(50) == pytest.approx(3000)
+    assert profile.rate_at(500) == pytest.approx(5000)  # duration 이후에는 end 유지
+
+
+def test_linear_profile_can_ramp_down_but_not_below_zero():
+    profile = uls.RateProfile('linear', start=100, slope=-10)
+    assert profile.rate_at(5) == pytest.approx(50)
+    assert profile.rate_at(20) == 0.0
+
+
+def test_step_profile_accepts_unsorted_steps():
+    profile = uls.RateProfile.from_dict({'type': 'step', 'steps': [{'at': 60, 'rate': 5000}, [0, 1000], [30, 2000]]})
+    assert [profile.rate_at(t) for t in (0, 29.9, 30, 59, 60, 1000)] == [1000, 1000, 2000, 2000, 5000, 5000]
+
+
+def test_exponential_profile_with_max():
+    profile = uls.RateProfile.from_dict({'type': 'exponential', 'start': 100, 'factor': 2, 'interval': 10, 'max': 500})
+    assert profile.rate_at(0) == pytest.approx(100)
+    assert profile.rate_at(10) == pytest.approx(200)
+    assert profile.rate_at(20) == pytest.approx(400)
+    assert profile.rate_at(30) == 500
+
+
+def test_exponential_profile_does_not_overflow():
+    profile = uls.RateProfile.from_dict({'type': 'exponential', 'start': 100, 'factor': 2, 'interval': 1, 'max': 500})
+    assert profile.rate_at(1e6) == 500
+
+
+def test_from_increase_rate_matches_legacy_schedule():
+    assert uls.RateProfile.from_increase_rate(0.1, 1.0).rate_at(600) == pytest.approx(10)
+    profile = uls.RateProfile.from_increase_rate(0.1, 2.0)
+    # 기존 동작: EPS = (1 / delay) * (1 + (increase_rate - 1) * 경과분)
+    assert profile.rate_at(60) == pytest.approx(20)
+    assert profile.rate_at(120) == pytest.approx(30)
+
+
+@pytest.mark.parametrize('spec', [
+    {'type': 'sawtooth'},
+    {'type': 'linear', 'start': 100},
+    {'type': 'linear', 'start': 100, 'end': 200, 'duration': 0},
+    {'type': 'linear', 'start': 100, 'end': 200, 'duration': -10},
+    {'type': 'linear', 'start': 100, 'end': -200, 'duration': 10},
+    {'type': 'constant', 'rate': -1},
+    {'type': 'constant', 'rate': 100, 'max': -1},
+    {'type': 'step', 'steps': [[0, 100], [10, -5]]},
+    {'type': 'step', 'steps': [[-1, 100]]},
+    {'type': 'exponential', 'start': 100, 'interval': 0},
+    {'type': 'exponential', 'start': 100, 'interval': -60},
+    {'type': 'exponential', 'start': 100, 'factor': 0},
+    {'type': 'exponential', 'start': 100, 'factor': -2},
+    {'type': 'exponential', 'start': -100},
+])
+def test_invalid_profiles(spec):
+    with pytest.raises(ValueError):
+        uls.RateProfile.from_dict(spec)
+
+
+def test_token_bucket_burst_and_capacity():
+    bucket = uls.TokenBucket(10000, burst_interval=0.01)
+    assert bucket.burst == 100
+    assert bucket.capacity == 400
+    bucket.set_rate(10)
+    assert bucket.burst == 1  # 낮은 속도에서도 최소 1개씩 전송
+    bucket.set_rate(-5)
+    assert bucket.rate == 0.0
+
+
+def test_token_bucket_caps_accumulated_tokens():
+    bucket = uls.TokenBucket(10000)
+    bucket.last -= 10  # 10초 동안 쉬었어도 4 burst까지만 적립
+    assert bucket.take(10 ** 6) == bucket.capacity
+    assert bucket.take(10 ** 6) <= 1
+
+
+def test_token_bucket_wait_time():
+    bucket = uls.TokenBucket(1000)
+    bucket.tokens = 0.0
+    bucket.last = time.perf_counter()
+    assert 0 < bucket.wait_time(10) <= 10 / 1000
+    bucket.set_rate(0)
+    assert bucket.wait_time(10) == uls.TokenBucket.MAX_WAIT
+    bucket.set_rate(1000)
+    bucket.tokens = bucket.capacity
+    assert bucket.wait_time(10) == 0.0
+    assert bucket.take(3) == 3
+
+
+def test_token_bucket_holds_target_rate():
+    rate = 20000
+    bucket = uls.TokenBucket(rate)
+    start = time.perf_counter()
+    sent = 0
+    while time.perf_counter() - start < 0.3:
+        sent += bucket.acquire(1000)
+    elapsed = time.perf_counter() - start
+    assert sent == pytest.approx(rate * elapsed, rel=0.1)
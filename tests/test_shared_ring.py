@@ -0,0 +1,98 @@
+import threading
+
+import pytest
+
+import utm_log_sender as uls
+
+
+@pytest.fixture
+def ring():
+    ring = uls.SharedRing(uls.SharedRing.MIN_SIZE)
+    yield ring
+    ring.close()
+
+
+def take(ring: uls.SharedRing):
+    """다음 레코드의 데이터그램 목록을 꺼내고 공간을 돌려줍니다."""
+    record = ring.get()
+    if record is None:
+        return None
+    offset, lengths, size = record
+    datagrams = []
+    for length in lengths:
+        datagrams.append(bytes(ring.buf[offset:offset + length]))
+        offset += length
+    ring.release(size, len(lengths))
+    return datagrams
+
+
+def test_put_get_round_trip(ring):
+    datagrams = [b'<134>message %d\n' % i for i in range(10)]
+    assert ring.put(datagrams)
+    assert ring.used > 0
+    assert take(ring) == datagrams
+    assert take(ring) is None
+    assert ring.used == 0
+
+
+def test_wrap_around_many_laps(ring):
+    # 레코드 크기가 용량의 약수가 아니므로 매 바퀴 끝에서 건너뜀 표시를 남기고 처음부터 씀
+    batch = [bytes([65 + i % 26]) * 999 + b'\n' for i in range(100)]
+    laps = 0
+    for round_number in range(60):
+        expected = [b'%d:' % round_number + data for data in batch]
+        before = ring.counters[ring.HEAD] // ring.capacity
+        assert ring.put(expected)
+        laps += ring.counters[ring.HEAD] // ring.capacity - before
+        assert take(ring) == expected
+    assert laps >= 5
+    assert ring.used == 0
+    stats = ring.stats()
+    assert stats['produced'] == stats['consumed'] == 6000
+
+
+def test_large_batches_are_split_into_records(ring):
+    datagrams = [b'x' * 1000] * 3000  # 3MB: 레코드 최대 크기(용량의 1/4)와 MAX_RECORD_DATAGRAMS로 나눔
+    consumed = []
+    
+    def consume():
+        while len(consumed) < len(datagrams):
+            chunk = take(ring)
+            if chunk is not None:
+                assert len(chunk) <= ring.MAX_RECORD_DATAGRAMS
+                consumed.extend(chunk)
+    
+    consumer = threading.Thread(target=consume)
+    consumer.start()
+    assert ring.put(datagrams)  # 용량보다 크므로 소비자를 기다리며 씀 (배압)
+    consumer.join(timeout=10)
+    assert consumed == datagrams
+    assert ring.stats()['high_water'] <= ring.capacity
+
+
+def test_oversized_datagram_is_rejected(ring):
+    with pytest.raises(ValueError):
+        ring.put([b'x' * (ring.max_record + 1)])
+
+
+def test_full_ring_honours_stop_event(ring):
+    stop = threading.Event()
+    stop.set()
+    chunk = [b'y' * 1000] * 200
+    while ring.capacity - ring.used > ring.max_record:
+        assert ring.put(chunk)
+    assert not ring.put([b'z' * (ring.max_record - 64)], stop_event=stop)
+    assert ring.stats()['producer_wait_ns'] > 0
+
+
+def test_finish_and_attach_by_name(ring):
+    other = uls.SharedRing(name=ring.name)
+    try:
+        assert other.capacity == ring.capacity
+        assert ring.put([b'a\n', b'b\n'])
+        ring.finish()
+        assert not other.finished  # 남은 레코드가 있으면 아직 끝나지 않음
+        assert take(other) == [b'a\n', b'b\n']
+        assert other.finished and ring.finished
+    finally:
+        other.close()
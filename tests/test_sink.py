@@ -0,0 +1,87 @@
+import socket
+
+import pytest
+
+import utm_log_sender as uls
+
+
+@pytest.fixture
+def sink():
+    sink = uls.UDPSink('127.0.0.1', 0)
+    yield sink
+    sink.socket.close()
+
+
+@pytest.fixture
+def client(sink):
+    client = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    client.connect(sink.address)
+    yield client
+    client.close()
+
+
+def drain(sink: uls.UDPSink, expected: int):
+    received = 0
+    for _ in range(100):
+        received += sink.receive(timeout=0.05)
+        if received >= expected:
+            break
+    return received
+
+
+def test_detects_gaps_and_reordering(sink, client):
+    formatter = uls.Rfc3164JsonFormatter('host1')
+    stamper = uls.SequenceStamper('main', formatter)
+    datagrams = stamper.stamp_many([formatter.encode_record({'n': n}) for n in range(6)])
+    # 2번 손실, 4번과 5번 순서 뒤바뀜
+    for index in (0, 1, 3, 5, 4):
+        client.send(datagrams[index])
+    assert drain(sink, 5) == 5
+    stats = sink.stats()
+    assert stats['packets'] == stats['messages'] == 5
+    assert stats['streams'] == 1
+    assert stats['sequence_gaps'] == 1
+    assert stats['reordered'] == 1
+    assert stats['invalid'] == 0
+
+
+def test_streams_are_counted_separately(sink, client):
+    for stream in ('thread1', 'thread2', '127.0.0.1:514'):
+        stamper = uls.SequenceStamper(stream, uls.Rfc5424Formatter('host1'))
+        for datagram in stamper.stamp_many([uls.Rfc5424Formatter('host1').encode_record({'a': 1})] * 3):
+            client.send(datagram)
+    assert drain(sink, 9) == 9
+    assert set(sink.streams) == {b'thread1', b'thread2', b'127.0.0.1:514'}
+    assert sink.stats()['sequence_gaps'] == 0
+
+
+def test_packed_and_invalid_datagrams(sink, client):
+    formatter = uls.KeyValueFormatter('host1')
+    packer = uls.DatagramPacker(10 ** 4)
+    packed, counts = packer.pack([formatter.encode_record({'n': n}) for n in range(4)])
+    assert counts == [4]
+    client.send(uls.SequenceStamper('main', formatter).stamp(packed[0]))
+    client.send(b'no syslog priority\n')
+    assert drain(sink, 2) == 2
+    stats = sink.stats()
+    assert stats['packets'] == 2
+    assert stats['messages'] == 5  # 묶음 데이터그램은 줄 단위로 셈
+    assert stats['invalid'] == 1
+    assert sink.streams[b'main'][:2] == [1, 0]
+    
+    sink.reset()
+    assert sink.stats()['packets'] == 0 and not sink.streams
+
+
+def test_end_to_end_sequence_without_loss(sink):
+    sender = uls.UTMLogSender(*sink.address, generator='template', sequence=True, log_format='cef')
+    sender.connect()
+    try:
+        sender.send_log_batch_generator(3000)
+        sender.transmitter.flush()
+    finally:
+        sender.disconnect()
+    assert drain(sink, 3000) == 3000
+    stats = sink.stats()
+    assert stats['sequence_gaps'] == 0
+    assert sink.streams[b'main'] == [3000, 2999, 0]
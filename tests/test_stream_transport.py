@@ -0,0 +1,159 @@
+import socket
+import threading
+
+import pytest
+
+import utm_log_sender as uls
+
+
+class LineServer:
+    """연결별로 받은 바이트를 모으는 로컬 TCP 수신기"""
+    
+    def __init__(self, connections: int):
+        self.server = socket.create_server(('127.0.0.1', 0))
+        self.address = self.server.getsockname()
+        self.received = []
+        self.thread = threading.Thread(target=self._serve, args=(connections,), daemon=True)
+        self.thread.start()
+    
+    def _serve(self, connections: int):
+        accepted = [self.server.accept()[0] for _ in range(connections)]
+        for connection in accepted:
+            chunks = []
+            while True:
+                chunk = connection.recv(65536)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+            connection.close()
+            self.received.append(b''.join(chunks))
+    
+    def close(self):
+        self.thread.join(timeout=5)
+        self.server.close()
+
+
+def parse_octet_frames(data: bytes):
+    messages = []
+    position = 0
+    while position < len(data):
+        space = data.index(b' ', position)
+        length = int(data[position:space])
+        messages.append(data[space + 1:space + 1 + length])
+        position = space + 1 + length
+    return messages
+
+
+@pytest.mark.parametrize('framing', uls.FRAMINGS)
+def test_pool_frames_and_round_robins(framing):
+    server = LineServer(2)
+    messages = [b'<134>Jan 02 03:04:05 host: message %d\n' % i for i in range(50)]
+    pool = uls.StreamConnectionPool(server.address, connections=2, framing=framing, buffer_size=256)
+    try:
+        assert pool.send_many(messages) == 50
+        assert pool.send(b'<134>Jan 02 03:04:05 host: last')
+    finally:
+        pool.close()
+        server.close()
+    
+    assert len(server.received) == 2 and all(server.received)  # 두 연결 모두 사용
+    if framing == 'octet':
+        received = [message for data in server.received for message in parse_octet_frames(data)]
+        expected = [message[:-1] for message in messages] + [b'<134>Jan 02 03:04:05 host: last']
+    else:
+        received = [line for data in server.received for line in data.splitlines(keepends=True)]
+        expected = messages + [b'<134>Jan 02 03:04:05 host: last\n']
+    assert sorted(received) == sorted(expected)
+    assert pool.packets_sent == 51
+    assert pool.failed == 0
+    assert sum(stats['messages'] for stats in pool.connection_stats()) == 51
+
+
+def test_pool_applies_sequence_before_framing():
+    server = LineServer(1)
+    formatter = uls.KeyValueFormatter('host1')
+    pool = uls.StreamConnectionPool(server.address, connections=1, framing='octet')
+    pool.sequence = uls.SequenceStamper('thread1', formatter)
+    try:
+        pool.send_many([formatter.encode_record({'n': n}) for n in range(3)])
+    finally:
+        pool.close()
+        server.close()
+    messages = parse_octet_frames(server.received[0])
+    assert [message.rsplit(b' ', 1)[1] for message in messages] == [b'seq=thread1:0', b'seq=thread1:1', b'seq=thread1:2']
+
+
+def test_unknown_framing():
+    with pytest.raises(ValueError):
+        uls.StreamConnectionPool(('127.0.0.1', 9), framing='xml')
+
+
+class BrokenSocket:
+    """accepted 바이트만 받은 뒤 연결이 끊기는 소켓"""
+    
+    def __init__(self, accepted: int):
+        self.accepted = accepted
+        self.data = b''
+    
+    def send(self, data) -> int:
+        if not self.accepted:
+            raise ConnectionResetError(104, 'Connection reset by peer')
+        chunk = bytes(data[:self.accepted])
+        self.accepted -= len(chunk)
+        self.data += chunk
+        return len(chunk)
+    
+    def close(self):
+        pass
+
+
+@pytest.mark.parametrize('accepted, delivered', [(5, 0), (12, 1), (25, 2)])
+def test_pool_does_not_resend_after_partial_write(accepted, delivered):
+    server = LineServer(1)
+    pool = uls.StreamConnectionPool(server.address, connections=1, framing='newline')
+    broken = BrokenSocket(accepted)
+    pool.connections[0].socket.close()
+    pool.connections[0].socket = broken
+    frames = [b'message %d\n' % i for i in range(3)]  # 각 10바이트
+    try:
+        assert pool._write(frames) == delivered
+    finally:
+        pool.close()
+        server.close()
+    assert broken.data == b''.join(frames)[:accepted]
+    assert server.received == [b'']  # 재연결한 연결로 재전송하지 않음
+    assert pool.packets_sent == delivered
+    assert pool.failed == 3 - delivered
+
+
+def test_pool_resends_when_nothing_was_written():
+    server = LineServer(2)
+    pool = uls.StreamConnectionPool(server.address, connections=1, framing='newline')
+    pool.connections[0].socket.close()
+    pool.connections[0].socket = BrokenSocket(0)
+    try:
+        assert pool.send(b'message\n')
+    finally:
+        pool.close()
+        server.close()
+    assert server.received[-1] == b'message\n'
+    assert pool.connections[0].reconnects == 1
+
+
+def test_pool_closes_opened_connections_when_open_fails(monkeypatch):
+    server = LineServer(1)
+    opened = []
+    create_connection = socket.create_connection
+    
+    def flaky_create_connection(*args, **kwargs):
+        if opened:
+            raise ConnectionRefusedError(111, 'Connection refused')
+        opened.append(create_connection(*args, **kwargs))
+        return opened[-1]
+    
+    monkeypatch.setattr(uls.socket, 'create_connection', flaky_create_connection)
+    with pytest.raises(ConnectionRefusedError):
+        uls.StreamConnectionPool(server.address, connections=3)
+    server.close()
+    assert opened[0].fileno() == -1
+    assert server.received == [b'']
@@ -0,0 +1,66 @@
+import json
+
+import pytest
+
+import utm_log_sender as uls
+
+DEFAULT = uls.Destination('127.0.0.1', 514)
+
+
+def test_compile_constant_rate_totals():
+    workload = uls.Workload.from_dict({'tick': 0.01, 'phases': [{'name': 'steady', 'duration': 2, 'rate': 333}]})
+    (phase, destinations, counts), = workload.compile(DEFAULT)
+    assert phase.name == 'steady'
+    assert destinations == [DEFAULT]
+    assert len(counts[0]) == 200
+    assert sum(counts[0]) == 666  # 소수점 이하는 다음 틱으로 이월
+    assert set(counts[0]) <= {3, 4}
+
+
+def test_compile_splits_by_destination_weight():
+    workload = uls.Workload.from_dict({'tick': 0.1, 'phases': [
+        {'duration': 1, 'rate': 1000, 'destinations': ['10.0.0.1:514:3', {'host': '10.0.0.2', 'port': 515}]}]})
+    (_, destinations, counts), = workload.compile(DEFAULT)
+    assert [str(d) for d in destinations] == ['10.0.0.1:514', '10.0.0.2:515']
+    assert [sum(c) for c in counts] == [750, 250]
+
+
+def test_compile_partial_last_tick_and_ramp():
+    workload = uls.Workload.from_dict({'tick': 0.4, 'phases': [
+        {'duration': 1, 'rate': {'type': 'linear', 'start': 0, 'end': 1000, 'duration': 1}}]})
+    (_, _, counts), = workload.compile(DEFAULT)
+    # 틱 0.0, 0.4, 0.8 (마지막 틱은 0.2초): 0*0.4, 400*0.4, 800*0.2
+    assert list(counts[0]) == [0, 160, 160]
+
+
+def test_phases_keep_order_and_weights():
+    workload = uls.Workload.from_dict({'phases': [
+        {'name': 'normal', 'duration': 1, 'events': {'firewall_allow': 3, 'web_filter': 1}},
+        {'name': 'storm', 'duration': 0.5, 'rate': 200, 'payload': {'distribution': 'fixed', 'size': 600}}]})
+    plan = workload.compile(DEFAULT)
+    assert [phase.name for phase, _, _ in plan] == ['normal', 'storm']
+    assert workload.duration == 1.5
+    assert plan[0][0].event_weights == {'firewall_allow': 3.0, 'web_filter': 1.0}
+    assert plan[1][0].payload.size == 600
+    assert sum(plan[1][2][0]) == 100
+
+
+def test_load_json_file(tmp_path):
+    path = tmp_path / 'workload.json'
+    path.write_text(json.dumps({'tick': 0.5, 'repeat': 2, 'phases': [{'duration': 1, 'rate': 10}]}))
+    workload = uls.Workload.load(str(path))
+    assert workload.repeat == 2
+    assert [list(c) for c in workload.compile(DEFAULT)[0][2]] == [[5, 5]]
+
+
+@pytest.mark.parametrize('spec', [
+    {'phases': []},
+    {'tick': 0, 'phases': [{'duration': 1}]},
+    {'phases': [{'duration': 0}]},
+    {'phases': [{'duration': 1, 'events': {'unknown_event': 1}}]},
+    {'phases': [{'duration': 1, 'events': {'firewall_allow': 0}}]},
+    {'phases': [{'duration': 1, 'payload': {'distribution': 'uniform', 'min': 900, 'max': 100}}]},
+])
+def test_invalid_workloads(spec):
+    with pytest.raises(ValueError):
+        uls.Workload.from_dict(spec)
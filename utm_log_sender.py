@@ -5,16 +5,47 @@ UTM 로그 대량 전송 스크립트
 """
 
 import socket
+import select
+import ssl
+import asyncio
+import ctypes
+import ctypes.util
+import errno
+import mmap
+import struct
 import time
 import random
 import json
-from datetime import datetime, timedelta
+import re
+import math
+import io
+import ipaddress
+import itertools
+import contextlib
+import hmac
+import resource
+import shutil
+import tempfile
+from datetime import datetime
 import threading
-from typing import List, Dict, Any
+import multiprocessing
+from multiprocessing import shared_memory
+import queue
+import signal
+from typing import List, Dict, Any, Optional, Tuple
 import argparse
 import sys
 import os
 from pathlib import Path
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.request import urlopen
+from array import array
+
+# NumPy는 선택 의존성 (--generator numpy)
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 # .env 파일 로드를 위한 dotenv import
 try:
@@ -33,22 +64,3299 @@ except ImportError:
                         os.environ[key.strip()] = value.strip()
     
     try:
-        load_dotenv()
-    except Exception:
-        print("⚠️  .env 파일을 읽을 수 없습니다. 기본 설정을 사용합니다.")
+        load_dotenv()
+    except Exception:
+        print("⚠️  .env 파일을 읽을 수 없습니다. 기본 설정을 사용합니다.")
+
+def create_udp_socket() -> socket.socket:
+    """송신용 UDP 소켓을 생성합니다 (1MB 송신 버퍼)."""
+    udp_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    udp_socket.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 1024 * 1024)
+    return udp_socket
+
+# 오류 카운터로 추적하는 errno (그 외는 "other")
+TRACKED_ERRNOS = [errno.EAGAIN, errno.ENOBUFS, errno.ECONNREFUSED, errno.EMSGSIZE]
+LATENCY_BUCKETS = 24  # 전송 호출 지연 히스토그램: 상한 2^(9+i) ns (약 0.5us ~ 2.1s), 마지막은 +Inf
+
+class MetricsShard:
+    """워커 하나가 단독으로 갱신하는 카운터 묶음입니다.
+    
+    쓰기 주체가 하나뿐이므로 잠금이 필요 없고, 수집기는 읽기만 합니다. 공유 메모리(RawArray)에
+    저장되므로 멀티프로세스 워커에도 그대로 전달할 수 있습니다.
+    배열 구성: [패킷, 바이트, 전송 호출, 전송 시간 합(ns), errno별 오류..., 기타 오류, 지연 히스토그램...]
+    """
+    
+    PACKETS, BYTES, CALLS, LATENCY_SUM = range(4)
+    ERRORS = 4
+    HISTOGRAM = ERRORS + len(TRACKED_ERRNOS) + 1
+    SIZE = HISTOGRAM + LATENCY_BUCKETS
+    
+    def __init__(self, label: str):
+        self.label = label
+        self.values = multiprocessing.RawArray('q', self.SIZE)
+    
+    def record_send(self, latency_ns: int, packets: int, nbytes: int):
+        """전송 호출 1회의 결과(지연 시간, 패킷 수, 바이트 수)를 기록합니다."""
+        values = self.values
+        values[self.PACKETS] += packets
+        values[self.BYTES] += nbytes
+        values[self.CALLS] += 1
+        values[self.LATENCY_SUM] += latency_ns
+        values[self.HISTOGRAM + min(max(latency_ns.bit_length() - 9, 0), LATENCY_BUCKETS - 1)] += 1
+    
+    def record_error(self, error_number: int):
+        """전송 오류를 errno별로 기록합니다."""
+        try:
+            slot = TRACKED_ERRNOS.index(error_number)
+        except ValueError:
+            slot = len(TRACKED_ERRNOS)
+        self.values[self.ERRORS + slot] += 1
+    
+    def snapshot(self) -> List[int]:
+        """현재 카운터 값의 복사본을 반환합니다."""
+        return self.values[:]
+
+class MetricsCollector:
+    """모든 전송 모드가 공유하는 실시간 지표 수집기입니다.
+    
+    워커마다 MetricsShard를 하나씩 발급하고, 보고 쓰레드가 주기적으로 합산하여
+    구간별 EPS/바이트/오류를 계산합니다. Prometheus 형식 HTTP 엔드포인트와
+    JSON-lines 통계 파일로 내보낼 수 있습니다. HTTP 엔드포인트는 기본적으로 로컬 주소(127.0.0.1)에만 엽니다.
+    """
+    
+    def __init__(self, interval: float = 1.0, http_port: int = None, stats_file: str = None,
+                 http_host: str = '127.0.0.1'):
+        self.interval = interval
+        self.http_port = http_port
+        self.http_host = http_host
+        self.stats_file = stats_file
+        self.shards: List[MetricsShard] = []
+        self.last_interval: Dict[str, Any] = {}
+        self._previous = None
+        self._previous_time = None
+        self._started = None
+        self._stop = threading.Event()
+        self._thread = None
+        self._server = None
+        self._file = None
+    
+    def new_shard(self, label: str) -> MetricsShard:
+        """워커용 카운터 묶음을 발급합니다."""
+        shard = MetricsShard(label)
+        self.shards.append(shard)
+        return shard
+    
+    def totals(self) -> List[int]:
+        """모든 워커의 카운터를 합산합니다."""
+        totals = [0] * MetricsShard.SIZE
+        for shard in self.shards:
+            for i, value in enumerate(shard.snapshot()):
+                totals[i] += value
+        return totals
+    
+    def start(self):
+        """보고 쓰레드와 (설정된 경우) HTTP 엔드포인트를 시작합니다."""
+        self._started = self._previous_time = time.monotonic()
+        self._previous = {shard.label: shard.snapshot() for shard in self.shards}
+        if self.stats_file:
+            self._file = open(self.stats_file, 'a', encoding='utf-8')
+        if self.http_port:
+            collector = self
+            
+            class MetricsHandler(BaseHTTPRequestHandler):
+                def do_GET(self):
+                    if self.path.split('?')[0] not in ('/', '/metrics'):
+                        self.send_error(404)
+                        return
+                    body = collector.render_prometheus().encode('utf-8')
+                    self.send_response(200)
+                    self.send_header('Content-Type', 'text/plain; version=0.0.4')
+                    self.send_header('Content-Length', str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                
+                def log_message(self, format, *args):
+                    pass
+            
+            self._server = ThreadingHTTPServer((self.http_host, self.http_port), MetricsHandler)
+            threading.Thread(target=self._server.serve_forever, daemon=True).start()
+            print(f"📡 지표 엔드포인트: http://{self.http_host}:{self.http_port}/metrics")
+        self._thread = threading.Thread(target=self._report_loop, daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        """보고를 멈추고 마지막 구간을 기록한 뒤 엔드포인트와 파일을 닫습니다."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        self._report()
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+        if self._file:
+            self._file.close()
+    
+    def _report_loop(self):
+        while not self._stop.wait(self.interval):
+            self._report()
+    
+    def _report(self):
+        """직전 보고 이후 구간의 EPS/바이트/오류를 계산하고 통계 파일에 기록합니다."""
+        now = time.monotonic()
+        elapsed = now - self._previous_time
+        if elapsed <= 0:
+            return
+        current = {shard.label: shard.snapshot() for shard in self.shards}
+        workers = {}
+        interval_totals = [0] * MetricsShard.SIZE
+        for label, values in current.items():
+            previous = self._previous.get(label, [0] * MetricsShard.SIZE)
+            delta = [value - before for value, before in zip(values, previous)]
+            for i, value in enumerate(delta):
+                interval_totals[i] += value
+            workers[label] = round(delta[MetricsShard.PACKETS] / elapsed, 1)
+        
+        errors = self._error_counts(interval_totals)
+        self.last_interval = {
+            'time': datetime.now().isoformat(),
+            'elapsed': round(now - self._started, 3),
+            'eps': round(interval_totals[MetricsShard.PACKETS] / elapsed, 1),
+            'bytes_per_second': round(interval_totals[MetricsShard.BYTES] / elapsed, 1),
+            'send_calls': interval_totals[MetricsShard.CALLS],
+            'errors': errors,
+            'workers': workers,
+        }
+        self._previous = current
+        self._previous_time = now
+        if self._file:
+            self._file.write(json.dumps(self.last_interval, ensure_ascii=False) + '\n')
+            self._file.flush()
+    
+    @staticmethod
+    def _error_counts(values: List[int]) -> Dict[str, int]:
+        """카운터 배열에서 errno 이름별 오류 수를 추출합니다."""
+        names = [errno.errorcode.get(number, str(number)) for number in TRACKED_ERRNOS] + ['other']
+        return {name: values[MetricsShard.ERRORS + i] for i, name in enumerate(names)}
+    
+    def render_prometheus(self) -> str:
+        """Prometheus 텍스트 형식으로 지표를 렌더링합니다."""
+        lines = []
+        
+        def metric(name, metric_type, help_text, samples):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            for labels, value in samples:
+                label_text = ','.join(f'{key}="{val}"' for key, val in labels.items())
+                lines.append(f"{name}{{{label_text}}} {value}" if label_text else f"{name} {value}")
+        
+        snapshots = [(shard.label, shard.snapshot()) for shard in self.shards]
+        metric("utm_sender_packets_total", "counter", "Sent log datagrams.",
+               [({'worker': label}, values[MetricsShard.PACKETS]) for label, values in snapshots])
+        metric("utm_sender_bytes_total", "counter", "Sent bytes.",
+               [({'worker': label}, values[MetricsShard.BYTES]) for label, values in snapshots])
+        metric("utm_sender_send_calls_total", "counter", "Send system calls.",
+               [({'worker': label}, values[MetricsShard.CALLS]) for label, values in snapshots])
+        
+        totals = self.totals()
+        metric("utm_sender_send_errors_total", "counter", "Send errors by errno.",
+               [({'errno': name}, count) for name, count in self._error_counts(totals).items()])
+        
+        buckets = []
+        cumulative = 0
+        for i in range(LATENCY_BUCKETS):
+            cumulative += totals[MetricsShard.HISTOGRAM + i]
+            upper = "+Inf" if i == LATENCY_BUCKETS - 1 else f"{2 ** (9 + i) / 1e9:.9g}"
+            buckets.append(({'le': upper}, cumulative))
+        metric("utm_sender_send_latency_seconds", "histogram", "Send call latency.", [])
+        lines.extend(f'utm_sender_send_latency_seconds_bucket{{le="{labels["le"]}"}} {value}' for labels, value in buckets)
+        lines.append(f"utm_sender_send_latency_seconds_sum {totals[MetricsShard.LATENCY_SUM] / 1e9:.9f}")
+        lines.append(f"utm_sender_send_latency_seconds_count {totals[MetricsShard.CALLS]}")
+        
+        interval = self.last_interval
+        metric("utm_sender_interval_eps", "gauge", "Events per second over the last interval.",
+               [({}, interval.get('eps', 0))])
+        metric("utm_sender_interval_bytes_per_second", "gauge", "Bytes per second over the last interval.",
+               [({}, interval.get('bytes_per_second', 0))])
+        return '\n'.join(lines) + '\n'
+    
+    def latency_percentile(self, percentile: float) -> float:
+        """전송 호출 지연 히스토그램에서 백분위수 상한(초)을 추정합니다."""
+        totals = self.totals()
+        histogram = totals[MetricsShard.HISTOGRAM:]
+        target = sum(histogram) * percentile / 100
+        cumulative = 0
+        for i, count in enumerate(histogram):
+            cumulative += count
+            if count and cumulative >= target:
+                return 2 ** (9 + i) / 1e9
+        return 0.0
+    
+    def print_summary(self):
+        """지표 요약(오류, 지연 시간)을 출력합니다."""
+        totals = self.totals()
+        calls = totals[MetricsShard.CALLS]
+        errors = {name: count for name, count in self._error_counts(totals).items() if count}
+        print(f"   📡 지표: 전송 호출 {calls}회, 평균 지연 {totals[MetricsShard.LATENCY_SUM] / max(calls, 1) / 1000:.1f}us, "
+              f"p50 ≤ {self.latency_percentile(50) * 1e6:.0f}us, p99 ≤ {self.latency_percentile(99) * 1e6:.0f}us")
+        if errors:
+            print(f"   ⚠️  오류(errno별): {', '.join(f'{name} {count}' for name, count in errors.items())}")
+
+class _ProfileState:
+    """쓰레드 하나의 단계별 누적 시간 (StageProfiler 내부용)"""
+    
+    def __init__(self):
+        self.stack: List[int] = []  # 진행 중인 단계별 하위 단계 시간 합계 (자기 시간 계산용)
+        self.stages: Dict[str, List[int]] = {}  # 단계 -> [자기 시간(ns), 호출 수]
+        self.events = 0
+        self.first = 0  # 처음 계측 구간에 들어간 시각 (ns)
+        self.last = 0  # 마지막으로 계측 구간을 나온 시각 (ns)
+
+class StageProfiler:
+    """전송 경로의 단계별 비용을 측정하는 프로파일러입니다 (--profile).
+    
+    단계 타이머는 인코더/형식/전송기 인스턴스의 메서드를 감싸 perf_counter_ns로 자기 시간(하위 단계 제외)을
+    누적합니다. 감싸는 단위는 청크(최대 1,024개)이므로 이벤트당 부담이 작고, 프로파일을 켜지 않으면 아무것도
+    감싸지 않습니다. 누적 값은 쓰레드별로 따로 두므로 멀티쓰레드 모드에서도 잠금이 없습니다.
+    샘플링 쓰레드는 interval초마다 모든 쓰레드의 호출 스택을 읽어 collapsed-stack 형식
+    ("루트;함수;함수 횟수", flamegraph.pl/speedscope 입력)으로 집계합니다.
+    """
+    
+    # 단계 이름 -> 설명 (보고 순서)
+    STAGES = {
+        'generate': "이벤트 필드 생성 (random/NumPy 추출, dict 구성)",
+        'format': "syslog 포맷팅/인코딩 (템플릿 채우기, 타임스탬프 갱신)",
+        'payload': "메시지 크기 분포 채움",
+        'pack': "데이터그램 묶음",
+        'sequence': "일련번호 필드",
+        'batching': "배치 구성 (버퍼 결합, iovec/프레이밍)",
+        'syscall': "전송 시스템 콜 (sendmmsg/send/sendall/sendto)",
+        'pacing': "목표 EPS 대기",
+    }
+    
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.label = "main"
+        self.samples: Dict[str, int] = {}
+        self._states: List[_ProfileState] = []
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._wrapper_codes = set()  # 샘플 스택에서 생략할 감싸기 함수의 코드 객체
+    
+    def _state(self) -> _ProfileState:
+        state = getattr(self._local, 'state', None)
+        if state is None:
+            state = self._local.state = _ProfileState()
+            with self._lock:
+                self._states.append(state)
+        return state
+    
+    def timed(self, function, stage: str, count=None):
+        """function을 호출할 때마다 stage의 자기 시간을 누적하는 함수를 반환합니다.
+        
+        count(args)가 있으면 그 반환값을 처리한 이벤트 수로 셉니다 (전송기 입구에서 사용).
+        """
+        clock = time.perf_counter_ns
+        
+        def profiled(*args, **kwargs):
+            state = self._state()
+            stack = state.stack
+            if count:
+                state.events += count(args)
+            stack.append(0)
+            started = clock()
+            if not state.first:
+                state.first = started
+            try:
+                return function(*args, **kwargs)
+            finally:
+                now = clock()
+                elapsed = now - started
+                totals = state.stages.get(stage)
+                if totals is None:
+                    totals = state.stages[stage] = [0, 0]
+                totals[0] += elapsed - stack.pop()
+                totals[1] += 1
+                if stack:
+                    stack[-1] += elapsed
+                else:
+                    state.last = now
+        
+        self._wrapper_codes.add(profiled.__code__)
+        return profiled
+    
+    def timed_iterator(self, function, stage: str):
+        """제너레이터 함수 function이 만든 이터레이터의 next() 시간을 stage에 누적하는 함수를 반환합니다.
+        
+        dict 모드처럼 이벤트를 지연 생성하는 경로에서 생성 시간을 소비하는 쪽(포맷팅)과 분리합니다.
+        """
+        def profiled(*args, **kwargs):
+            return self._timed_next(function(*args, **kwargs), stage)
+        
+        self._wrapper_codes.add(profiled.__code__)
+        return profiled
+    
+    def _timed_next(self, iterator, stage: str):
+        step = self.timed(next, stage)
+        while True:
+            try:
+                item = step(iterator)
+            except StopIteration:
+                return
+            yield item
+    
+    def wrap(self, target, name: str, stage: str, count=None):
+        """target 인스턴스의 메서드 name을 단계 타이머로 감쌉니다 (인스턴스 속성으로 덮어씀)."""
+        setattr(target, name, self.timed(getattr(target, name), stage, count))
+    
+    def instrument_transmitter(self, transmitter):
+        """전송기(UDP/TCP/TLS)와 크기 분포/묶음/일련번호 처리를 단계별로 계측합니다."""
+        self.wrap(transmitter, 'send_many', 'batching', count=lambda args: len(args[0]))
+        if isinstance(transmitter, UDPBatchTransmitter):
+            self.wrap(transmitter, 'send_regions', 'batching', count=lambda args: args[4])
+            self.wrap(transmitter, '_sendmmsg_range', 'syscall')
+            self.wrap(transmitter, '_send_chunk_fallback', 'syscall')
+            if transmitter.packer:
+                self.wrap(transmitter.packer, 'pack', 'pack')
+        else:
+            self.wrap(transmitter, '_write', 'syscall')
+        if transmitter.payload:
+            self.wrap(transmitter.payload, 'apply', 'payload')
+        if transmitter.sequence:
+            self.wrap(transmitter.sequence, 'stamp_many', 'sequence')
+    
+    def add(self, stage: str, elapsed: int, calls: int = 1):
+        """감싸기 어려운 구간(asyncio 등)의 시간을 stage에 직접 더합니다."""
+        state = self._state()
+        totals = state.stages.get(stage)
+        if totals is None:
+            totals = state.stages[stage] = [0, 0]
+        totals[0] += elapsed
+        totals[1] += calls
+    
+    def count_events(self, events: int):
+        """처리한 이벤트 수를 직접 셉니다 (전송기를 거치지 않는 경로용)."""
+        self._state().events += events
+    
+    def start(self, label: str = None):
+        """샘플링 쓰레드를 시작합니다. label은 collapsed-stack의 루트 이름(프로세스/워커)입니다."""
+        self.label = label or self.label
+        if self.interval and self.interval > 0:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._sample_loop, daemon=True)
+            self._thread.start()
+    
+    def stop(self):
+        """샘플링 쓰레드를 멈춥니다."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+    
+    def _sample_loop(self):
+        own = threading.get_ident()
+        samples = self.samples
+        skip = self._wrapper_codes
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    if code not in skip:
+                        stack.append(f"{getattr(code, 'co_qualname', code.co_name)} "
+                                     f"({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                stack.append(names.get(ident, f"thread-{ident}"))
+                stack.append(self.label)
+                key = ";".join(reversed(stack))
+                samples[key] = samples.get(key, 0) + 1
+            del frame
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """모든 쓰레드의 누적 값을 합친 결과 (워커 프로세스에서 부모로 넘길 수 있는 dict)"""
+        stages: Dict[str, List[int]] = {}
+        events = 0
+        span = 0
+        with self._lock:
+            states = list(self._states)
+        for state in states:
+            for stage, (elapsed, calls) in state.stages.items():
+                totals = stages.setdefault(stage, [0, 0])
+                totals[0] += elapsed
+                totals[1] += calls
+            events += state.events
+            if state.first and state.last > state.first:
+                span += state.last - state.first
+        return {'stages': stages, 'events': events, 'span_ns': span, 'samples': dict(self.samples)}
+    
+    @staticmethod
+    def merge(snapshots: List[Optional[Dict[str, Any]]]) -> Dict[str, Any]:
+        """여러 프로세스의 결과를 합칩니다 (None은 건너뜀)."""
+        merged = {'stages': {}, 'events': 0, 'span_ns': 0, 'samples': {}}
+        for snapshot in snapshots:
+            if not snapshot:
+                continue
+            for stage, (elapsed, calls) in snapshot['stages'].items():
+                totals = merged['stages'].setdefault(stage, [0, 0])
+                totals[0] += elapsed
+                totals[1] += calls
+            merged['events'] += snapshot['events']
+            merged['span_ns'] += snapshot['span_ns']
+            for stack, count in snapshot['samples'].items():
+                merged['samples'][stack] = merged['samples'].get(stack, 0) + count
+        return merged
+    
+    @classmethod
+    def print_report(cls, snapshot: Dict[str, Any]):
+        """단계별 시간, 호출 수, 이벤트당 ns, 비율을 표로 출력합니다."""
+        events = snapshot['events']
+        stages = snapshot['stages']
+        measured = sum(elapsed for elapsed, _ in stages.values())
+        # 쓰레드별 계측 구간(처음 진입~마지막 종료) 중 어느 단계에도 속하지 않은 시간: 루프, 집계, 대기 등
+        other = max(snapshot['span_ns'] - measured, 0)
+        total = measured + other
+        if not total:
+            print("\n🔬 프로파일: 계측된 전송 구간이 없습니다.")
+            return
+        # 여러 쓰레드/프로세스의 시간을 합산하므로 CPU 시간에 가까운 값 (벽시계 시간보다 길 수 있음)
+        print(f"\n🔬 단계별 비용 ({events:,}개 이벤트, 쓰레드 합산 계측 시간 {total / 1e9:.2f}초):")
+        # 한글은 터미널에서 두 칸을 차지해 정렬이 어긋나므로 열 이름은 영문으로 표기
+        print(f"   {'stage':<10}{'time(s)':>10}{'calls':>11}{'ns/event':>11}{'share':>8}  설명")
+        rows = [(stage, stages[stage], description) for stage, description in cls.STAGES.items() if stage in stages]
+        rows += [(stage, totals, "") for stage, totals in stages.items() if stage not in cls.STAGES]
+        rows.append(('other', [other, 0], "계측 구간 밖 (루프, 집계, 워커 대기 등)"))
+        for stage, (elapsed, calls), description in rows:
+            print(f"   {stage:<10}{elapsed / 1e9:>10.3f}{calls:>11,}{elapsed / max(events, 1):>11,.0f}"
+                  f"{elapsed / max(total, 1) * 100:>7.1f}%  {description}")
+        print(f"   {'total':<10}{total / 1e9:>10.3f}{'':>11}{total / max(events, 1):>11,.0f}{100.0:>7.1f}%")
+    
+    @staticmethod
+    def write_collapsed(snapshot: Dict[str, Any], path: str) -> int:
+        """샘플을 collapsed-stack 파일로 저장하고 샘플 수를 반환합니다."""
+        samples = snapshot['samples']
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in sorted(samples.items()):
+                f.write(f"{stack} {count}\n")
+        return sum(samples.values())
+
+# sendmmsg(2)용 구조체 정의 (Linux 전용, ctypes)
+class _IOVec(ctypes.Structure):
+    _fields_ = [("iov_base", ctypes.c_void_p), ("iov_len", ctypes.c_size_t)]
+
+class _MsgHdr(ctypes.Structure):
+    _fields_ = [
+        ("msg_name", ctypes.c_void_p),
+        ("msg_namelen", ctypes.c_uint32),
+        ("msg_iov", ctypes.POINTER(_IOVec)),
+        ("msg_iovlen", ctypes.c_size_t),
+        ("msg_control", ctypes.c_void_p),
+        ("msg_controllen", ctypes.c_size_t),
+        ("msg_flags", ctypes.c_int),
+    ]
+
+class _MMsgHdr(ctypes.Structure):
+    _fields_ = [("msg_hdr", _MsgHdr), ("msg_len", ctypes.c_uint)]
+
+def _load_sendmmsg():
+    """libc의 sendmmsg 함수를 로드합니다. 사용할 수 없으면 None을 반환합니다."""
+    if not sys.platform.startswith('linux'):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        sendmmsg = libc.sendmmsg
+    except (OSError, AttributeError):
+        return None
+    sendmmsg.argtypes = [ctypes.c_int, ctypes.c_void_p, ctypes.c_uint, ctypes.c_int]
+    sendmmsg.restype = ctypes.c_int
+    return sendmmsg
+
+_SENDMMSG = _load_sendmmsg()
+_MMSGHDR_SIZE = ctypes.sizeof(_MMsgHdr)
+
+class SequenceStamper:
+    """데이터그램에 스트림별 일련번호 필드(값 `STREAM:N`)를 넣습니다.
+    
+    필드의 모양과 위치는 출력 형식이 정하므로(LogFormatter.add_sequence) 본문은 형식에 맞는 채로 남습니다.
+    JSON 본문은 "seq" 키, RFC 5424는 구조화 데이터의 seq 파라미터, CEF/LEEF/kv는 seq 확장 필드입니다.
+    내장 수신기(UDPSink)가 이 필드로 손실과 순서 뒤바뀜을 검출합니다.
+    """
+    
+    # 수신 측에서 찾는 필드: seq=STREAM:N (CEF/LEEF/kv), seq="STREAM:N" (RFC 5424), "seq": "STREAM:N" (JSON)
+    FIELD = re.compile(rb'seq(?:=|": )"?([^\s"]+):(\d+)')
+    
+    def __init__(self, stream: str, formatter: 'LogFormatter'):
+        self.stream = stream
+        self.prefix = stream.encode() + b':'
+        self.add_sequence = formatter.add_sequence
+        self.next = 0
+    
+    def stamp(self, data: bytes) -> bytes:
+        """데이터그램 하나에 다음 일련번호를 넣습니다."""
+        sequence = self.next
+        self.next += 1
+        return self.add_sequence(data, b'%s%d' % (self.prefix, sequence))
+    
+    def stamp_many(self, datagrams: List[bytes]) -> List[bytes]:
+        """데이터그램 목록에 연속된 일련번호를 붙입니다."""
+        return [self.stamp(data) for data in datagrams]
+
+class UDPBatchTransmitter:
+    """인코딩된 데이터그램을 모아서 sendmmsg로 한 번에 전송합니다.
+    
+    connect()된 UDP 소켓을 사용하므로 커널이 패킷마다 주소를 다시 해석하지 않습니다.
+    sendmmsg를 사용할 수 없으면 패킷별 send()로 대체합니다.
+    """
+    
+    MAX_BATCH = 1024  # UIO_MAXIOV: sendmmsg 한 번에 보낼 수 있는 최대 메시지 수
+    
+    def __init__(self, udp_socket: socket.socket, address: Tuple[str, int], batch_size: int = 1024,
+                 use_sendmmsg: bool = True, metrics: MetricsShard = None):
+        self.socket = udp_socket
+        self.metrics = metrics
+        self.sequence: Optional[SequenceStamper] = None
+        self.payload: Optional[PayloadSizer] = None  # 메시지 크기 분포 (채움 텍스트)
+        self.formatter: Optional[LogFormatter] = None  # 채움 텍스트를 넣는 출력 형식 (pad 훅)
+        self.packer: Optional[DatagramPacker] = None  # 여러 메시지를 MTU 크기 데이터그램으로 묶음
+        self.max_datagram = 1472  # 이보다 큰 데이터그램은 IP 단편화됨 (MTU 1500 기준)
+        self.socket.connect(address)
+        self.batch_size = max(1, min(batch_size, self.MAX_BATCH))
+        self.pending: List[bytes] = []
+        self.packets_sent = 0  # 전송한 메시지(로그) 수
+        self.datagrams_sent = 0  # 전송한 데이터그램 수 (묶음 모드에서는 메시지 수보다 적음)
+        self.bytes_sent = 0
+        self.failed = 0
+        self.fragmented = 0  # max_datagram을 넘어 IP 단편화되는 데이터그램 수
+        self.syscalls = 0
+        
+        self._sendmmsg = _SENDMMSG if use_sendmmsg else None
+        if self._sendmmsg:
+            # 메시지 헤더 배열을 미리 할당해 두고 iov 주소/길이만 갱신
+            self._iov = (_IOVec * self.batch_size)()
+            self._msgs = (_MMsgHdr * self.batch_size)()
+            for i in range(self.batch_size):
+                self._msgs[i].msg_hdr.msg_iov = ctypes.pointer(self._iov[i])
+                self._msgs[i].msg_hdr.msg_iovlen = 1
+    
+    @property
+    def method(self) -> str:
+        """사용 중인 전송 시스템 콜 이름"""
+        return "sendmmsg" if self._sendmmsg else "send"
+    
+    @property
+    def packets_per_syscall(self) -> float:
+        """시스템 콜 1회당 평균 전송 패킷 수"""
+        return self.packets_sent / self.syscalls if self.syscalls else 0.0
+    
+    def queue(self, data: bytes):
+        """메시지를 큐에 추가하고, 배치가 가득 차면 전송합니다."""
+        self.pending.append(data)
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+    
+    def flush(self) -> int:
+        """큐에 쌓인 메시지를 모두 전송하고 전송 성공 수를 반환합니다."""
+        if not self.pending:
+            return 0
+        pending = self.pending
+        self.pending = []
+        return self.send_many(pending)
+    
+    def send(self, data: bytes) -> bool:
+        """메시지 하나를 즉시 전송합니다."""
+        return self.send_many([data]) == 1
+    
+    def send_many(self, datagrams: List[bytes]) -> int:
+        """메시지 목록에 크기 분포/묶음/일련번호를 적용해 배치 단위로 전송하고 전송한 메시지 수를 반환합니다."""
+        counts = None
+        if self.payload or self.packer:
+            if self.payload:
+                datagrams = self.payload.apply(datagrams, self.formatter)
+            if self.packer:
+                datagrams, counts = self.packer.pack(datagrams)
+            max_datagram = self.max_datagram
+            self.fragmented += sum(1 for data in datagrams if len(data) > max_datagram)
+        if self.sequence:
+            # 묶음 모드에서는 데이터그램마다 일련번호 하나 (수신 측 손실 검출 단위)
+            datagrams = self.sequence.stamp_many(datagrams)
+        return self._send_batches(datagrams, counts)
+    
+    def _send_batches(self, datagrams: List[bytes], counts: List[int] = None) -> int:
+        """(일련번호가 이미 붙은) 데이터그램 목록을 batch_size 단위로 나누어 전송합니다.
+        
+        counts는 데이터그램별 메시지 수(묶음 모드)이며, 전송한 메시지 수를 반환합니다.
+        """
+        sent = 0
+        for i in range(0, len(datagrams), self.batch_size):
+            chunk = datagrams[i:i + self.batch_size]
+            chunk_counts = counts[i:i + self.batch_size] if counts else None
+            if self._sendmmsg:
+                sent += self._send_chunk_mmsg(chunk, chunk_counts)
+            else:
+                sent += self._send_chunk_fallback(chunk, chunk_counts)
+        return sent
+    
+    def _send_chunk_mmsg(self, chunk: List[bytes], counts: List[int] = None) -> int:
+        """sendmmsg로 최대 batch_size개의 데이터그램을 전송합니다."""
+        count = len(chunk)
+        # 하나의 연속 버퍼로 합친 뒤 각 iov가 버퍼 내 위치를 가리키도록 설정
+        buffer = b''.join(chunk)
+        address = ctypes.cast(ctypes.c_char_p(buffer), ctypes.c_void_p).value
+        iov = self._iov
+        for i, data in enumerate(chunk):
+            length = len(data)
+            iov[i].iov_base = address
+            iov[i].iov_len = length
+            address += length
+        return self._sendmmsg_range(count, counts)
+    
+    def send_regions(self, base_address: int, offsets, lengths, start: int, count: int) -> int:
+        """메모리 영역(base_address + offset, length)들을 복사 없이 sendmmsg로 전송합니다.
+        
+        count는 batch_size 이하여야 하며, sendmmsg를 사용할 수 있을 때만 호출합니다.
+        """
+        iov = self._iov
+        for i in range(count):
+            iov[i].iov_base = base_address + offsets[start + i]
+            iov[i].iov_len = lengths[start + i]
+        return self._sendmmsg_range(count)
+    
+    def _sendmmsg_range(self, count: int, counts: List[int] = None) -> int:
+        """준비된 메시지 헤더 0..count-1을 전송합니다. 부분 전송과 오류를 처리합니다.
+        
+        counts(데이터그램별 메시지 수)가 있으면 전송한 메시지 수를 반환합니다.
+        """
+        fd = self.socket.fileno()
+        msgs_address = ctypes.addressof(self._msgs)
+        start = 0
+        sent = 0
+        datagrams = 0
+        refused_retry = True
+        metrics = self.metrics
+        while start < count:
+            started = time.perf_counter_ns()
+            result = self._sendmmsg(fd, msgs_address + start * _MMSGHDR_SIZE, count - start, 0)
+            self.syscalls += 1
+            if result > 0:
+                iov = self._iov
+                nbytes = 0
+                for i in range(start, start + result):
+                    nbytes += iov[i].iov_len
+                messages = sum(counts[start:start + result]) if counts else result
+                self.bytes_sent += nbytes
+                if metrics:
+                    metrics.record_send(time.perf_counter_ns() - started, messages, nbytes)
+                sent += messages
+                datagrams += result
+                start += result
+                refused_retry = True
+                continue
+            err = ctypes.get_errno()
+            if metrics and err != errno.EINTR:
+                metrics.record_error(err)
+            if err == errno.EINTR:
+                continue
+            if err == errno.ECONNREFUSED and refused_retry:
+                # 이전 패킷에 대한 ICMP 오류가 보고된 것. 오류는 한 번 보고되면 지워지므로 재시도
+                refused_retry = False
+                continue
+            # 첫 번째 미전송 데이터그램을 실패로 처리하고 나머지는 계속 전송
+            self.failed += counts[start] if counts else 1
+            start += 1
+        self.packets_sent += sent
+        self.datagrams_sent += datagrams
+        return sent
+    
+    def _send_chunk_fallback(self, chunk: List[bytes], counts: List[int] = None) -> int:
+        """sendmmsg를 사용할 수 없을 때 패킷별 send()로 전송합니다."""
+        sent = 0
+        datagrams = 0
+        metrics = self.metrics
+        for index, data in enumerate(chunk):
+            messages = counts[index] if counts else 1
+            for attempt in range(2):
+                self.syscalls += 1
+                started = time.perf_counter_ns()
+                try:
+                    self.socket.send(data)
+                except ConnectionRefusedError as e:
+                    if metrics:
+                        metrics.record_error(e.errno)
+                    # 이전 패킷에 대한 ICMP 오류. 한 번 재시도
+                    if attempt == 0:
+                        continue
+                    self.failed += messages
+                except OSError as e:
+                    if metrics:
+                        metrics.record_error(e.errno)
+                    self.failed += messages
+                else:
+                    sent += messages
+                    datagrams += 1
+                    self.bytes_sent += len(data)
+                    if metrics:
+                        metrics.record_send(time.perf_counter_ns() - started, messages, len(data))
+                break
+        self.packets_sent += sent
+        self.datagrams_sent += datagrams
+        return sent
+    
+    def close(self):
+        """남은 데이터그램을 전송하고 소켓을 닫습니다."""
+        try:
+            self.flush()
+        finally:
+            self.socket.close()
+
+TRANSPORTS = ["udp", "tcp", "tls"]
+FRAMINGS = ["octet", "newline"]
+
+class _PooledConnection:
+    """연결 풀의 개별 TCP/TLS 연결과 연결별 통계"""
+    
+    def __init__(self, index: int):
+        self.index = index
+        self.socket = None
+        self.messages = 0
+        self.bytes_sent = 0
+        self.writes = 0
+        self.reconnects = 0
+        self.errors = 0
+        self.send_time = 0.0  # 쓰기에서 보낸 시간 (초, backpressure 지표)
+        self.opened_at = time.perf_counter()
+    
+    def stats(self) -> Dict[str, Any]:
+        """연결별 통계를 딕셔너리로 반환합니다."""
+        elapsed = time.perf_counter() - self.opened_at
+        return {
+            'connection': self.index,
+            'messages': self.messages,
+            'bytes': self.bytes_sent,
+            'writes': self.writes,
+            'reconnects': self.reconnects,
+            'errors': self.errors,
+            'send_time': self.send_time,
+            'elapsed': elapsed,
+        }
+
+class StreamConnectionPool:
+    """TCP/TLS syslog 전송용 영구 연결 풀 (RFC 6587 프레이밍).
+    
+    메시지를 프레이밍하여 버퍼에 모은 뒤 buffer_size 단위의 큰 쓰기 한 번으로 전송하고,
+    연결은 라운드로빈으로 사용합니다. 연결이 끊기면 자동으로 재연결하여 해당 청크를 한 번 재전송합니다.
+    청크 일부가 이미 쓰인 뒤 끊기면 중복과 잘린 프레임을 막기 위해 재전송하지 않고, 다 쓰지 못한 메시지를 실패로 셉니다.
+    UDPBatchTransmitter와 같은 인터페이스(queue/flush/send/send_many/close)를 제공합니다.
+    """
+    
+    def __init__(self, address: Tuple[str, int], connections: int = 4, framing: str = "octet",
+                 use_tls: bool = False, tls_insecure: bool = False, tls_ca: str = None,
+                 buffer_size: int = 256 * 1024, metrics: MetricsShard = None):
+        if framing not in FRAMINGS:
+            raise ValueError(f"지원하지 않는 프레이밍입니다: {framing}")
+        self.address = address
+        self.framing = framing
+        self.use_tls = use_tls
+        self.buffer_size = buffer_size
+        self.metrics = metrics
+        self.sequence: Optional[SequenceStamper] = None
+        self.payload: Optional[PayloadSizer] = None  # 메시지 크기 분포 (채움 텍스트)
+        self.formatter: Optional[LogFormatter] = None  # 채움 텍스트를 넣는 출력 형식 (pad 훅)
+        self.batch_size = 1024
+        self.socket = None
+        self.pending: List[bytes] = []
+        self.pending_bytes = 0
+        self.packets_sent = 0
+        self.bytes_sent = 0
+        self.failed = 0
+        self.syscalls = 0
+        
+        self._ssl_context = None
+        if use_tls:
+            self._ssl_context = ssl.create_default_context(cafile=tls_ca)
+            if tls_insecure:
+                self._ssl_context.check_hostname = False
+                self._ssl_context.verify_mode = ssl.CERT_NONE
+        
+        self.connections = [_PooledConnection(i + 1) for i in range(max(1, connections))]
+        try:
+            for connection in self.connections:
+                self._open(connection)
+        except BaseException:
+            # 일부 연결만 열린 채 실패하면 이미 연 소켓을 닫고 예외를 그대로 전달
+            for connection in self.connections:
+                self._close_connection(connection)
+            raise
+        self._next = 0
+    
+    @property
+    def method(self) -> str:
+        """전송 방식 설명"""
+        return f"{'tls' if self.use_tls else 'tcp'}/{self.framing}"
+    
+    @property
+    def packets_per_syscall(self) -> float:
+        """쓰기 1회당 평균 전송 메시지 수"""
+        return self.packets_sent / self.syscalls if self.syscalls else 0.0
+    
+    def _open(self, connection: _PooledConnection):
+        """연결을 (재)수립합니다."""
+        sock = socket.create_connection(self.address, timeout=10)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 1024 * 1024)
+        if self._ssl_context:
+            sock = self._ssl_context.wrap_socket(sock, server_hostname=self.address[0])
+        sock.settimeout(None)
+        connection.socket = sock
+    
+    def _frame(self, data: bytes) -> bytes:
+        """RFC 6587 프레이밍을 적용합니다."""
+        if self.framing == "octet":
+            # octet-counting: "MSG-LEN SP SYSLOG-MSG"
+            if data.endswith(b'\n'):
+                data = data[:-1]
+            return b'%d %s' % (len(data), data)
+        # non-transparent framing: LF로 메시지 구분
+        return data if data.endswith(b'\n') else data + b'\n'
+    
+    def queue(self, data: bytes):
+        """메시지를 버퍼에 추가하고, 버퍼가 가득 차면 전송합니다."""
+        if self.payload:
+            data = self.payload.apply([data], self.formatter)[0]
+        if self.sequence:
+            data = self.sequence.stamp(data)
+        framed = self._frame(data)
+        self.pending.append(framed)
+        self.pending_bytes += len(framed)
+        if self.pending_bytes >= self.buffer_size:
+            self.flush()
+    
+    def flush(self) -> int:
+        """버퍼에 쌓인 메시지를 다음 연결로 한 번에 전송하고 전송 성공 수를 반환합니다."""
+        if not self.pending:
+            return 0
+        pending = self.pending
+        self.pending = []
+        self.pending_bytes = 0
+        return self._write(pending)
+    
+    def send(self, data: bytes) -> bool:
+        """메시지 하나를 즉시 전송합니다."""
+        if self.payload:
+            data = self.payload.apply([data], self.formatter)[0]
+        if self.sequence:
+            data = self.sequence.stamp(data)
+        return self._write([self._frame(data)]) == 1
+    
+    def send_many(self, datagrams: List[bytes]) -> int:
+        """메시지 목록을 buffer_size 단위로 묶어 전송하고 전송 성공 수를 반환합니다."""
+        if self.payload:
+            datagrams = self.payload.apply(datagrams, self.formatter)
+        if self.sequence:
+            datagrams = self.sequence.stamp_many(datagrams)
+        sent = 0
+        for data in datagrams:
+            framed = self._frame(data)
+            self.pending.append(framed)
+            self.pending_bytes += len(framed)
+            if self.pending_bytes >= self.buffer_size:
+                sent += self.flush()
+        return sent + self.flush()
+    
+    def _write(self, frames: List[bytes]) -> int:
+        """프레임 목록을 라운드로빈으로 선택한 연결에 한 번에 쓰고 전송 성공 수를 반환합니다."""
+        connection = self.connections[self._next]
+        self._next = (self._next + 1) % len(self.connections)
+        payload = b''.join(frames)
+        
+        for attempt in range(2):
+            written = 0
+            try:
+                if connection.socket is None:
+                    self._open(connection)
+                    connection.reconnects += 1
+                started = time.perf_counter_ns()
+                # sendall은 실패 시 쓴 바이트 수를 알려 주지 않으므로 send를 반복
+                send = connection.socket.send
+                view = memoryview(payload)
+                while written < len(payload):
+                    written += send(view[written:])
+                latency_ns = time.perf_counter_ns() - started
+                connection.send_time += latency_ns / 1e9
+                if self.metrics:
+                    self.metrics.record_send(latency_ns, len(frames), len(payload))
+            except (ConnectionError, ssl.SSLError, socket.timeout, OSError) as e:
+                if self.metrics:
+                    self.metrics.record_error(e.errno or 0)
+                connection.errors += 1
+                self._close_connection(connection)
+                if written == 0 and attempt == 0:
+                    # 아무것도 쓰지 못함: 재연결 후 한 번 재전송
+                    continue
+                # 일부만 쓰임: 재전송하면 앞부분이 중복되므로 끝까지 쓴 프레임만 성공으로 셈
+                delivered = 0
+                for frame in frames:
+                    if written < len(frame):
+                        break
+                    written -= len(frame)
+                    delivered += 1
+                self._record_write(connection, frames[:delivered])
+                self.failed += len(frames) - delivered
+                return delivered
+            self._record_write(connection, frames)
+            return len(frames)
+        return 0
+    
+    def _record_write(self, connection: _PooledConnection, frames: List[bytes]):
+        """끝까지 쓴 프레임을 연결/풀 통계에 반영합니다."""
+        if not frames:
+            return
+        nbytes = sum(map(len, frames))
+        self.syscalls += 1
+        connection.writes += 1
+        connection.messages += len(frames)
+        connection.bytes_sent += nbytes
+        self.packets_sent += len(frames)
+        self.bytes_sent += nbytes
+    
+    def _close_connection(self, connection: _PooledConnection):
+        if connection.socket is not None:
+            try:
+                connection.socket.close()
+            except OSError:
+                pass
+            connection.socket = None
+    
+    def connection_stats(self) -> List[Dict[str, Any]]:
+        """연결별 통계 목록을 반환합니다."""
+        return [connection.stats() for connection in self.connections]
+    
+    def close(self):
+        """남은 메시지를 전송하고 모든 연결을 닫습니다."""
+        try:
+            self.flush()
+        finally:
+            for connection in self.connections:
+                self._close_connection(connection)
+
+def print_datagram_stats(transmitter, indent: str = "   "):
+    """UDP 데이터그램 묶음/IP 단편화 통계를 출력합니다 (해당 기능을 사용했을 때만)."""
+    if not isinstance(transmitter, UDPBatchTransmitter):
+        return
+    if transmitter.packer:
+        print(f"{indent}📦 데이터그램: {transmitter.datagrams_sent}개 "
+              f"(데이터그램당 메시지 {transmitter.packets_sent / max(transmitter.datagrams_sent, 1):.1f}개, "
+              f"최대 {transmitter.packer.max_size} bytes)")
+    if transmitter.fragmented:
+        print(f"{indent}🧩 IP 단편화 데이터그램: {transmitter.fragmented}개 ({transmitter.max_datagram} bytes 초과)")
+
+def print_connection_stats(stats: List[Dict[str, Any]], indent: str = "   "):
+    """TCP/TLS 연결별 처리량 통계를 출력합니다."""
+    for stat in stats:
+        elapsed = stat['elapsed'] or 1e-9
+        label = stat.get('label', f"연결 {stat['connection']}")
+        print(f"{indent}🔗 {label}: {stat['messages']}개 ({stat['messages']/elapsed:.1f} 로그/초, "
+              f"{stat['bytes']/elapsed/1024/1024:.2f} MB/초), 쓰기 {stat['writes']}회, "
+              f"재연결 {stat['reconnects']}회, 오류 {stat['errors']}회, 전송 대기 {stat['send_time']:.2f}초")
+
+class ReplayCorpus:
+    """미리 생성한 syslog 데이터그램 코퍼스 파일 (길이 접두 바이너리 형식).
+    
+    파일 형식:
+      헤더: magic(8바이트 b'UTMCORP1') + version(uint32) + 레코드 수(uint64), little-endian
+      레코드: 길이(uint32) + syslog 타임스탬프 오프셋(uint16, 없으면 0xFFFF) + 데이터그램 바이트
+    
+    재생 시 파일을 mmap(ACCESS_COPY)으로 매핑하므로 타임스탬프를 제자리에서 갱신해도
+    원본 파일은 바뀌지 않습니다.
+    """
+    
+    MAGIC = b'UTMCORP1'
+    VERSION = 1
+    HEADER = struct.Struct('<8sIQ')
+    RECORD = struct.Struct('<IH')
+    NO_TIMESTAMP = 0xFFFF
+    TIMESTAMP_LENGTH = 15  # "%b %d %H:%M:%S"
+    MONTHS = {month.encode() for month in ("Jan", "Feb", "Mar", "Apr", "May", "Jun",
+                                           "Jul", "Aug", "Sep", "Oct", "Nov", "Dec")}
+    
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, 'rb')
+        self.mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_COPY)
+        magic, version, count = self.HEADER.unpack_from(self.mmap, 0)
+        if magic != self.MAGIC or version != self.VERSION:
+            self.close()
+            raise ValueError(f"코퍼스 파일 형식이 아닙니다: {path}")
+        
+        # 레코드 인덱스 (데이터 시작 오프셋, 길이, 타임스탬프 절대 오프셋)
+        self.offsets = array('Q')
+        self.lengths = array('I')
+        self.timestamp_offsets = array('Q')
+        position = self.HEADER.size
+        unpack_from = self.RECORD.unpack_from
+        record_size = self.RECORD.size
+        for _ in range(count):
+            length, timestamp_offset = unpack_from(self.mmap, position)
+            position += record_size
+            self.offsets.append(position)
+            self.lengths.append(length)
+            if timestamp_offset != self.NO_TIMESTAMP:
+                self.timestamp_offsets.append(position + timestamp_offset)
+            else:
+                self.timestamp_offsets.append(0)
+            position += length
+        self.total_bytes = sum(self.lengths)
+        self.view = memoryview(self.mmap)
+    
+    def __len__(self):
+        return len(self.offsets)
+    
+    @classmethod
+    def write(cls, path: str, datagram_batches) -> Tuple[int, int]:
+        """데이터그램 배치 이터레이터를 코퍼스 파일로 저장합니다. (레코드 수, 데이터 바이트 수)를 반환합니다."""
+        count = 0
+        total_bytes = 0
+        pack = cls.RECORD.pack
+        with open(path, 'wb') as f:
+            f.write(cls.HEADER.pack(cls.MAGIC, cls.VERSION, 0))
+            for datagrams in datagram_batches:
+                for data in datagrams:
+                    timestamp_offset = data.find(b'>') + 1 if data.startswith(b'<') else 0
+                    # RFC 3164 타임스탬프("%b %d %H:%M:%S")가 있는 레코드만 갱신 대상 (RFC 5424 등은 제외)
+                    if data[timestamp_offset:timestamp_offset + 3] not in cls.MONTHS:
+                        timestamp_offset = cls.NO_TIMESTAMP
+                    if not 0 < timestamp_offset < cls.NO_TIMESTAMP:
+                        timestamp_offset = cls.NO_TIMESTAMP
+                    f.write(pack(len(data), timestamp_offset))
+                    f.write(data)
+                    count += 1
+                    total_bytes += len(data)
+            # 레코드 수를 헤더에 기록
+            f.seek(0)
+            f.write(cls.HEADER.pack(cls.MAGIC, cls.VERSION, count))
+        return count, total_bytes
+    
+    def rewrite_timestamps(self, start: int, end: int, timestamp: bytes):
+        """레코드 start..end-1의 syslog 타임스탬프를 제자리에서 덮어씁니다."""
+        view = self.view
+        length = self.TIMESTAMP_LENGTH
+        for position in self.timestamp_offsets[start:end]:
+            if position:
+                view[position:position + length] = timestamp
+    
+    def close(self):
+        """매핑과 파일을 닫습니다."""
+        if getattr(self, 'view', None) is not None:
+            self.view.release()
+            self.view = None
+        self.mmap.close()
+        self._file.close()
+
+# UTM 이벤트 필드 값 목록
+EVENT_TYPES = [
+    "firewall_block", "firewall_allow", "ips_alert", "antivirus_scan",
+    "web_filter", "email_filter", "vpn_connection", "vpn_disconnection",
+    "user_login", "user_logout", "admin_action", "system_alert"
+]
+THREAT_LEVELS = ["low", "medium", "high", "critical"]
+PROTOCOLS = ["TCP", "UDP", "HTTP", "HTTPS", "FTP", "SSH", "SMTP"]
+DESTINATION_PORTS = [80, 443, 22, 21, 25, 53, 3389]
+ACTIONS = ["block", "allow", "log", "alert"]
+
+GENERATOR_MODES = ["dict", "template", "numpy", "session"]
+
+# syslog facility 코드 (RFC 5424 6.2.1)
+FACILITIES = {
+    "kern": 0, "user": 1, "mail": 2, "daemon": 3, "auth": 4, "syslog": 5, "lpr": 6, "news": 7,
+    "uucp": 8, "cron": 9, "authpriv": 10, "ftp": 11,
+    "local0": 16, "local1": 17, "local2": 18, "local3": 19,
+    "local4": 20, "local5": 21, "local6": 22, "local7": 23,
+}
+
+# threat_level별 syslog severity (2: crit, 4: warning, 5: notice, 6: info)
+SYSLOG_SEVERITIES = {"low": 6, "medium": 5, "high": 4, "critical": 2}
+
+def parse_facility(facility) -> int:
+    """facility 이름(local0 등) 또는 숫자를 facility 코드로 변환합니다."""
+    if isinstance(facility, int):
+        code = facility
+    elif str(facility).isdigit():
+        code = int(facility)
+    else:
+        code = FACILITIES.get(str(facility).lower())
+        if code is None:
+            raise ValueError(f"알 수 없는 syslog facility: {facility}")
+    if not 0 <= code <= 23:
+        raise ValueError(f"syslog facility는 0~23이어야 합니다: {facility}")
+    return code
+
+class CachedClock:
+    """이벤트 타임스탬프 문자열을 tick 단위로 캐시하는 공유 시계입니다.
+    
+    시각 문자열(syslog/ISO 8601, 형식별 시각 필드)은 tick이 바뀐 뒤 처음 요청될 때 한 번만 렌더링하고,
+    같은 tick 안에서는 캐시된 값을 그대로 돌려줍니다. 상태는 (tick, 시각, 캐시) 튜플 하나를 통째로 교체하므로
+    여러 쓰레드가 잠금 없이 공유할 수 있습니다 (경합 시 같은 값을 한 번 더 렌더링할 뿐).
+    ISO 8601 소수 자릿수는 timespec을 따르며 기본은 datetime.isoformat()과 같은 마이크로초입니다.
+    마이크로초일 때 dict 이벤트의 timestamp(iso_time)는 초 단위 접두부만 캐시하고 소수부는 호출마다 채우며,
+    템플릿 시각 필드는 같은 자릿수로 tick 시작 시각을 씁니다.
+    """
+    
+    TIMESPECS = ('microseconds', 'milliseconds', 'seconds')
+    
+    def __init__(self, tick: float = 0.001, timespec: str = 'microseconds'):
+        if not tick > 0:
+            raise ValueError(f"시계 tick은 0보다 커야 합니다: {tick}")
+        if timespec not in self.TIMESPECS:
+            raise ValueError(f"지원하지 않는 타임스탬프 정밀도입니다: {timespec} (지원: {', '.join(self.TIMESPECS)})")
+        self.tick = tick
+        self.tick_ns = max(1000, round(tick * 1_000_000_000))  # datetime 해상도(1µs) 미만은 의미 없음
+        self.timespec = timespec
+        self._state = (None, None, {})
+        self._second = (None, None)  # (초, ISO 8601 초 단위 접두부)
+    
+    def _current(self) -> tuple:
+        """현재 tick의 (tick 번호, tick 시작 시각, 문자열 캐시)"""
+        tick = time.time_ns() // self.tick_ns
+        state = self._state
+        if state[0] != tick:
+            ns = tick * self.tick_ns
+            now = datetime.fromtimestamp(ns // 1_000_000_000).replace(microsecond=ns % 1_000_000_000 // 1000)
+            state = self._state = (tick, now, {})
+        return state
+    
+    def now(self) -> datetime:
+        """현재 tick의 시작 시각 (tick 단위로 내림)"""
+        return self._current()[1]
+    
+    def fields(self, formatter: 'LogFormatter') -> tuple:
+        """출력 형식의 시각 필드. 같은 형식 클래스끼리는 tick당 한 번만 렌더링합니다."""
+        _, now, cache = self._current()
+        key = type(formatter)
+        fields = cache.get(key)
+        if fields is None:
+            fields = cache[key] = formatter.time_fields(now, self.timespec)
+        return fields
+    
+    def iso_time(self) -> str:
+        """ISO 8601 시각 문자열 (dict 이벤트의 timestamp 필드)"""
+        if self.timespec == 'microseconds':
+            # datetime.now().isoformat()과 같은 자릿수: 초 단위 접두부만 캐시하고 마이크로초는 현재 값
+            ns = time.time_ns()
+            second = ns // 1_000_000_000
+            state = self._second
+            if state[0] != second:
+                state = self._second = (second, datetime.fromtimestamp(second).strftime("%Y-%m-%dT%H:%M:%S"))
+            return '%s.%06d' % (state[1], ns // 1000 % 1_000_000)
+        _, now, cache = self._current()
+        value = cache.get('iso')
+        if value is None:
+            value = cache['iso'] = now.isoformat(timespec=self.timespec)
+        return value
+    
+    def syslog_time(self) -> bytes:
+        """RFC 3164 헤더 시각 바이트 ("Mmm dd HH:MM:SS")"""
+        _, now, cache = self._current()
+        value = cache.get('syslog')
+        if value is None:
+            value = cache['syslog'] = now.strftime("%b %d %H:%M:%S").encode()
+        return value
+
+# 시계를 따로 지정하지 않은 형식/인코더가 공유하는 기본 시계
+DEFAULT_CLOCK = CachedClock()
+
+class LogFormatter:
+    """syslog 출력 형식의 기본 클래스입니다.
+    
+    형식마다 호스트명과 고정 헤더를 미리 렌더링한 event_type별 바이트 템플릿과, 인접한 가변 필드를
+    미리 인코딩한 조각(조합) 생성 함수를 제공합니다. 템플릿의 가변 자리는 slots 순서대로 채우며,
+    숫자 필드(source_port, session, bytes_sent, bytes_received)는 %d, 나머지는 %s 자리입니다.
+    PRI는 facility * 8 + severity(threat_level에서 결정)로 계산합니다.
+    템플릿에 고정한 시각은 공유 시계(CachedClock)의 tick이 바뀔 때만 다시 렌더링합니다.
+    """
+    
+    name = None
+    # 템플릿에 채울 필드 순서 (IP는 "a.b" 조각 두 개로 구성)
+    slots = ('priority', 's_high', 's_low', 'd_high', 'd_low', 'source_port', 'combo', 'user',
+             'session', 'bytes_sent', 'bytes_received', 's_high', 's_low', 'd_high', 'd_low')
+    
+    field_separator = b' '  # 확장 필드 구분자 (일련번호/채움 필드 앞에 넣음)
+    pad_overhead = 5  # pad()가 채움 텍스트 외에 더하는 바이트 수 (구분자 + 'pad=')
+    
+    def __init__(self, hostname: str, facility="local0", clock: CachedClock = None):
+        self.hostname = hostname
+        self.facility = parse_facility(facility)
+        self.clock = clock or DEFAULT_CLOCK
+        self._template_key = None
+        self._templates: List[bytes] = []
+        self._event_type_indexes = {event_type: i for i, event_type in enumerate(EVENT_TYPES)}
+    
+    def priority(self, threat_level: str) -> int:
+        """threat_level에 해당하는 syslog PRI 값"""
+        return self.facility * 8 + SYSLOG_SEVERITIES[threat_level]
+    
+    def severity(self, threat_level: str) -> str:
+        """형식 고유의 severity 표기 (CEF 헤더 등에서 사용)"""
+        return str(SYSLOG_SEVERITIES[threat_level])
+    
+    def record_priority(self, record: Dict[str, Any]) -> int:
+        """임의 dict의 PRI 값 (threat_level이 없거나 알 수 없으면 informational)"""
+        threat_level = record.get("threat_level")
+        severity = SYSLOG_SEVERITIES.get(threat_level, 6) if isinstance(threat_level, str) else 6
+        return self.facility * 8 + severity
+    
+    @staticmethod
+    def record_text(value: Any) -> str:
+        """필드 값을 텍스트로 변환합니다 (문자열/숫자는 그대로, 그 외(중첩, bool, None)는 JSON 표기)."""
+        if isinstance(value, str):
+            return value
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return str(value)
+        return json.dumps(value, ensure_ascii=False, default=str)
+    
+    @staticmethod
+    def record_key(key: Any, limit: int = None) -> str:
+        """필드 이름을 키-값 형식에 쓸 수 있는 문자(영숫자, _ . -)로 정리합니다."""
+        key = re.sub(r'[^A-Za-z0-9_.-]', '_', str(key)) or '_'
+        return key[:limit] if limit else key
+    
+    def time_fields(self, now: datetime, timespec: str = 'auto') -> tuple:
+        """템플릿에 고정할 시각 필드. 값이 바뀔 때만 템플릿을 다시 렌더링합니다."""
+        return now.strftime("%b %d %H:%M:%S"), now.isoformat(timespec=timespec)
+    
+    def build_template(self, event_type: str, time_fields: tuple) -> str:
+        """event_type 하나에 대한 템플릿 문자열을 생성합니다."""
+        raise NotImplementedError
+    
+    def encode_combo(self, port: int, protocol: str, threat_level: str, action: str) -> str:
+        """destination_port/protocol/threat_level/action 조합 조각"""
+        raise NotImplementedError
+    
+    def encode_user(self, user: int) -> str:
+        """user 조각 (session_id 숫자 바로 앞까지, session_id 숫자는 다음 %d 자리에 이어짐)"""
+        raise NotImplementedError
+    
+    def add_sequence(self, data: bytes, value: bytes) -> bytes:
+        """데이터그램의 마지막 줄에 일련번호 필드(value: b'STREAM:N')를 넣습니다.
+        
+        기본은 줄바꿈 앞에 seq= 확장 필드를 덧붙입니다 (CEF/LEEF/kv의 키-값 목록 끝).
+        """
+        return self.append_field(data, b'seq=' + value)
+    
+    def pad(self, data: bytes, filler: bytes) -> bytes:
+        """데이터그램에 채움 텍스트(filler)를 넣습니다 (--payload-size). 기본은 줄바꿈 앞의 pad= 확장 필드입니다.
+        
+        본문의 마지막 값 뒤가 아니라 전용 필드로 넣으므로 어떤 레코드든 형식이 유지됩니다.
+        """
+        return self.append_field(data, b'pad=' + filler)
+    
+    def append_field(self, data: bytes, field: bytes) -> bytes:
+        """줄바꿈 앞에 구분자와 확장 필드를 덧붙입니다."""
+        if data.endswith(b'\n'):
+            return b'%s%s%s\n' % (data[:-1], self.field_separator, field)
+        return b'%s%s%s' % (data, self.field_separator, field)
+    
+    def templates(self, now: datetime = None) -> List[bytes]:
+        """현재 시각의 event_type별 템플릿 목록 (EVENT_TYPES 순서)을 반환합니다.
+        
+        now를 생략하면 공유 시계의 현재 tick 시각 필드를 사용합니다.
+        """
+        key = self.time_fields(now) if now else self.clock.fields(self)
+        if key != self._template_key:
+            self._templates = [self.build_template(event_type, key).encode('utf-8') for event_type in EVENT_TYPES]
+            self._template_key = key
+        return self._templates
+    
+    def encode_record(self, record: Dict[str, Any]) -> bytes:
+        """임의의 dict 하나를 이 형식의 syslog 데이터그램으로 인코딩합니다 (send_log/send_log_batch용).
+        
+        템플릿을 쓰지 않으므로 호출자가 넣은 timestamp/message와 추가 키를 모두 보존합니다.
+        """
+        raise NotImplementedError
+    
+    def encode_events(self, events) -> List[bytes]:
+        """내부에서 생성한 이벤트 dict들을 템플릿으로 인코딩합니다 (dict 생성 모드용).
+        
+        generate_utm_event_generator 형식의 dict만 받으며, 시각은 공유 시계의 값을 쓰고 추가 키는 무시합니다.
+        임의의 dict는 encode_record로 인코딩합니다.
+        """
+        templates = self.templates()
+        slots = self.slots
+        datagrams = []
+        for event in events:
+            s_ip = event["source_ip"].split(".")
+            d_ip = event["destination_ip"].split(".")
+            fields = {
+                'priority': b'%d' % self.priority(event["threat_level"]),
+                'severity': self.severity(event["threat_level"]).encode(),
+                's_high': f"{s_ip[0]}.{s_ip[1]}".encode(), 's_low': f"{s_ip[2]}.{s_ip[3]}".encode(),
+                'd_high': f"{d_ip[0]}.{d_ip[1]}".encode(), 'd_low': f"{d_ip[2]}.{d_ip[3]}".encode(),
+                'source_port': event["source_port"],
+                'combo': self.encode_combo(event["destination_port"], event["protocol"],
+                                           event["threat_level"], event["action"]).encode('utf-8'),
+                'user': self.encode_user(int(event["user"][5:])).encode('utf-8'),
+                'session': int(event["session_id"][5:]),
+                'bytes_sent': event["bytes_sent"],
+                'bytes_received': event["bytes_received"],
+            }
+            template = templates[self._event_type_indexes[event["event_type"]]]
+            datagrams.append(template % tuple(fields[slot] for slot in slots))
+        return datagrams
+
+class Rfc3164JsonFormatter(LogFormatter):
+    """RFC 3164 헤더 + JSON 본문 (기존 기본 형식, json.dumps(ensure_ascii=False)와 같은 키 순서/구분자)"""
+    
+    name = "rfc3164-json"
+    pad_overhead = 11  # ', "pad": ""'
+    
+    def build_template(self, event_type: str, time_fields: tuple) -> str:
+        syslog_time, iso_time = time_fields
+        return (
+            f'<%s>{syslog_time} {self.hostname}: '
+            f'{{"timestamp": "{iso_time}", "event_type": "{event_type}", '
+            f'"source_ip": "%s.%s", "destination_ip": "%s.%s", '
+            f'"source_port": %d, "destination_port": %s, '
+            f'"user": "user_%s%d", '
+            f'"bytes_sent": %d, "bytes_received": %d, '
+            f'"message": "UTM event: {event_type} from %s.%s to %s.%s"}}\n'
+        )
+    
+    def encode_combo(self, port: int, protocol: str, threat_level: str, action: str) -> str:
+        return f'{port}, "protocol": "{protocol}", "threat_level": "{threat_level}", "action": "{action}"'
+    
+    def encode_user(self, user: int) -> str:
+        return f'{user}", "session_id": "sess_'
+    
+    def encode_record(self, record: Dict[str, Any]) -> bytes:
+        syslog_time = self.clock.fields(self)[0]
+        body = json.dumps(record, ensure_ascii=False, default=str)
+        return f'<{self.record_priority(record)}>{syslog_time} {self.hostname}: {body}\n'.encode('utf-8')
+    
+    def add_sequence(self, data: bytes, value: bytes) -> bytes:
+        return self.insert_key(data, b'seq', value) or super().add_sequence(data, value)
+    
+    def pad(self, data: bytes, filler: bytes) -> bytes:
+        if data.endswith(b'{}\n'):
+            filler += b'  '  # 빈 객체는 ', ' 구분자가 없으므로 목표 크기에 맞게 채움 텍스트로 보충
+        return self.insert_key(data, b'pad', filler) or super().pad(data, filler)
+    
+    @staticmethod
+    def insert_key(data: bytes, key: bytes, value: bytes) -> Optional[bytes]:
+        """JSON 객체의 마지막 키로 문자열 값을 넣어 본문이 유효한 JSON으로 남게 합니다 (객체가 없으면 None)."""
+        end = data.rfind(b'}')
+        if end < 0:
+            return None
+        separator = b'' if data[end - 1:end] == b'{' else b', '
+        return b'%s%s"%s": "%s"%s' % (data[:end], separator, key, value, data[end:])
+
+class Rfc5424Formatter(LogFormatter):
+    """RFC 5424 헤더 + 구조화 데이터(SD-ELEMENT) + 자유 텍스트 메시지"""
+    
+    name = "rfc5424"
+    SD_ID = "utm@32473"  # 32473: 문서/예제용 사설 기업 번호 (RFC 5612)
+    
+    def time_fields(self, now: datetime, timespec: str = 'auto') -> tuple:
+        # RFC 5424 TIMESTAMP는 시간대 오프셋이 필요
+        return (now.astimezone().isoformat(timespec=timespec),)
+    
+    def build_template(self, event_type: str, time_fields: tuple) -> str:
+        timestamp, = time_fields
+        return (
+            f'<%s>1 {timestamp} {self.hostname} utm-sender - {event_type} '
+            f'[{self.SD_ID} src="%s.%s" dst="%s.%s" spt="%d" %s %s%d" '
+            f'bytesSent="%d" bytesReceived="%d"] '
+            f'UTM event: {event_type} from %s.%s to %s.%s\n'
+        )
+    
+    def encode_combo(self, port: int, protocol: str, threat_level: str, action: str) -> str:
+        return f'dpt="{port}" proto="{protocol}" threatLevel="{threat_level}" action="{action}"'
+    
+    def encode_user(self, user: int) -> str:
+        return f'user="user_{user}" sessionId="sess_'
+    
+    def encode_record(self, record: Dict[str, Any]) -> bytes:
+        timestamp, = self.clock.fields(self)
+        # MSGID는 공백 없는 출력 가능 ASCII 32자 이내, SD-PARAM 값은 \ " ] 를 이스케이프
+        msgid = re.sub(r'[^!-~]', '_', self.record_text(record.get("event_type", "")))[:32] or '-'
+        params = ''.join(
+            ' %s="%s"' % (self.record_key(key, 32),
+                          re.sub(r'([\\"\]])', r'\\\1', self.record_text(value)).replace('\n', ' '))
+            for key, value in record.items() if key != "message"
+        )
+        data = f'[{self.SD_ID}{params}]' if params else '-'
+        message = self.record_text(record["message"]).replace('\n', ' ') if "message" in record else ''
+        return (f'<{self.record_priority(record)}>1 {timestamp} {self.hostname} utm-sender - {msgid} '
+                f'{data}{" " if message else ""}{message}\n').encode('utf-8')
+    
+    def add_sequence(self, data: bytes, value: bytes) -> bytes:
+        # 구조화 데이터 SD-ELEMENT의 첫 파라미터로 넣음 (자유 텍스트 MSG는 건드리지 않음)
+        marker = b'[' + self.SD_ID.encode()
+        position = data.rfind(marker)
+        if position < 0:
+            return super().add_sequence(data, value)
+        position += len(marker)
+        return b'%s seq="%s"%s' % (data[:position], value, data[position:])
+
+class CefFormatter(LogFormatter):
+    """ArcSight CEF (RFC 3164 헤더 + CEF:0|Vendor|Product|Version|SignatureID|Name|Severity|Extension)"""
+    
+    name = "cef"
+    # CEF severity는 0~10
+    CEF_SEVERITIES = {"low": 3, "medium": 5, "high": 8, "critical": 10}
+    slots = ('priority', 'severity') + LogFormatter.slots[1:]
+    
+    def severity(self, threat_level: str) -> str:
+        return str(self.CEF_SEVERITIES[threat_level])
+    
+    def build_template(self, event_type: str, time_fields: tuple) -> str:
+        syslog_time, _ = time_fields
+        name = event_type.replace("_", " ")
+        return (
+            f'<%s>{syslog_time} {self.hostname} '
+            f'CEF:0|GamjaPower|UTM Log Sender|2.0|{event_type}|{name}|%s|'
+            f'src=%s.%s dst=%s.%s spt=%d %s %s%d '
+            f'out=%d in=%d msg=UTM event: {event_type} from %s.%s to %s.%s\n'
+        )
+    
+    def encode_combo(self, port: int, protocol: str, threat_level: str, action: str) -> str:
+        return f'dpt={port} proto={protocol} cs1Label=threatLevel cs1={threat_level} act={action}'
+    
+    def encode_user(self, user: int) -> str:
+        return f'suser=user_{user} cs2Label=sessionId cs2=sess_'
+    
+    def encode_record(self, record: Dict[str, Any]) -> bytes:
+        syslog_time = self.clock.fields(self)[0]
+        
+        def header(value) -> str:
+            return self.record_text(value).replace('\\', '\\\\').replace('|', '\\|').replace('\n', ' ')
+        
+        event_type = record.get("event_type", "unknown")
+        threat_level = record.get("threat_level")
+        severity = self.CEF_SEVERITIES.get(threat_level, "Unknown") if isinstance(threat_level, str) else "Unknown"
+        extension = ' '.join(
+            '%s=%s' % (self.record_key(key),
+                       self.record_text(value).replace('\\', '\\\\').replace('=', '\\=').replace('\n', '\\n'))
+            for key, value in record.items()
+        )
+        return (f'<{self.record_priority(record)}>{syslog_time} {self.hostname} '
+                f'CEF:0|GamjaPower|UTM Log Sender|2.0|{header(event_type)}|'
+                f'{header(event_type).replace("_", " ")}|{severity}|{extension}\n').encode('utf-8')
+
+class LeefFormatter(LogFormatter):
+    """IBM QRadar LEEF 1.0 (RFC 3164 헤더 + LEEF:1.0|Vendor|Product|Version|EventID| + 탭 구분 속성)"""
+    
+    name = "leef"
+    field_separator = b'\t'
+    LEEF_SEVERITIES = {"low": 3, "medium": 5, "high": 8, "critical": 10}
+    
+    def build_template(self, event_type: str, time_fields: tuple) -> str:
+        syslog_time, _ = time_fields
+        return (
+            f'<%s>{syslog_time} {self.hostname} '
+            f'LEEF:1.0|GamjaPower|UTM Log Sender|2.0|{event_type}|'
+            f'src=%s.%s\tdst=%s.%s\tsrcPort=%d\t%s\t%s%d\t'
+            f'srcBytes=%d\tdstBytes=%d\tmsg=UTM event: {event_type} from %s.%s to %s.%s\n'
+        )
+    
+    def encode_combo(self, port: int, protocol: str, threat_level: str, action: str) -> str:
+        return (f'dstPort={port}\tproto={protocol}\tsev={self.LEEF_SEVERITIES[threat_level]}'
+                f'\tthreatLevel={threat_level}\taction={action}')
+    
+    def encode_user(self, user: int) -> str:
+        return f'usrName=user_{user}\tsessionId=sess_'
+    
+    def encode_record(self, record: Dict[str, Any]) -> bytes:
+        syslog_time = self.clock.fields(self)[0]
+        event_id = self.record_text(record.get("event_type", "unknown"))
+        event_id = event_id.replace('\\', '\\\\').replace('|', '\\|').replace('\n', ' ')
+        attributes = '\t'.join(
+            '%s=%s' % (self.record_key(key),
+                       self.record_text(value).replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n'))
+            for key, value in record.items()
+        )
+        return (f'<{self.record_priority(record)}>{syslog_time} {self.hostname} '
+                f'LEEF:1.0|GamjaPower|UTM Log Sender|2.0|{event_id}|{attributes}\n').encode('utf-8')
+
+class KeyValueFormatter(LogFormatter):
+    """FortiGate 스타일 key=value (RFC 3164 헤더 + date/time/devname + 공백 구분 필드)"""
+    
+    name = "kv"
+    pad_overhead = 7  # ' pad=""'
+    LEVELS = {"low": "information", "medium": "notice", "high": "warning", "critical": "critical"}
+    
+    def time_fields(self, now: datetime, timespec: str = 'auto') -> tuple:
+        return now.strftime("%b %d %H:%M:%S"), now.strftime("%Y-%m-%d"), now.strftime("%H:%M:%S")
+    
+    def build_template(self, event_type: str, time_fields: tuple) -> str:
+        syslog_time, date, clock = time_fields
+        return (
+            f'<%s>{syslog_time} {self.hostname} '
+            f'date={date} time={clock} devname="{self.hostname}" type="utm" subtype="{event_type}" '
+            f'srcip=%s.%s dstip=%s.%s srcport=%d %s %s%d '
+            f'sentbyte=%d rcvdbyte=%d msg="UTM event: {event_type} from %s.%s to %s.%s"\n'
+        )
+    
+    def encode_combo(self, port: int, protocol: str, threat_level: str, action: str) -> str:
+        return f'dstport={port} proto="{protocol}" level="{self.LEVELS[threat_level]}" action="{action}"'
+    
+    def encode_user(self, user: int) -> str:
+        return f'user="user_{user}" sessionid='
+    
+    def pad(self, data: bytes, filler: bytes) -> bytes:
+        return self.append_field(data, b'pad="%s"' % filler)
+    
+    def encode_record(self, record: Dict[str, Any]) -> bytes:
+        syslog_time, date, clock = self.clock.fields(self)
+        
+        def value_text(value) -> str:
+            # 숫자는 그대로, 나머지는 따옴표로 감쌈
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                return str(value)
+            text = self.record_text(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+            return f'"{text}"'
+        
+        fields = ''.join(f' {self.record_key(key)}={value_text(value)}' for key, value in record.items())
+        return (f'<{self.record_priority(record)}>{syslog_time} {self.hostname} '
+                f'date={date} time={clock} devname="{self.hostname}"{fields}\n').encode('utf-8')
+
+FORMATTERS = {formatter.name: formatter for formatter in (
+    Rfc3164JsonFormatter, Rfc5424Formatter, CefFormatter, LeefFormatter, KeyValueFormatter,
+)}
+
+class TemplateEventEncoder:
+    """event_type별로 미리 렌더링한 바이트 템플릿에 가변 필드만 채워 syslog 데이터그램을 생성합니다.
+    
+    이벤트마다 dict 생성과 json.dumps를 하지 않습니다. 가변 필드 값은 미리 인코딩한 바이트 조각
+    풀에서 청크 단위로 한 번에 추출하고, 템플릿의 %s 자리에 채웁니다.
+    템플릿과 조각은 출력 형식(LogFormatter)이 제공하며, 출력은 dict 모드와 같은 형식입니다.
+    """
+    
+    chunk_size = 1024  # encode_batch 1회당 생성할 이벤트 수
+    CLOCK_CHECK = 1024  # 템플릿 시각을 갱신하는 이벤트 간격 (청크가 이보다 크면 청크 도중에도 갱신)
+    
+    def __init__(self, hostname: str, rng=None, formatter: LogFormatter = None):
+        self.hostname = hostname
+        self.rng = rng or random
+        self.formatter = formatter or Rfc3164JsonFormatter(hostname)
+        formatter = self.formatter
+        
+        # 미리 인코딩한 필드 조각 풀 (균등 분포를 유지하도록 인접한 필드는 조합으로 미리 생성)
+        self._octet_pairs = [b'%d.%d' % (a, b) for a in range(1, 255) for b in range(1, 255)]
+        # 숫자 필드는 조각 풀 대신 범위에서 바로 추출해 %d로 채움 (큰 바이트 객체 풀은 캐시 적중률을 떨어뜨림)
+        self._source_ports = range(1024, 65536)
+        # destination_port, protocol, threat_level, action 조합과, 같은 인덱스의 PRI/severity
+        combos = [(port, protocol, threat, action)
+                  for port in DESTINATION_PORTS for protocol in PROTOCOLS for threat in THREAT_LEVELS for action in ACTIONS]
+        self._port_protocol_threat_action = [formatter.encode_combo(*combo).encode('utf-8') for combo in combos]
+        self._combo_priorities = [b'%d' % formatter.priority(threat) for _, _, threat, _ in combos]
+        self._combo_severities = [formatter.severity(threat).encode() for _, _, threat, _ in combos]
+        self._combo_indexes = range(len(combos))
+        # event_type과 조합을 한 번에 추출하는 결합 인덱스 (j -> event_type j // 조합 수, 조합 j % 조합 수)
+        self._event_combo_indexes = range(len(EVENT_TYPES) * len(combos))
+        self._event_combo_events = [j // len(combos) for j in self._event_combo_indexes]
+        self._event_combo_combos = [j % len(combos) for j in self._event_combo_indexes]
+        # user 조각 (user_1 ~ user_100, 인덱스는 user - 1)과 session_id 숫자
+        self._users = [formatter.encode_user(user).encode('utf-8') for user in range(1, 101)]
+        self._session_ids = range(100000, 1000000)
+        self._byte_counts = range(100, 1000001)
+        self._event_type_indexes = range(len(EVENT_TYPES))
+        self.event_cum_weights = None  # None이면 event_type 균등 분포
+        self._event_combo_cum_weights = None
+    
+    def set_event_weights(self, weights: Optional[List[float]]):
+        """event_type별 가중치(EVENT_TYPES 순서)를 설정합니다. None이면 균등 분포로 되돌립니다."""
+        self.event_cum_weights = list(itertools.accumulate(weights)) if weights else None
+        # 결합 인덱스의 가중치: event_type 가중치를 같은 event_type의 조합들에 그대로 적용 (조합은 균등)
+        self._event_combo_cum_weights = list(itertools.accumulate(
+            weight for weight in weights for _ in self._combo_indexes)) if weights else None
+    
+    def encode_batch(self, count: int) -> List[bytes]:
+        """count개의 인코딩된 syslog 데이터그램을 생성합니다."""
+        formatter = self.formatter
+        columns = self._draw_fields(count)
+        # 열(column)을 템플릿 자리 순서로 배치해 두고 이벤트별 튜플로 묶음
+        rows = zip(columns['event_type'], zip(*[columns[slot] for slot in formatter.slots]))
+        
+        datagrams = []
+        append = datagrams.append
+        # 큰 청크에서도 타임스탬프가 청크 시작 시각에 고정되지 않도록 CLOCK_CHECK개마다 템플릿 시각을 갱신
+        for _ in range(0, count, self.CLOCK_CHECK):
+            templates = formatter.templates()
+            for event_type, values in itertools.islice(rows, self.CLOCK_CHECK):
+                append(templates[event_type] % values)
+        return datagrams
+    
+    def _combo_columns(self, combo_indexes: List[int], columns: Dict[str, list]):
+        """조합 인덱스로부터 combo/priority(/severity) 열을 채웁니다."""
+        columns['combo'] = list(map(self._port_protocol_threat_action.__getitem__, combo_indexes))
+        columns['priority'] = list(map(self._combo_priorities.__getitem__, combo_indexes))
+        if 'severity' in self.formatter.slots:
+            columns['severity'] = list(map(self._combo_severities.__getitem__, combo_indexes))
+    
+    def _draw_fields(self, count: int) -> Dict[str, list]:
+        """count개 이벤트의 필드 열(column)을 필드 이름별로 추출합니다."""
+        # 필드별로 청크 전체의 랜덤 값을 한 번에 추출
+        choices = self.rng.choices
+        octet_pairs = choices(self._octet_pairs, k=count * 4)
+        byte_counts = choices(self._byte_counts, k=count * 2)
+        event_combos = choices(self._event_combo_indexes, cum_weights=self._event_combo_cum_weights, k=count)
+        columns = {
+            'event_type': list(map(self._event_combo_events.__getitem__, event_combos)),
+            's_high': octet_pairs[0::4], 's_low': octet_pairs[1::4],
+            'd_high': octet_pairs[2::4], 'd_low': octet_pairs[3::4],
+            'source_port': choices(self._source_ports, k=count),
+            'user': choices(self._users, k=count),
+            'session': choices(self._session_ids, k=count),
+            'bytes_sent': byte_counts[0::2], 'bytes_received': byte_counts[1::2],
+        }
+        self._combo_columns(list(map(self._event_combo_combos.__getitem__, event_combos)), columns)
+        return columns
+
+class NumpyEventEncoder(TemplateEventEncoder):
+    """NumPy로 배치 전체의 랜덤 필드를 열(column) 배열로 한 번에 추출하는 인코더입니다.
+    
+    모든 필드는 broadcasting된 범위로 integers()를 한 번 호출해 추출하고,
+    템플릿 조각 풀의 인덱스 계산도 벡터 연산으로 처리합니다.
+    """
+    
+    chunk_size = 50000
+    
+    # 열 순서: event_type, priority(사용하지 않음, PRI는 threat_level에서 결정), 출발지 옥텟 4개, 목적지 옥텟 4개, source_port,
+    # destination_port/protocol/threat_level/action 인덱스, user, session_id, bytes_sent, bytes_received
+    _COLUMN_RANGES = (
+        [(0, len(EVENT_TYPES)), (0, 192)] + [(1, 255)] * 8 + [(1024, 65536)]
+        + [(0, len(DESTINATION_PORTS)), (0, len(PROTOCOLS)), (0, len(THREAT_LEVELS)), (0, len(ACTIONS))]
+        + [(1, 101), (100000, 1000000), (100, 1000001), (100, 1000001)]
+    )
+    
+    def __init__(self, hostname: str, rng=None, formatter: LogFormatter = None, seed: int = None):
+        super().__init__(hostname, rng, formatter)
+        if seed is None:
+            # 시드가 없으면 random 모듈에서 파생 (random.seed()로 재현 가능)
+            seed = self.rng.getrandbits(64)
+        self.np_rng = np.random.default_rng(seed)
+        self._lows = np.array([low for low, _ in self._COLUMN_RANGES], dtype=np.int64)
+        self._highs = np.array([high for _, high in self._COLUMN_RANGES], dtype=np.int64)
+        self._event_probabilities = None
+    
+    def set_event_weights(self, weights: Optional[List[float]]):
+        super().set_event_weights(weights)
+        self._event_probabilities = np.asarray(weights, dtype=np.float64) / sum(weights) if weights else None
+    
+    def draw_columns(self, count: int) -> 'np.ndarray':
+        """count개 이벤트의 정수 필드를 (count, 열 개수) 배열로 한 번에 추출합니다."""
+        return self.np_rng.integers(self._lows, self._highs, size=(count, len(self._COLUMN_RANGES)))
+    
+    def _draw_fields(self, count: int) -> Dict[str, list]:
+        """열 배열에서 템플릿 조각 풀 인덱스를 벡터 연산으로 계산합니다."""
+        c = self.draw_columns(count)
+        
+        def pick(pool, indexes):
+            return list(map(pool.__getitem__, indexes.tolist()))
+        
+        octet_pairs = (c[:, 2:10:2] - 1) * 254 + (c[:, 3:10:2] - 1)
+        combo_indexes = ((c[:, 11] * len(PROTOCOLS) + c[:, 12]) * len(THREAT_LEVELS) + c[:, 13]) * len(ACTIONS) + c[:, 14]
+        event_types = c[:, 0]
+        if self._event_probabilities is not None:
+            event_types = self.np_rng.choice(len(EVENT_TYPES), size=count, p=self._event_probabilities)
+        columns = {
+            'event_type': event_types.tolist(),
+            's_high': pick(self._octet_pairs, octet_pairs[:, 0]), 's_low': pick(self._octet_pairs, octet_pairs[:, 1]),
+            'd_high': pick(self._octet_pairs, octet_pairs[:, 2]), 'd_low': pick(self._octet_pairs, octet_pairs[:, 3]),
+            'source_port': c[:, 10].tolist(),
+            'user': pick(self._users, c[:, 15] - 1),
+            'session': c[:, 16].tolist(),
+            'bytes_sent': c[:, 17].tolist(), 'bytes_received': c[:, 18].tolist(),
+        }
+        self._combo_columns(combo_indexes.tolist(), columns)
+        return columns
+    
+    def generate_events(self, count: int):
+        """count개의 UTM 이벤트 dict를 생성합니다 (generate_utm_event_batch와 같은 형식)."""
+        iso_time = self.formatter.clock.iso_time
+        for row in self.draw_columns(count).tolist():
+            event_type = EVENT_TYPES[row[0]]
+            source_ip = f"{row[2]}.{row[3]}.{row[4]}.{row[5]}"
+            dest_ip = f"{row[6]}.{row[7]}.{row[8]}.{row[9]}"
+            yield {
+                "timestamp": iso_time(),
+                "event_type": event_type,
+                "source_ip": source_ip,
+                "destination_ip": dest_ip,
+                "source_port": row[10],
+                "destination_port": DESTINATION_PORTS[row[11]],
+                "protocol": PROTOCOLS[row[12]],
+                "threat_level": THREAT_LEVELS[row[13]],
+                "action": ACTIONS[row[14]],
+                "user": f"user_{row[15]}",
+                "session_id": f"sess_{row[16]}",
+                "bytes_sent": row[17],
+                "bytes_received": row[18],
+                "message": f"UTM event: {event_type} from {source_ip} to {dest_ip}"
+            }
+
+# 목적지 포트 인기 순위 (Zipf 분포의 순위 순서)와 포트별 프로토콜
+PORT_POPULARITY = [443, 80, 53, 22, 25, 3389, 21]
+PORT_PROTOCOLS = {80: "HTTP", 443: "HTTPS", 22: "SSH", 21: "FTP", 25: "SMTP", 53: "UDP", 3389: "TCP"}
+# event_type별 action
+EVENT_ACTIONS = {
+    "firewall_block": "block", "firewall_allow": "allow", "ips_alert": "alert", "antivirus_scan": "log",
+    "web_filter": "allow", "email_filter": "log", "vpn_connection": "allow", "vpn_disconnection": "log",
+    "user_login": "allow", "user_logout": "log", "admin_action": "log", "system_alert": "alert",
+}
+# 세션 시나리오: (이름, 가중치, 시작 이벤트, 중간 이벤트 후보(앞쪽일수록 빈번), 종료 이벤트)
+SESSION_SCENARIOS = [
+    ("vpn", 3, "vpn_connection",
+     ["firewall_allow", "web_filter", "email_filter", "antivirus_scan", "ips_alert"], "vpn_disconnection"),
+    ("login", 2, "user_login", ["admin_action", "firewall_allow", "system_alert"], "user_logout"),
+    ("flow", 5, None, ["firewall_allow", "firewall_block", "web_filter", "ips_alert"], None),
+]
+# threat_level 분포 (low가 대부분)
+THREAT_WEIGHTS = [60, 25, 10, 5]
+
+def zipf_cum_weights(n: int, skew: float) -> List[float]:
+    """순위 k(1..n)의 가중치가 1/k^skew인 Zipf 유사 분포의 누적 가중치 (random.choices용)"""
+    return list(itertools.accumulate(1.0 / k ** skew for k in range(1, n + 1)))
+
+class SessionEventEncoder(TemplateEventEncoder):
+    """유한한 라이브 세션 풀을 유지하며 상관관계가 있는 이벤트 시퀀스를 생성하는 인코더입니다.
+    
+    세션마다 출발지/목적지 호스트, 사용자, 포트, session_id를 고정하고 시나리오 순서
+    (vpn_connection → 트래픽 → vpn_disconnection, user_login → ... → user_logout)대로 이벤트를 냅니다.
+    호스트, 사용자, 포트는 지정한 카디널리티 안에서 Zipf 유사 분포로 뽑습니다.
+    세션 상태는 슬롯별 array 열(column)에 저장하고, 출력은 부모 클래스의 형식 템플릿을 그대로 사용합니다.
+    """
+    
+    def __init__(self, hostname: str, rng=None, formatter: LogFormatter = None, sessions: int = 10000,
+                 hosts: int = 1000, dest_hosts: int = 5000, users: int = 100, skew: float = 1.1,
+                 session_length: float = 8.0):
+        super().__init__(hostname, rng, formatter)
+        rng = self.rng
+        self.session_length = session_length
+        
+        # 호스트 IP 조각 풀: 출발지는 내부 10.0.0.0/8, 목적지는 외부 주소
+        self._src_highs = [b'10.%d' % rng.randint(0, 255) for _ in range(hosts)]
+        self._src_lows = [b'%d.%d' % (rng.randint(0, 255), rng.randint(1, 254)) for _ in range(hosts)]
+        self._dst_highs = [b'%d.%d' % (rng.randint(1, 223), rng.randint(0, 255)) for _ in range(dest_hosts)]
+        self._dst_lows = [b'%d.%d' % (rng.randint(0, 255), rng.randint(1, 254)) for _ in range(dest_hosts)]
+        self._src_weights = zipf_cum_weights(hosts, skew)
+        self._dst_weights = zipf_cum_weights(dest_hosts, skew)
+        self._user_weights = zipf_cum_weights(users, skew)
+        self._port_weights = zipf_cum_weights(len(PORT_POPULARITY), skew)
+        self._host_range, self._dest_range, self._user_range = range(hosts), range(dest_hosts), range(1, users + 1)
+        self._users = [self.formatter.encode_user(user).encode('utf-8') for user in self._user_range]
+        
+        # 포트 순위 -> (destination_port, protocol) 조합 인덱스 기준값 (threat/action은 세션/이벤트별로 더함)
+        self._port_bases = [DESTINATION_PORTS.index(port) * len(PROTOCOLS) + PROTOCOLS.index(PORT_PROTOCOLS[port])
+                            for port in PORT_POPULARITY]
+        self._event_actions = [ACTIONS.index(EVENT_ACTIONS[event_type]) for event_type in EVENT_TYPES]
+        self._scenarios = [
+            (EVENT_TYPES.index(start) if start else None,
+             [EVENT_TYPES.index(event_type) for event_type in middle],
+             zipf_cum_weights(len(middle), skew),
+             EVENT_TYPES.index(end) if end else None)
+            for _, _, start, middle, end in SESSION_SCENARIOS
+        ]
+        self._scenario_weights = [weight for _, weight, _, _, _ in SESSION_SCENARIOS]
+        
+        # 세션 슬롯별 상태 열 (번호 값은 array, 인코딩된 고정 필드 조각은 슬롯별 튜플로 캐시)
+        self._src = array('I', bytes(4 * sessions))
+        self._dst = array('I', bytes(4 * sessions))
+        self._session_id = array('I', bytes(4 * sessions))
+        self._combo_base = array('H', bytes(2 * sessions))  # (port, protocol, threat) 조합 인덱스
+        self._step = array('H', bytes(2 * sessions))
+        self._scripts: List[tuple] = [()] * sessions  # 세션의 event_type 인덱스 순서
+        self._fields: List[tuple] = [()] * sessions   # (s_high, s_low, d_high, d_low, source_port, user, session)
+        self._slot_range = range(sessions)
+        self._prepared: List[tuple] = []
+        self._next_session_id = rng.randrange(100000, 1000000)
+        for slot in self._slot_range:
+            self._open_session(slot)
+    
+    def _prepare_sessions(self, count: int):
+        """새 세션 count개의 속성을 필드별로 한 번에 추출해 둡니다 (세션 교체 비용을 줄이기 위함)."""
+        rng = self.rng
+        choices = rng.choices
+        scenarios = choices(self._scenarios, weights=self._scenario_weights, k=count)
+        users = choices(self._user_range, cum_weights=self._user_weights, k=count)
+        port_bases = choices(self._port_bases, cum_weights=self._port_weights, k=count)
+        threats = choices(range(len(THREAT_LEVELS)), weights=THREAT_WEIGHTS, k=count)
+        srcs = choices(self._host_range, cum_weights=self._src_weights, k=count)
+        dsts = choices(self._dest_range, cum_weights=self._dst_weights, k=count)
+        source_ports = choices(self._source_ports, k=count)
+        encoded_users = self._users
+        threat_count = len(THREAT_LEVELS)
+        
+        prepared = []
+        for (start, middle, middle_weights, end), user, port_base, threat, src, dst, source_port in zip(
+                scenarios, users, port_bases, threats, srcs, dsts, source_ports):
+            script = choices(middle, cum_weights=middle_weights, k=1 + int(rng.expovariate(1.0 / self.session_length)))
+            if start is not None:
+                script.insert(0, start)
+            if end is not None:
+                script.append(end)
+            session_id = self._next_session_id
+            self._next_session_id = session_id + 1 if session_id < 999999 else 100000
+            fields = (self._src_highs[src], self._src_lows[src], self._dst_highs[dst], self._dst_lows[dst], source_port,
+                      encoded_users[user - 1], session_id)
+            prepared.append((tuple(script), port_base * threat_count + threat, src, dst, session_id, fields))
+        self._prepared = prepared
+    
+    def _open_session(self, slot: int):
+        """슬롯에 새 세션을 만듭니다 (종료된 세션 자리를 재사용)."""
+        if not self._prepared:
+            self._prepare_sessions(1024)
+        script, combo_base, src, dst, session_id, fields = self._prepared.pop()
+        self._scripts[slot] = script
+        self._combo_base[slot] = combo_base
+        self._src[slot] = src
+        self._dst[slot] = dst
+        self._session_id[slot] = session_id
+        self._fields[slot] = fields
+        self._step[slot] = 0
+    
+    def _draw_fields(self, count: int) -> Dict[str, list]:
+        """라이브 세션을 골라 각 세션의 다음 이벤트를 내고, 끝난 세션은 새 세션으로 교체합니다."""
+        steps, scripts, combo_base, slot_fields = self._step, self._scripts, self._combo_base, self._fields
+        event_actions = self._event_actions
+        action_count = len(ACTIONS)
+        open_session = self._open_session
+        
+        event_types, combos, fields = [], [], []
+        for slot in self.rng.choices(self._slot_range, k=count):
+            step = steps[slot]
+            script = scripts[slot]
+            event_type = script[step]
+            event_types.append(event_type)
+            combos.append(combo_base[slot] * action_count + event_actions[event_type])
+            fields.append(slot_fields[slot])
+            if step + 1 < len(script):
+                steps[slot] = step + 1
+            else:
+                open_session(slot)
+        
+        s_high, s_low, d_high, d_low, source_port, user, session = zip(*fields) if fields else [()] * 7
+        byte_counts = self.rng.choices(self._byte_counts, k=count * 2)
+        columns = {
+            'event_type': event_types,
+            's_high': s_high, 's_low': s_low, 'd_high': d_high, 'd_low': d_low,
+            'source_port': source_port, 'user': user, 'session': session,
+            'bytes_sent': byte_counts[0::2], 'bytes_received': byte_counts[1::2],
+        }
+        self._combo_columns(combos, columns)
+        return columns
+
+ENCODER_CLASSES = {
+    'template': TemplateEventEncoder,
+    'numpy': NumpyEventEncoder,
+    'session': SessionEventEncoder,
+}
+
+def load_config_file(path: str) -> Any:
+    """JSON/YAML/TOML 설정 파일을 읽습니다 (확장자로 형식 판단)."""
+    file_path = Path(path)
+    suffix = file_path.suffix.lower()
+    if suffix in ('.yaml', '.yml'):
+        try:
+            import yaml
+        except ImportError:
+            raise ValueError("YAML 파일을 읽으려면 PyYAML이 필요합니다 (pip install pyyaml)")
+        with open(file_path, 'r', encoding='utf-8') as f:
+            return yaml.safe_load(f)
+    if suffix == '.toml':
+        try:
+            import tomllib
+        except ImportError:
+            try:
+                import tomli as tomllib
+            except ImportError:
+                raise ValueError("TOML 파일을 읽으려면 Python 3.11 이상 또는 tomli가 필요합니다")
+        with open(file_path, 'rb') as f:
+            return tomllib.load(f)
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+class RateProfile:
+    """경과 시간(초)에 따른 목표 EPS 스케줄입니다.
+    
+    지원 유형:
+      - constant:    {"type": "constant", "rate": 1000}
+      - linear:      {"type": "linear", "start": 1000, "end": 50000, "duration": 300}
+                     또는 {"type": "linear", "start": 1000, "slope": 100} (초당 EPS 증가량)
+      - step:        {"type": "step", "steps": [{"at": 0, "rate": 1000}, {"at": 60, "rate": 5000}]}
+      - exponential: {"type": "exponential", "start": 100, "factor": 2, "interval": 60}
+    모든 유형에 "max"(최대 EPS)를 지정할 수 있습니다.
+    """
+    
+    KINDS = ("constant", "linear", "step", "exponential")
+    
+    def __init__(self, kind: str, start: float = 0.0, end: float = None, duration: float = None,
+                 slope: float = None, steps: List[Tuple[float, float]] = None, factor: float = 2.0,
+                 interval: float = 60.0, max_rate: float = None):
+        if kind not in self.KINDS:
+            raise ValueError(f"지원하지 않는 램프 유형입니다: {kind} (지원: {', '.join(self.KINDS)})")
+        self.kind = kind
+        self.start = float(start)
+        self.end = end
+        self.duration = duration
+        self.slope = slope
+        self.steps = sorted(steps or [(0.0, self.start)])
+        self.factor = float(factor)
+        self.interval = float(interval)
+        self.max_rate = max_rate
+        
+        # rate_at에서 ZeroDivisionError나 음수 EPS가 나지 않도록 시작 시 검증
+        for name, value in (("start", start), ("end", end), ("max", max_rate)):
+            if value is not None and float(value) < 0:
+                raise ValueError(f"램프의 {name}은(는) 0 이상이어야 합니다: {value}")
+        if duration is not None and float(duration) < 0:
+            raise ValueError(f"램프의 duration은 0 이상이어야 합니다: {duration}")
+        if any(at < 0 or rate < 0 for at, rate in self.steps):
+            raise ValueError("step 램프의 at과 rate는 0 이상이어야 합니다")
+        if kind == "exponential" and (self.factor <= 0 or self.interval <= 0):
+            raise ValueError(f"exponential 램프의 factor와 interval은 0보다 커야 합니다 "
+                             f"(factor={factor}, interval={interval})")
+        
+        if kind == "linear" and slope is None:
+            if end is None or not duration:
+                raise ValueError("linear 램프에는 end와 duration 또는 slope가 필요합니다")
+            self.slope = (float(end) - self.start) / float(duration)
+    
+    @classmethod
+    def constant(cls, rate: float) -> 'RateProfile':
+        """고정 EPS 프로파일을 생성합니다."""
+        return cls("constant", start=rate)
+    
+    @classmethod
+    def from_increase_rate(cls, delay: float, increase_rate: float = 1.0) -> 'RateProfile':
+        """기존 --delay/--increase-rate 옵션을 선형 램프로 변환합니다.
+        
+        기존 동작: 간격 = delay / (1 + (increase_rate - 1) * 경과분)
+        즉 EPS = (1 / delay) * (1 + (increase_rate - 1) * 경과초 / 60)
+        """
+        start = 1.0 / delay
+        if increase_rate <= 1.0:
+            return cls.constant(start)
+        return cls("linear", start=start, slope=start * (increase_rate - 1) / 60)
+    
+    @classmethod
+    def from_dict(cls, spec: Dict[str, Any]) -> 'RateProfile':
+        """딕셔너리 명세로부터 프로파일을 생성합니다."""
+        kind = spec.get("type", "constant")
+        steps = None
+        if "steps" in spec:
+            steps = []
+            for step in spec["steps"]:
+                if isinstance(step, dict):
+                    steps.append((float(step["at"]), float(step["rate"])))
+                else:
+                    steps.append((float(step[0]), float(step[1])))
+        return cls(
+            kind,
+            start=spec.get("start", spec.get("rate", steps[0][1] if steps else 0.0)),
+            end=spec.get("end"),
+            duration=spec.get("duration"),
+            slope=spec.get("slope"),
+            steps=steps,
+            factor=spec.get("factor", 2.0),
+            interval=spec.get("interval", 60.0),
+            max_rate=spec.get("max"),
+        )
+    
+    @classmethod
+    def load(cls, path: str) -> 'RateProfile':
+        """램프 프로파일 파일(JSON/YAML/TOML)을 읽습니다."""
+        return cls.from_dict(load_config_file(path))
+    
+    def rate_at(self, elapsed: float) -> float:
+        """경과 시간(초)의 목표 EPS를 반환합니다."""
+        if self.kind == "constant":
+            rate = self.start
+        elif self.kind == "linear":
+            if self.duration:
+                elapsed = min(elapsed, float(self.duration))
+            rate = self.start + self.slope * elapsed
+        elif self.kind == "step":
+            rate = self.steps[0][1]
+            for at, step_rate in self.steps:
+                if elapsed < at:
+                    break
+                rate = step_rate
+        else:
+            try:
+                rate = self.start * self.factor ** (elapsed / self.interval)
+            except OverflowError:
+                rate = math.inf if self.start else 0.0
+        if self.max_rate is not None:
+            rate = min(rate, float(self.max_rate))
+        return max(rate, 0.0)
+    
+    def describe(self) -> str:
+        """프로파일 요약 문자열을 반환합니다."""
+        if self.kind == "constant":
+            return f"고정 {self.start:,.1f} EPS"
+        if self.kind == "linear":
+            text = f"선형 {self.start:,.1f} EPS에서 초당 {self.slope:+,.1f} EPS"
+            if self.duration:
+                text += f" ({self.duration}초 후 {self.rate_at(float(self.duration)):,.1f} EPS 유지)"
+            return text
+        if self.kind == "step":
+            return "계단 " + " → ".join(f"{at:g}s:{rate:,.0f}" for at, rate in self.steps)
+        return f"지수 {self.start:,.1f} EPS에서 {self.interval:g}초마다 {self.factor:g}배"
+
+class TokenBucket:
+    """고해상도 토큰 버킷. 목표 EPS를 유지하도록 한 번에 보낼 이벤트 수를 결정합니다.
+    
+    토큰은 perf_counter 기준으로 연속적으로 적립되며, burst_interval 분량이 모일 때까지
+    기다렸다가 한 번에 내보냅니다 (배치 전송 효율 유지). 전송이 잠시 밀려도 따라잡을 수 있도록
+    최대 4 burst 분량까지 적립합니다.
+    """
+    
+    MAX_WAIT = 0.1  # 중단/속도 변경을 확인하기 위한 최대 대기 시간 (초)
+    
+    def __init__(self, rate: float, burst_interval: float = 0.01):
+        self.burst_interval = burst_interval
+        self.tokens = 0.0
+        self.last = time.perf_counter()
+        self.set_rate(rate)
+    
+    def set_rate(self, rate: float):
+        """목표 EPS를 변경합니다."""
+        self.rate = max(float(rate), 0.0)
+        self.burst = max(1, int(self.rate * self.burst_interval))
+        self.capacity = self.burst * 4
+    
+    def _refill(self) -> float:
+        now = time.perf_counter()
+        self.tokens = min(self.capacity, self.tokens + (now - self.last) * self.rate)
+        self.last = now
+        return self.tokens
+    
+    def wait_time(self, max_count: int) -> float:
+        """min(max_count, burst)개의 토큰이 모일 때까지 남은 시간(초, 최대 MAX_WAIT)을 반환합니다."""
+        target = max(1, min(max_count, self.burst))
+        tokens = self._refill()
+        if tokens >= target:
+            return 0.0
+        if self.rate <= 0:
+            return self.MAX_WAIT
+        return min((target - tokens) / self.rate, self.MAX_WAIT)
+    
+    def take(self, max_count: int) -> int:
+        """현재 적립된 토큰을 최대 max_count개까지 즉시 획득하고 그 개수를 반환합니다."""
+        count = min(int(self._refill()), max_count)
+        self.tokens -= count
+        return count
+    
+    def acquire(self, max_count: int) -> int:
+        """토큰을 기다렸다가 최대 max_count개까지 획득하고 그 개수를 반환합니다.
+        
+        MAX_WAIT 안에 토큰이 모이지 않으면 0을 반환할 수 있습니다.
+        """
+        wait = self.wait_time(max_count)
+        if wait > 0:
+            time.sleep(wait)
+        return self.take(max_count)
+
+class HttpCounterFeedback:
+    """HTTP 엔드포인트에서 수신 측 누적 카운터를 읽습니다 (적응형 속도 제어의 피드백).
+    
+    응답이 JSON이면 metric 키(점으로 구분한 경로)의 값을, Prometheus 텍스트 형식이면
+    metric 이름의 모든 샘플 합을 사용합니다. 내장 수신기(--sink --metrics-port)는 JSON으로 응답합니다.
+    """
+    
+    def __init__(self, url: str, metric: str = 'messages', timeout: float = 0.5):
+        self.url = url
+        self.metric = metric
+        self.timeout = timeout
+    
+    def read(self) -> float:
+        """현재 누적 카운터 값을 반환합니다."""
+        with urlopen(self.url, timeout=self.timeout) as response:
+            body = response.read().decode('utf-8')
+        try:
+            value = json.loads(body)
+        except ValueError:
+            return self._parse_prometheus(body)
+        for key in self.metric.split('.'):
+            value = value[key]
+        return float(value)
+    
+    def _parse_prometheus(self, body: str) -> float:
+        total = 0.0
+        found = False
+        for line in body.splitlines():
+            if not line or line.startswith('#'):
+                continue
+            name, _, rest = line.partition(' ')
+            if name.split('{')[0] == self.metric:
+                total += float(rest.split()[0])
+                found = True
+        if not found:
+            raise KeyError(f"{self.url}에 {self.metric} 지표가 없습니다")
+        return total
+    
+    def __str__(self):
+        return f"{self.url} ({self.metric})"
+
+class AdaptiveRateController:
+    """수신 측 피드백으로 최대 지속 가능 EPS를 찾는 AIMD 속도 제어기입니다.
+    
+    RateProfile과 같은 rate_at()/describe()를 제공하므로 _send_paced()의 토큰 버킷에 그대로 연결됩니다.
+    interval초마다 구간의 전송 수와 피드백을 비교하여:
+      - 손실률 ≤ loss_threshold이고 혼잡 신호가 없으면 속도를 step EPS만큼 올리고 (additive increase)
+      - 손실 또는 혼잡이면 속도를 decrease배로 줄입니다 (multiplicative decrease).
+    혼잡 신호: HTTP 피드백의 손실률, TCP/TLS sendall 대기 시간 비율(backpressure), 목표 대비 전송 부족.
+    감소 직전 구간의 최대 수신 EPS를 꺾이는 지점(knee) 후보로 기록하고, probes번 감소하면 종료합니다.
+    """
+    
+    BLOCKED_THRESHOLD = 0.5  # 구간 중 sendall 대기 시간 비율이 이 값을 넘으면 backpressure로 판단
+    SHORTFALL_THRESHOLD = 0.1  # 전송 수가 목표보다 이 비율 이상 적으면 송신 측 한계로 판단
+    
+    def __init__(self, start_rate: float = 1000.0, step: float = 1000.0, decrease: float = 0.5,
+                 loss_threshold: float = 0.01, interval: float = 1.0, probes: int = 5, max_rate: float = None,
+                 feedback: HttpCounterFeedback = None):
+        if not 0 < decrease < 1:
+            raise ValueError("decrease는 0과 1 사이여야 합니다")
+        self.rate = float(start_rate)
+        self.start_rate = float(start_rate)
+        self.step = float(step)
+        self.decrease = decrease
+        self.loss_threshold = loss_threshold
+        self.interval = interval
+        self.probes = probes
+        self.max_rate = max_rate
+        self.feedback = feedback
+        self.sender = None
+        self.history: List[Dict[str, Any]] = []
+        self.peaks: List[float] = []
+        self.limits: List[str] = []  # 감소마다 원인 (손실/backpressure/전송 부족)
+        self._next_update = interval
+        self._previous = None
+        self._clean_peak = 0.0
+        self._holdoff = True  # 첫 구간은 토큰 버킷/인코더 준비 구간이므로 판단하지 않음
+    
+    def attach(self, sender: 'UTMLogSender'):
+        """전송 카운터를 읽고 종료 시 전송을 멈출 송신기를 연결합니다."""
+        self.sender = sender
+    
+    def _sample(self) -> Tuple[float, int, Optional[float], float]:
+        transmitter = self.sender.transmitter
+        blocked = 0.0
+        if isinstance(transmitter, StreamConnectionPool):
+            blocked = sum(connection.send_time for connection in transmitter.connections)
+        delivered = None
+        if self.feedback:
+            try:
+                delivered = self.feedback.read()
+            except (OSError, ValueError, KeyError) as e:
+                print(f"⚠️  피드백을 읽을 수 없습니다: {e}")
+        return time.perf_counter(), transmitter.packets_sent if transmitter else 0, delivered, blocked
+    
+    def rate_at(self, elapsed: float) -> float:
+        """경과 시간(초)의 목표 EPS를 반환합니다. interval마다 피드백을 확인해 속도를 조정합니다."""
+        if self._previous is None:
+            self._previous = self._sample()
+        elif elapsed >= self._next_update:
+            self._next_update = elapsed + self.interval
+            self._update(elapsed)
+        return self.rate
+    
+    def _update(self, elapsed: float):
+        current = self._sample()
+        (before_time, before_sent, before_delivered, before_blocked) = self._previous
+        (now, sent, delivered, blocked) = current
+        self._previous = current
+        duration = now - before_time
+        if duration <= 0:
+            return
+        sent_delta = sent - before_sent
+        loss = None
+        delivered_eps = sent_delta / duration
+        if delivered is not None and before_delivered is not None:
+            # 수신 측 카운터에 다른 송신기의 트래픽이 섞여도 이 송신기가 보낸 양을 넘지 않도록 제한
+            delivered_eps = min(delivered - before_delivered, sent_delta) / duration
+            loss = max(1 - (delivered - before_delivered) / sent_delta, 0.0) if sent_delta else 0.0
+        blocked_ratio = (blocked - before_blocked) / duration
+        shortfall = 1 - sent_delta / (self.rate * duration) if self.rate else 0.0
+        
+        reasons = []
+        if loss is not None and loss > self.loss_threshold:
+            reasons.append(f"손실 {loss:.1%}")
+        if blocked_ratio > self.BLOCKED_THRESHOLD:
+            reasons.append(f"backpressure {blocked_ratio:.0%}")
+        if shortfall > self.SHORTFALL_THRESHOLD:
+            reasons.append(f"전송 부족 {shortfall:.0%}")
+        
+        target = self.rate
+        if self._holdoff:
+            # 감소 직후 구간은 밀린 큐가 비워지는 중이므로 판단하지 않음
+            self._holdoff = False
+            action = "대기"
+        elif reasons:
+            # 손실 없이 송신 측 한계/backpressure로 멈춘 경우 그 구간의 수신 EPS도 지속 가능한 값
+            lossless = loss is None or loss <= self.loss_threshold
+            self.peaks.append(max(self._clean_peak, delivered_eps) if lossless else self._clean_peak or delivered_eps)
+            self.limits.append(reasons[0].split()[0])
+            self._clean_peak = 0.0
+            self.rate = max(self.rate * self.decrease, 1.0)
+            self._holdoff = True
+            action = "감소"
+        else:
+            self._clean_peak = max(self._clean_peak, delivered_eps)
+            self.rate += self.step
+            if self.max_rate is not None:
+                self.rate = min(self.rate, float(self.max_rate))
+            action = "증가"
+        
+        self.history.append({'elapsed': round(elapsed, 3), 'target': target, 'sent_eps': sent_delta / duration,
+                             'delivered_eps': delivered_eps, 'loss': loss, 'blocked': blocked_ratio,
+                             'action': action})
+        loss_text = f", 손실 {loss:.2%}" if loss is not None else ""
+        reason_text = f" ({', '.join(reasons)})" if action == "감소" else ""
+        print(f"🎚️  {elapsed:6.1f}초: 목표 {target:>10,.0f} → 전송 {sent_delta / duration:>10,.0f} / 수신 {delivered_eps:>10,.0f} EPS"
+              f"{loss_text} | {action}{reason_text} → {self.rate:,.0f} EPS")
+        if len(self.peaks) >= self.probes and self.sender:
+            self.sender.running = False
+    
+    @property
+    def knee(self) -> float:
+        """감소 직전 최대 수신 EPS들의 중앙값 (최대 지속 가능 EPS 추정치)"""
+        if not self.peaks:
+            return 0.0
+        peaks = sorted(self.peaks)
+        middle = len(peaks) // 2
+        return peaks[middle] if len(peaks) % 2 else (peaks[middle - 1] + peaks[middle]) / 2
+    
+    def describe(self) -> str:
+        """제어기 요약 문자열을 반환합니다."""
+        signal_text = f"피드백 {self.feedback}" if self.feedback else "송신 측 신호(backpressure/전송 부족)"
+        return (f"적응형 AIMD (시작 {self.start_rate:,.0f} EPS, +{self.step:,.0f} EPS/{self.interval:g}초, "
+                f"×{self.decrease:g}, 손실 임계 {self.loss_threshold:.1%}, {signal_text})")
+    
+    def print_report(self):
+        """탐색 결과(knee point)를 출력합니다."""
+        print("\n🎯 적응형 속도 탐색 결과:")
+        if not self.peaks:
+            clean = max((entry['delivered_eps'] for entry in self.history), default=0.0)
+            print(f"   ⚠️  손실/혼잡 없이 종료되었습니다. 최대 수신 {clean:,.0f} EPS까지는 지속 가능합니다.")
+            return
+        print(f"   📍 knee point: {self.knee:,.0f} EPS (감소 {len(self.peaks)}회의 직전 최대 수신 EPS 중앙값)")
+        print(f"   📈 감소 직전 최대 수신 EPS: {', '.join(f'{peak:,.0f}' for peak in self.peaks)}")
+        limits = [limit for limit in self.limits if limit != "전송"]
+        if not limits:
+            print("   ⚠️  송신 측 한계(전송 부족)로만 감소했습니다. 수신 측 한계를 찾으려면 송신 프로세스/에이전트를 늘리세요.")
+        else:
+            print(f"   🔎 주요 감소 원인: {max(set(limits), key=limits.count)}")
+
+class Destination:
+    """비동기 다중 목적지 전송의 목적지 설정 (호스트, 포트, 가중치, 목표 EPS)."""
+    
+    def __init__(self, host: str, port: int, weight: float = 1.0, rate: float = None):
+        self.host = host
+        self.port = int(port)
+        self.weight = float(weight)
+        self.rate = rate
+    
+    @classmethod
+    def parse(cls, spec: str) -> 'Destination':
+        """'host:port[:weight[:rate]]' 형식의 문자열을 해석합니다."""
+        parts = spec.split(':')
+        if len(parts) < 2 or len(parts) > 4:
+            raise ValueError(f"목적지 형식이 올바르지 않습니다: {spec} (host:port[:weight[:rate]])")
+        weight = float(parts[2]) if len(parts) > 2 and parts[2] else 1.0
+        rate = float(parts[3]) if len(parts) > 3 and parts[3] else None
+        return cls(parts[0], int(parts[1]), weight, rate)
+    
+    def __str__(self):
+        return f"{self.host}:{self.port}"
+
+class PayloadSizer:
+    """데이터그램 크기 분포에 맞게 메시지 텍스트 끝에 채움(padding) 텍스트를 덧붙입니다.
+    
+    지원 분포:
+      - fixed:   {"distribution": "fixed", "size": 512}
+      - uniform: {"distribution": "uniform", "min": 200, "max": 1400}
+      - normal:  {"distribution": "normal", "mean": 600, "stddev": 150} (min/max로 범위 제한 가능)
+    목표 크기보다 긴 데이터그램은 자르지 않습니다. 크기는 limit(기본: MAX_DATAGRAM, --pack이면 묶음 크기)를
+    넘을 수 없고, min은 max 이하여야 합니다.
+    
+    채움 텍스트는 미리 만들어 둔 무작위 단어 풀(TEXT_POOL)의 임의 위치를 잘라 쓰므로
+    이벤트마다 문자열을 만들지 않습니다. 풀은 소문자와 공백만 포함하여 모든 출력 형식에서
+    이스케이프가 필요 없습니다. 넣는 위치와 모양은 출력 형식의 pad()가 정합니다 (JSON은 "pad" 키).
+    """
+    
+    DISTRIBUTIONS = ("fixed", "uniform", "normal")
+    MAX_DATAGRAM = 65507  # UDP/IPv4 최대 페이로드
+    POOL_WORDS = ("session", "policy", "traffic", "allowed", "denied", "inbound", "outbound", "signature",
+                  "update", "gateway", "tunnel", "client", "server", "request", "response", "packet",
+                  "threat", "scan", "user", "admin", "login", "config", "interface", "route", "filter",
+                  "content", "category", "engine", "rule", "match", "zone", "virtual", "domain", "host")
+    TEXT_POOL = b''  # 처음 사용할 때 _text_pool()에서 생성
+    
+    @classmethod
+    def _text_pool(cls) -> bytes:
+        """채움 텍스트 풀 (MAX_DATAGRAM의 2배 길이, 고정 시드로 생성하여 실행마다 동일)"""
+        if not cls.TEXT_POOL:
+            rng = random.Random(0)
+            words = rng.choices(cls.POOL_WORDS, k=cls.MAX_DATAGRAM * 2 // 6)
+            cls.TEXT_POOL = ' '.join(words).encode()[:cls.MAX_DATAGRAM * 2]
+        return cls.TEXT_POOL
+    
+    def __init__(self, distribution: str = "fixed", size: int = None, minimum: int = None, maximum: int = None,
+                 mean: float = None, stddev: float = None, rng: random.Random = None, limit: int = None):
+        if distribution not in self.DISTRIBUTIONS:
+            raise ValueError(f"지원하지 않는 크기 분포입니다: {distribution} (지원: {', '.join(self.DISTRIBUTIONS)})")
+        if distribution == "fixed" and size is None:
+            raise ValueError("fixed 분포에는 size가 필요합니다")
+        if distribution == "uniform" and (minimum is None or maximum is None):
+            raise ValueError("uniform 분포에는 min과 max가 필요합니다")
+        if distribution == "normal" and mean is None:
+            raise ValueError("normal 분포에는 mean이 필요합니다")
+        limit = min(limit or self.MAX_DATAGRAM, self.MAX_DATAGRAM)
+        for name, value in (("size", size), ("min", minimum), ("max", maximum), ("mean", mean), ("stddev", stddev)):
+            if value is not None and not 0 <= value <= limit:
+                raise ValueError(f"크기 분포의 {name} 값은 0 이상 {limit} 이하여야 합니다: {value:g}")
+        if minimum is not None and maximum is not None and minimum > maximum:
+            raise ValueError(f"크기 분포의 min({minimum})이 max({maximum})보다 큽니다")
+        self.distribution = distribution
+        self.size = size
+        self.minimum = minimum if minimum is not None else 0
+        self.maximum = maximum if maximum is not None else limit
+        self.mean = mean
+        self.stddev = stddev if stddev is not None else (mean or 0) * 0.25
+        self.rng = rng or random.Random()
+        self._sizes = range(int(self.minimum), int(self.maximum) + 1)
+    
+    @classmethod
+    def from_dict(cls, spec: Dict[str, Any], rng: random.Random = None, limit: int = None) -> 'PayloadSizer':
+        """딕셔너리 명세로부터 크기 분포를 생성합니다. limit은 허용하는 최대 데이터그램 크기입니다."""
+        return cls(spec.get("distribution", "fixed"), size=spec.get("size"), minimum=spec.get("min"),
+                   maximum=spec.get("max"), mean=spec.get("mean"), stddev=spec.get("stddev"), rng=rng, limit=limit)
+    
+    @staticmethod
+    def parse(spec: str) -> Dict[str, Any]:
+        """명령행 크기 명세를 딕셔너리 명세로 변환합니다.
+        
+        '1400' (fixed), '200-8192' (uniform), 'normal:MEAN[:STDDEV[:MIN:MAX]]',
+        'uniform:MIN:MAX', 'fixed:SIZE' 형식을 지원합니다.
+        """
+        try:
+            kind, _, rest = spec.partition(':')
+            if not rest:
+                if '-' in spec:
+                    low, high = spec.split('-', 1)
+                    return {"distribution": "uniform", "min": int(low), "max": int(high)}
+                return {"distribution": "fixed", "size": int(spec)}
+            values = [float(value) for value in rest.split(':')]
+            if kind == "fixed" and len(values) == 1:
+                return {"distribution": "fixed", "size": int(values[0])}
+            if kind == "uniform" and len(values) == 2:
+                return {"distribution": "uniform", "min": int(values[0]), "max": int(values[1])}
+            if kind == "normal" and len(values) in (1, 2, 4):
+                result = {"distribution": "normal", "mean": values[0]}
+                if len(values) > 1:
+                    result["stddev"] = values[1]
+                if len(values) == 4:
+                    result["min"], result["max"] = int(values[2]), int(values[3])
+                return result
+        except ValueError:
+            pass
+        raise ValueError(f"크기 명세가 올바르지 않습니다: {spec} "
+                         f"(예: 1400, 200-8192, normal:600:150, uniform:200:1400)")
+    
+    def draw_sizes(self, count: int) -> List[int]:
+        """목표 데이터그램 크기 count개를 한 번에 추출합니다."""
+        if self.distribution == "fixed":
+            return [self.size] * count
+        if self.distribution == "uniform":
+            return self.rng.choices(self._sizes, k=count)
+        gauss = self.rng.gauss
+        low, high = self.minimum, self.maximum
+        return [min(max(int(gauss(self.mean, self.stddev)), low), high) for _ in range(count)]
+    
+    def apply(self, datagrams: List[bytes], formatter: 'LogFormatter' = None) -> List[bytes]:
+        """각 데이터그램을 출력 형식의 채움 필드(formatter.pad)로 목표 크기까지 채웁니다.
+        
+        formatter를 생략하면 줄바꿈 앞에 공백과 채움 텍스트를 덧붙입니다. 채움 필드 자체보다 적게
+        모자란 데이터그램은 그대로 둡니다.
+        """
+        pool = self._text_pool()
+        offsets = self.rng.choices(range(len(pool) - self.MAX_DATAGRAM), k=len(datagrams))
+        pad = formatter.pad if formatter else self._pad_text
+        overhead = formatter.pad_overhead if formatter else 1
+        padded = []
+        append = padded.append
+        for data, size, offset in zip(datagrams, self.draw_sizes(len(datagrams)), offsets):
+            missing = size - len(data) - overhead
+            if missing > 0:
+                append(pad(data, pool[offset:offset + missing]))
+            else:
+                append(data)
+        return padded
+    
+    @staticmethod
+    def _pad_text(data: bytes, filler: bytes) -> bytes:
+        """형식을 모를 때의 채움: 줄바꿈 앞에 공백과 채움 텍스트"""
+        if data.endswith(b'\n'):
+            return b'%s %s\n' % (data[:-1], filler)
+        return b'%s %s' % (data, filler)
+    
+    def describe(self) -> str:
+        """분포 요약 문자열을 반환합니다."""
+        if self.distribution == "fixed":
+            return f"고정 {self.size}B"
+        if self.distribution == "uniform":
+            return f"균등 {self.minimum}~{self.maximum}B"
+        return f"정규 평균 {self.mean:g}B (표준편차 {self.stddev:g})"
+
+class DatagramPacker:
+    """여러 syslog 메시지(줄)를 max_size 바이트 이하의 데이터그램 하나로 묶습니다.
+    
+    각 메시지는 줄바꿈으로 끝나므로 수신 측은 줄 단위로 나눌 수 있습니다. max_size보다 긴
+    메시지는 단독으로 보냅니다. 기본값은 MTU 1500에서 IPv4/UDP 헤더(28바이트)를 뺀 크기로,
+    이를 넘는 데이터그램은 IP 단편화됩니다.
+    """
+    
+    HEADER_SIZE = 28  # IPv4(20) + UDP(8) 헤더
+    
+    def __init__(self, max_size: int = 1472):
+        if max_size <= 0:
+            raise ValueError("묶음 크기는 0보다 커야 합니다")
+        self.max_size = max_size
+    
+    @classmethod
+    def for_mtu(cls, mtu: int, reserve: int = 0) -> 'DatagramPacker':
+        """MTU에 맞는 묶음기를 생성합니다. reserve는 묶은 뒤 덧붙일 바이트 수(일련번호 필드 등)입니다."""
+        return cls(mtu - cls.HEADER_SIZE - reserve)
+    
+    def pack(self, messages: List[bytes]) -> Tuple[List[bytes], List[int]]:
+        """(묶은 데이터그램 목록, 데이터그램별 메시지 수)를 반환합니다."""
+        limit = self.max_size
+        packed = []
+        counts = []
+        current = []
+        size = 0
+        for data in messages:
+            length = len(data)
+            if current and size + length > limit:
+                packed.append(b''.join(current))
+                counts.append(len(current))
+                current = []
+                size = 0
+            current.append(data)
+            size += length
+        if current:
+            packed.append(b''.join(current))
+            counts.append(len(current))
+        return packed, counts
+
+class WorkloadPhase:
+    """워크로드의 한 단계: 지속 시간, 목표 속도(고정 또는 RateProfile), 이벤트 종류 가중치, 크기 분포, 목적지."""
+    
+    def __init__(self, name: str, duration: float, rate: RateProfile, event_weights: Dict[str, float] = None,
+                 payload: PayloadSizer = None, destinations: List[Destination] = None):
+        if duration <= 0:
+            raise ValueError(f"단계 '{name}'의 duration은 0보다 커야 합니다")
+        unknown = [event_type for event_type in (event_weights or {}) if event_type not in EVENT_TYPES]
+        if unknown:
+            raise ValueError(f"단계 '{name}'에 알 수 없는 이벤트 종류가 있습니다: {', '.join(unknown)}")
+        if event_weights and sum(event_weights.values()) <= 0:
+            raise ValueError(f"단계 '{name}'의 이벤트 가중치 합은 0보다 커야 합니다")
+        self.name = name
+        self.duration = float(duration)
+        self.rate = rate
+        self.event_weights = event_weights
+        self.payload = payload
+        self.destinations = destinations or []
+    
+    @classmethod
+    def from_dict(cls, spec: Dict[str, Any], index: int = 0) -> 'WorkloadPhase':
+        """딕셔너리 명세로부터 단계를 생성합니다."""
+        name = str(spec.get("name", f"phase{index + 1}"))
+        rate = spec.get("rate", 1000)
+        rate = RateProfile.from_dict(rate) if isinstance(rate, dict) else RateProfile.constant(float(rate))
+        destinations = []
+        for destination in spec.get("destinations", []):
+            if isinstance(destination, dict):
+                destinations.append(Destination(destination["host"], destination["port"], destination.get("weight", 1.0)))
+            else:
+                destinations.append(Destination.parse(str(destination)))
+        payload = spec.get("payload")
+        return cls(name, float(spec.get("duration", 60)), rate,
+                   event_weights={key: float(value) for key, value in spec.get("events", {}).items()} or None,
+                   payload=PayloadSizer.from_dict(payload) if payload else None,
+                   destinations=destinations)
+    
+    def describe(self) -> str:
+        """단계 요약 문자열을 반환합니다."""
+        parts = [f"{self.duration:g}초", self.rate.describe()]
+        if self.event_weights:
+            total = sum(self.event_weights.values())
+            top = sorted(self.event_weights.items(), key=lambda item: -item[1])[:3]
+            parts.append("이벤트 " + ", ".join(f"{event_type} {weight / total:.0%}" for event_type, weight in top))
+        if self.payload:
+            parts.append(f"크기 {self.payload.describe()}")
+        if self.destinations:
+            parts.append("목적지 " + ", ".join(f"{d}×{d.weight:g}" for d in self.destinations))
+        return ", ".join(parts)
+
+class Workload:
+    """단계(phase) 목록으로 구성된 워크로드 파일 (JSON/YAML/TOML).
+    
+    예:
+      {"tick": 0.01, "repeat": 1, "phases": [
+        {"name": "normal", "duration": 600, "rate": 20000,
+         "events": {"firewall_allow": 60, "firewall_block": 25, "web_filter": 15}},
+        {"name": "ips-storm", "duration": 120, "rate": 300000, "events": {"ips_alert": 9, "firewall_block": 1},
+         "payload": {"distribution": "uniform", "min": 300, "max": 1200}},
+        {"name": "recovery", "duration": 60, "rate": {"type": "linear", "start": 300000, "end": 20000, "duration": 60}}]}
+    
+    compile()은 단계별로 틱(tick)마다 목적지별 전송 개수를 미리 계산하므로 실행 중에는
+    이벤트 단위의 판단 없이 틱 단위로 개수만 읽어 전송합니다.
+    """
+    
+    def __init__(self, phases: List[WorkloadPhase], tick: float = 0.01, repeat: int = 1):
+        if not phases:
+            raise ValueError("워크로드에 단계(phases)가 없습니다")
+        if tick <= 0:
+            raise ValueError("tick은 0보다 커야 합니다")
+        self.phases = phases
+        self.tick = float(tick)
+        self.repeat = int(repeat)
+    
+    @classmethod
+    def from_dict(cls, spec: Dict[str, Any]) -> 'Workload':
+        """딕셔너리 명세로부터 워크로드를 생성합니다."""
+        phases = [WorkloadPhase.from_dict(phase, i) for i, phase in enumerate(spec.get("phases", []))]
+        return cls(phases, tick=spec.get("tick", 0.01), repeat=spec.get("repeat", 1))
+    
+    @classmethod
+    def load(cls, path: str) -> 'Workload':
+        """워크로드 파일(JSON/YAML/TOML)을 읽습니다."""
+        return cls.from_dict(load_config_file(path))
+    
+    @property
+    def duration(self) -> float:
+        """1회 실행의 총 시간 (초)"""
+        return sum(phase.duration for phase in self.phases)
+    
+    def compile(self, default_destination: Destination) -> List[Tuple[WorkloadPhase, List[Destination], List[array]]]:
+        """단계마다 (단계, 목적지 목록, 목적지별 틱당 전송 개수 배열) 실행 계획을 만듭니다.
+        
+        틱마다 목표 속도 × 틱 길이를 목적지 가중치로 나누고, 소수점 이하는 다음 틱으로 이월하여
+        전체 개수가 목표와 일치하도록 합니다.
+        """
+        plan = []
+        for phase in self.phases:
+            destinations = phase.destinations or [default_destination]
+            total_weight = sum(d.weight for d in destinations) or 1.0
+            shares = [d.weight / total_weight for d in destinations]
+            counts = [array('I') for _ in destinations]
+            carries = [0.0] * len(destinations)
+            tick_count = math.ceil(phase.duration / self.tick - 1e-9)
+            for i in range(tick_count):
+                elapsed = i * self.tick
+                expected = phase.rate.rate_at(elapsed) * min(self.tick, phase.duration - elapsed)
+                for d, share in enumerate(shares):
+                    carries[d] += expected * share
+                    # 부동소수점 오차(159.9999...)로 한 개씩 잃지 않도록 아주 작은 여유를 두고 내림
+                    count = int(carries[d] + 1e-9)
+                    carries[d] -= count
+                    counts[d].append(count)
+            plan.append((phase, destinations, counts))
+        return plan
+
+class _DestinationProtocol(asyncio.DatagramProtocol):
+    """목적지별 데이터그램 프로토콜. 전송 버퍼 backpressure(pause/resume_writing)를 추적합니다."""
+    
+    def __init__(self, metrics: MetricsShard = None):
+        self.metrics = metrics
+        self.writable = asyncio.Event()
+        self.writable.set()
+        self.sent = 0
+        self.bytes_sent = 0
+        self.errors = 0
+        self.pauses = 0
+        self.elapsed = None  # 전송 작업이 끝나기까지 걸린 시간 (초)
+    
+    def pause_writing(self):
+        self.pauses += 1
+        self.writable.clear()
+    
+    def resume_writing(self):
+        self.writable.set()
+    
+    def error_received(self, exc):
+        self.errors += 1
+        if self.metrics:
+            self.metrics.record_error(getattr(exc, 'errno', None) or 0)
+
+class RunController:
+    """전송 실행의 중단 요청과 종료 대기를 관리합니다.
+    
+    중단 플래그는 Event(멀티프로세스 워커에서는 multiprocessing.Event)이며, 모든 워커가 배치 전송
+    사이마다 확인합니다. SIGINT/SIGTERM을 받으면 플래그만 세우므로 워커는 진행 중인 배치를 마치고
+    멈춥니다. drain_timeout초 안에 끝나지 않으면 메인 쓰레드에 SIGINT를 다시 보내 KeyboardInterrupt로
+    즉시 중단하고, 그때까지의 부분 합계로 보고합니다. 시그널을 한 번 더 받아도 즉시 중단합니다.
+    """
+    
+    def __init__(self, drain_timeout: float = 5.0, event=None):
+        self.drain_timeout = drain_timeout
+        self.event = event if event is not None else threading.Event()
+        self.reason: Optional[str] = None  # 중단 사유 (시그널 이름 등)
+        self.interrupted = False  # 시그널로 중단 요청을 받음 (새 실행을 시작해도 유지)
+        self.errors = 0  # 배치 생성/전송 중 발생한 예외 수
+        self._signals = 0
+        self._handlers = {}
+        self._watchdog: Optional[threading.Timer] = None
+    
+    @property
+    def stopped(self) -> bool:
+        """중단 요청 여부"""
+        return self.event.is_set()
+    
+    def start(self):
+        """새 실행을 시작합니다. 이전 실행의 중단 플래그를 지우지만, 시그널로 받은 중단 요청은 유지합니다."""
+        if not self.interrupted:
+            self.event.clear()
+            self.reason = None
+    
+    def stop(self, reason: str = None):
+        """중단을 요청합니다. 워커는 진행 중인 배치를 마친 뒤 멈춥니다."""
+        if not self.event.is_set():
+            self.reason = reason
+            self.event.set()
+    
+    def record_error(self, error: Exception, label: str = "배치"):
+        """배치 단위 예외를 기록합니다. 같은 오류가 반복될 수 있으므로 처음 몇 번만 출력합니다."""
+        self.errors += 1
+        if self.errors <= 3:
+            print(f"❌ {label} 전송 실패: {error}")
+        elif self.errors == 4:
+            print("❌ 이후 배치 오류는 출력하지 않고 개수만 집계합니다.")
+    
+    def print_summary(self, indent: str = "   "):
+        """시그널로 중단되었거나 배치 오류가 있었으면 결과 요약 앞에 알립니다."""
+        if self.interrupted:
+            print(f"{indent}⏹️  {self.reason} 시그널로 중단됨: 중단 전까지 전송한 부분 합계입니다")
+        if self.errors:
+            print(f"{indent}⚠️  배치 오류: {self.errors}회 (해당 배치는 실패로 집계)")
+    
+    def install_signal_handlers(self):
+        """SIGINT/SIGTERM 처리기를 설치합니다 (메인 쓰레드에서만 가능)."""
+        if threading.current_thread() is not threading.main_thread():
+            return
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            self._handlers[signum] = signal.signal(signum, self._handle_signal)
+    
+    def restore_signal_handlers(self):
+        """설치한 시그널 처리기와 종료 대기 타이머를 해제합니다."""
+        if self._watchdog:
+            self._watchdog.cancel()
+            self._watchdog = None
+        for signum, handler in self._handlers.items():
+            signal.signal(signum, handler)
+        self._handlers.clear()
+    
+    def _handle_signal(self, signum, frame):
+        self._signals += 1
+        if self._signals > 1:
+            raise KeyboardInterrupt
+        name = signal.Signals(signum).name
+        self.interrupted = True
+        self.stop(name)
+        print(f"\n⏹️  {name} 수신: 진행 중인 배치를 마치고 중단합니다 "
+              f"(최대 {self.drain_timeout:g}초 대기, 다시 Ctrl+C: 즉시 중단)")
+        self._watchdog = threading.Timer(self.drain_timeout, self._force_stop)
+        self._watchdog.daemon = True
+        self._watchdog.start()
+    
+    def _force_stop(self):
+        # 종료 대기 시간 초과: 메인 쓰레드에 시그널을 보내 블로킹 호출(sendall 등)까지 깨움
+        print(f"⏱️  종료 대기 시간({self.drain_timeout:g}초)을 넘겨 즉시 중단합니다.")
+        signal.pthread_kill(threading.main_thread().ident, signal.SIGINT)
+    
+    def join(self, threads: List[threading.Thread]):
+        """쓰레드가 모두 끝날 때까지 기다립니다 (대기 중에도 시그널을 처리할 수 있도록 짧게 나누어 대기)."""
+        for thread in threads:
+            while thread.is_alive():
+                thread.join(0.1)
+
+class WorkerSlots:
+    """워커별 결과 칸: [전송 성공 수, 실패 수, 시스템 콜 수, 전송 바이트].
+    
+    워커마다 자기 칸만 갱신하므로 잠금이 없고, 공유 메모리(RawArray)에 있으므로 멀티프로세스
+    워커도 쓸 수 있습니다. 중단되어 결과를 반환하지 못한 워커도 마지막 배치까지의 합계가 남습니다.
+    """
+    
+    SENT, FAILED, SYSCALLS, BYTES = range(4)
+    FIELDS = 4
+    
+    def __init__(self, count: int):
+        self.count = count
+        self.values = multiprocessing.RawArray('q', count * self.FIELDS)
+    
+    def update(self, index: int, sent: int, failed: int, syscalls: int, nbytes: int):
+        """워커 index의 칸을 현재 누적 값으로 갱신합니다."""
+        base = index * self.FIELDS
+        values = self.values
+        values[base + self.SENT] = sent
+        values[base + self.FAILED] = failed
+        values[base + self.SYSCALLS] = syscalls
+        values[base + self.BYTES] = nbytes
+    
+    def totals(self) -> List[int]:
+        """모든 워커의 [성공, 실패, 시스템 콜, 바이트] 합계를 반환합니다."""
+        values = self.values
+        return [sum(values[field::self.FIELDS]) for field in range(self.FIELDS)]
+
+class SharedRing:
+    """생성 워커 하나와 전송 워커 하나가 공유하는 링 버퍼입니다 (multiprocessing.shared_memory, 단일 생산자/단일 소비자).
+    
+    레코드 하나는 인코딩된 데이터그램 묶음이며 [레코드 크기(uint32), 데이터그램 수(uint32), 길이 배열(uint32), 데이터]
+    순서로 8바이트 정렬해 저장합니다. 레코드가 버퍼 끝을 넘으면 끝부분에 건너뜀 표시를 남기고 처음부터 씁니다.
+    헤더 카운터(int64)는 생산자와 소비자가 각자 자기 칸만 기록하므로 잠금이 없습니다. head/tail은 누적 바이트
+    위치이며 그 차이가 점유량입니다. 버퍼가 가득 차면 생산자가 빈 공간이 생길 때까지 기다립니다 (배압).
+    """
+    
+    # 헤더 칸 (int64). 생산자: 쓰기 위치, 생산 종료, 넣은 데이터그램 수, 생성 실패 수, 대기 시간(ns), 최대 점유량(바이트)
+    # 소비자: 읽기 위치, 꺼낸 데이터그램 수, 대기 시간(ns). 용량은 생성 시 한 번 기록
+    HEAD, TAIL, CLOSED, PRODUCED, CONSUMED, FAILED, PRODUCER_WAIT, CONSUMER_WAIT, HIGH_WATER, CAPACITY = range(10)
+    HEADER_SIZE = 128
+    RECORD = struct.Struct('=II')
+    WRAP = 0xFFFFFFFF  # 건너뜀 표시 (데이터그램 수 자리)
+    MAX_RECORD_DATAGRAMS = 1024  # 레코드당 최대 데이터그램 수 (sendmmsg 한 번 분량)
+    MIN_SIZE = 1024 * 1024
+    MIN_WAIT, MAX_WAIT = 0.00005, 0.001  # 가득 참/비어 있음 대기 간격 (초, 지수적으로 늘림)
+    
+    def __init__(self, size: int = None, name: str = None):
+        """size 바이트(최소 1MB)의 링을 새로 만들거나, name을 지정하면 다른 프로세스가 만든 링에 연결합니다."""
+        self.owner = name is None
+        if self.owner:
+            capacity = max(size or 0, self.MIN_SIZE) // 8 * 8
+            self.shm = shared_memory.SharedMemory(create=True, size=self.HEADER_SIZE + capacity)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+        self.name = self.shm.name
+        self.buf = self.shm.buf
+        self.counters = self.buf[:self.HEADER_SIZE].cast('q')
+        if self.owner:
+            self.counters[self.CAPACITY] = capacity
+        self.capacity = self.counters[self.CAPACITY]
+        self.max_record = self.capacity // 4  # 레코드 최대 크기 (바이트)
+    
+    @property
+    def used(self) -> int:
+        """현재 점유량 (바이트)"""
+        counters = self.counters
+        return counters[self.HEAD] - counters[self.TAIL]
+    
+    @property
+    def occupancy(self) -> float:
+        """현재 점유율 (0~1)"""
+        return self.used / self.capacity
+    
+    @property
+    def finished(self) -> bool:
+        """생산자가 종료했고 남은 레코드가 없는지 여부"""
+        # 종료 표시를 먼저 읽어야 마지막 레코드를 놓치지 않음 (생산자는 마지막 레코드 다음에 표시)
+        return bool(self.counters[self.CLOSED]) and self.used == 0
+    
+    def put(self, datagrams: List[bytes], stop_event=None) -> bool:
+        """데이터그램 목록을 레코드 단위로 나누어 넣습니다.
+        
+        공간이 날 때까지 기다리며, 기다리는 동안 stop_event가 설정되면 False를 반환합니다.
+        """
+        total = len(datagrams)
+        start = 0
+        while start < total:
+            end = min(start + self.MAX_RECORD_DATAGRAMS, total)
+            while True:
+                lengths = array('I', map(len, datagrams[start:end]))
+                data_size = sum(lengths)
+                size = (self.RECORD.size + 4 * len(lengths) + data_size + 7) & ~7
+                if size <= self.max_record:
+                    break
+                if end - start == 1:
+                    raise ValueError(f"데이터그램이 링 버퍼 레코드 최대 크기({self.max_record} bytes)보다 큽니다")
+                end = start + (end - start) // 2
+            if not self._write(datagrams[start:end], lengths, data_size, size, stop_event):
+                return False
+            start = end
+        return True
+    
+    def _write(self, chunk: List[bytes], lengths: array, data_size: int, size: int, stop_event=None) -> bool:
+        counters = self.counters
+        capacity = self.capacity
+        head = counters[self.HEAD]
+        position = head % capacity
+        to_end = capacity - position
+        needed = size + (to_end if to_end < size else 0)
+        if capacity - (head - counters[self.TAIL]) < needed:
+            # 배압: 소비자가 읽어 갈 때까지 대기
+            started = time.perf_counter_ns()
+            delay = self.MIN_WAIT
+            while capacity - (head - counters[self.TAIL]) < needed:
+                if stop_event is not None and stop_event.is_set():
+                    counters[self.PRODUCER_WAIT] += time.perf_counter_ns() - started
+                    return False
+                time.sleep(delay)
+                delay = min(delay * 2, self.MAX_WAIT)
+            counters[self.PRODUCER_WAIT] += time.perf_counter_ns() - started
+        
+        buf = self.buf
+        if to_end < size:
+            # 끝부분은 건너뛰고 처음부터 기록 (레코드는 8바이트 정렬이므로 표시를 넣을 공간은 항상 있음)
+            self.RECORD.pack_into(buf, self.HEADER_SIZE + position, to_end, self.WRAP)
+            head += to_end
+            position = 0
+        offset = self.HEADER_SIZE + position
+        self.RECORD.pack_into(buf, offset, size, len(lengths))
+        offset += self.RECORD.size
+        buf[offset:offset + 4 * len(lengths)] = lengths.tobytes()
+        offset += 4 * len(lengths)
+        buf[offset:offset + data_size] = b''.join(chunk)
+        # 데이터를 모두 쓴 뒤 쓰기 위치를 옮겨 소비자에게 공개
+        head += size
+        counters[self.HEAD] = head
+        counters[self.PRODUCED] += len(lengths)
+        used = head - counters[self.TAIL]
+        if used > counters[self.HIGH_WATER]:
+            counters[self.HIGH_WATER] = used
+        return True
+    
+    def get(self) -> Optional[Tuple[int, array, int]]:
+        """다음 레코드의 (데이터 시작 오프셋(버퍼 기준), 데이터그램 길이 배열, 레코드 크기)를 반환합니다.
+        
+        비어 있으면 None을 반환합니다. 레코드를 다 쓴 뒤 release()로 공간을 돌려줘야 합니다.
+        """
+        counters = self.counters
+        tail = counters[self.TAIL]
+        while tail != counters[self.HEAD]:
+            offset = self.HEADER_SIZE + tail % self.capacity
+            size, count = self.RECORD.unpack_from(self.buf, offset)
+            if count == self.WRAP:
+                tail += size
+                counters[self.TAIL] = tail
+                continue
+            offset += self.RECORD.size
+            lengths = array('I')
+            lengths.frombytes(self.buf[offset:offset + 4 * count])
+            return offset + 4 * count, lengths, size
+        return None
+    
+    def release(self, size: int, count: int):
+        """get()으로 꺼낸 레코드(count개 데이터그램)의 공간을 생산자에게 돌려줍니다."""
+        counters = self.counters
+        counters[self.TAIL] += size
+        counters[self.CONSUMED] += count
+    
+    def add(self, field: int, value: int):
+        """헤더 카운터에 값을 더합니다 (해당 칸을 기록하는 쪽에서만 호출)."""
+        self.counters[field] += value
+    
+    def finish(self):
+        """생산 종료를 표시합니다."""
+        self.counters[self.CLOSED] = 1
+    
+    def stats(self) -> Dict[str, int]:
+        """카운터 값 (넣은/꺼낸 데이터그램 수, 생성 실패 수, 생산자/소비자 대기 시간(ns), 최대 점유량(바이트))"""
+        counters = self.counters
+        return {
+            'produced': counters[self.PRODUCED],
+            'consumed': counters[self.CONSUMED],
+            'failed': counters[self.FAILED],
+            'producer_wait_ns': counters[self.PRODUCER_WAIT],
+            'consumer_wait_ns': counters[self.CONSUMER_WAIT],
+            'high_water': counters[self.HIGH_WATER],
+        }
+    
+    def close(self):
+        """공유 메모리 연결을 닫습니다. 링을 만든 프로세스는 공유 메모리도 삭제합니다."""
+        if self.counters is None:
+            return
+        self.counters.release()
+        self.counters = None
+        self.buf = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+# 워커 프로세스별 지표 카운터, 중단 플래그, 결과 칸 (Pool 초기화 함수에서 설정)
+_worker_metrics: Dict[int, MetricsShard] = {}
+_worker_stop = None
+_worker_slots: Optional[WorkerSlots] = None
+
+def _init_worker_process(metrics_shards: Dict[int, MetricsShard] = None, stop_event=None,
+                         slots: WorkerSlots = None):
+    """워커 프로세스 초기화: SIGINT를 무시하고 (중단은 부모 프로세스가 stop_event로 전달)
+    지표 카운터와 결과 칸을 등록합니다. SIGTERM은 기본 동작으로 되돌려 pool.terminate()로 종료되게 합니다."""
+    global _worker_stop, _worker_slots
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    _worker_metrics.update(metrics_shards or {})
+    _worker_stop = stop_event
+    _worker_slots = slots
+
+def _process_worker(worker_id: int, log_count: int, hostname: str, sender_options: Dict[str, Any]
+                    ) -> Tuple[int, int, int, List[Dict[str, Any]], int, Optional[Dict[str, Any]]]:
+    """개별 프로세스에서 실행되는 작업.
+    
+    (전송 성공 수, 실패 수, 시스템 콜 수, 연결별 통계, 전송 바이트, 프로파일 결과)를 반환합니다.
+    """
+    sender = UTMLogSender(**sender_options)
+    # 호스트명별 RNG 스트림: 같은 기본 시드와 프로세스 번호면 항상 같은 이벤트 스트림
+    sender.hostname = f"{hostname}-proc{worker_id}"
+    if _worker_stop is not None:
+        # 부모 프로세스의 중단 요청을 공유 Event로 받음
+        sender.controller = RunController(event=_worker_stop)
+    sent_count = 0
+    failed_count = 0
+    batch_size = 10000  # 프로세스당 배치 크기 (배치마다 중단 요청 확인)
+    
+    try:
+        # 각 프로세스마다 자체 소켓(연결) 생성
+        sender.transmitter = sender.create_transmitter(_worker_metrics.get(worker_id), f"proc{worker_id}")
+    except Exception as e:
+        print(f"❌ 프로세스 {worker_id} 소켓 생성 실패: {e}")
+        if _worker_slots:
+            _worker_slots.update(worker_id - 1, 0, log_count, 0, 0)
+        return 0, log_count, 0, [], 0, None
+    
+    if sender.profiler:
+        sender.profiler.start(sender.hostname)
+    try:
+        for i in range(0, log_count, batch_size):
+            if sender.controller.stopped:
+                break
+            batch_sent, batch_failed = sender.send_log_batch_generator(min(batch_size, log_count - i))
+            sent_count += batch_sent
+            failed_count += batch_failed
+            if _worker_slots:
+                _worker_slots.update(worker_id - 1, sent_count, failed_count, sender.transmitter.syscalls,
+                                     sender.transmitter.bytes_sent)
+    finally:
+        sender.transmitter.close()
+    
+    connection_stats = []
+    if isinstance(sender.transmitter, StreamConnectionPool):
+        connection_stats = sender.transmitter.connection_stats()
+        for stat in connection_stats:
+            stat['label'] = f"프로세스 {worker_id} 연결 {stat['connection']}"
+    return (sent_count, failed_count, sender.transmitter.syscalls, connection_stats, sender.transmitter.bytes_sent,
+            _profile_snapshot(sender))
+
+def _profile_snapshot(sender: 'UTMLogSender') -> Optional[Dict[str, Any]]:
+    """워커 프로세스의 프로파일러를 멈추고 부모 프로세스로 보낼 결과를 반환합니다 (프로파일을 켜지 않았으면 None)."""
+    if not sender.profiler:
+        return None
+    sender.profiler.stop()
+    return sender.profiler.snapshot()
+
+def _pipeline_generator(worker_id: int, log_count: Optional[int], hostname: str, sender_options: Dict[str, Any],
+                        ring_name: str) -> Tuple[int, Optional[Dict[str, Any]]]:
+    """파이프라인 생성 워커: 이벤트를 인코딩해 링 버퍼에 채웁니다. (링에 넣은 로그 수, 프로파일 결과)를 반환합니다.
+    
+    log_count가 None이면 중단 요청을 받을 때까지 생성합니다. 링이 가득 차면 전송 워커가 비울 때까지 기다립니다.
+    """
+    sender = UTMLogSender(**sender_options)
+    # 호스트명별 RNG 스트림: 같은 기본 시드와 생성 워커 번호면 항상 같은 이벤트 스트림
+    sender.hostname = f"{hostname}-gen{worker_id}"
+    if _worker_stop is not None:
+        sender.controller = RunController(event=_worker_stop)
+    controller = sender.controller
+    ring = SharedRing(name=ring_name)
+    encoder = sender.get_encoder()
+    chunk_size = encoder.chunk_size if encoder else 1000
+    produced = 0
+    if sender.profiler:
+        sender.profiler.start(sender.hostname)
+    try:
+        while (log_count is None or produced < log_count) and not controller.stopped:
+            size = chunk_size if log_count is None else min(chunk_size, log_count - produced)
+            try:
+                datagrams = sender.encode_logs(size)
+            except Exception as e:
+                controller.record_error(e, "파이프라인 생성 배치")
+                ring.add(SharedRing.FAILED, size)
+                produced += size
+                continue
+            if not ring.put(datagrams, controller.event):
+                break
+            produced += size
+    finally:
+        # 남은 레코드를 모두 꺼내면 전송 워커가 이 링을 종료
+        ring.finish()
+        ring.close()
+    return produced, _profile_snapshot(sender)
+
+def _pipeline_sender(worker_id: int, ring_names: List[str], hostname: str, sender_options: Dict[str, Any]
+                     ) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+    """파이프라인 전송 워커: 할당된 링 버퍼들을 돌아가며 레코드를 꺼내 배치 전송합니다.
+    
+    (연결별 통계, 프로파일 결과)를 반환합니다.
+    
+    UDP + sendmmsg이고 일련번호/크기 분포/묶음을 쓰지 않으면 iovec이 공유 메모리를 직접 가리킵니다 (복사 없음).
+    모든 링이 비어 있으면 기다린 시간을 각 링의 소비자 대기 시간으로 기록합니다.
+    """
+    sender = UTMLogSender(**sender_options)
+    sender.hostname = f"{hostname}-send{worker_id}"
+    if _worker_stop is not None:
+        sender.controller = RunController(event=_worker_stop)
+    controller = sender.controller
+    rings = [SharedRing(name=name) for name in ring_names]
+    try:
+        transmitter = sender.create_transmitter(_worker_metrics.get(worker_id), f"send{worker_id}")
+    except Exception as e:
+        print(f"❌ 전송 워커 {worker_id} 소켓 생성 실패: {e}")
+        for ring in rings:
+            ring.close()
+        return [], None
+    
+    zero_copy = (isinstance(transmitter, UDPBatchTransmitter) and transmitter.method == "sendmmsg"
+                 and not (transmitter.sequence or transmitter.payload or transmitter.packer))
+    anchors = [ctypes.c_char.from_buffer(ring.buf) for ring in rings] if zero_copy else []
+    base_addresses = [ctypes.addressof(anchor) for anchor in anchors]
+    failed_count = 0
+    active = list(range(len(rings)))
+    delay = SharedRing.MIN_WAIT
+    if sender.profiler:
+        sender.profiler.start(sender.hostname)
+    try:
+        while active and not controller.stopped:
+            progressed = False
+            for index in list(active):
+                ring = rings[index]
+                record = ring.get()
+                if record is None:
+                    if ring.finished:
+                        active.remove(index)
+                    continue
+                data_offset, lengths, size = record
+                count = len(lengths)
+                offsets = list(itertools.accumulate(lengths, initial=data_offset))
+                sent_before = transmitter.packets_sent
+                try:
+                    if zero_copy:
+                        transmitter.send_regions(base_addresses[index], offsets, lengths, 0, count)
+                    else:
+                        buf = ring.buf
+                        transmitter.send_many([bytes(buf[offset:offset + length])
+                                               for offset, length in zip(offsets, lengths)])
+                except Exception as e:
+                    controller.record_error(e, "파이프라인 배치 로그")
+                failed_count += count - (transmitter.packets_sent - sent_before)
+                ring.release(size, count)
+                progressed = True
+                if _worker_slots:
+                    _worker_slots.update(worker_id - 1, transmitter.packets_sent, failed_count, transmitter.syscalls,
+                                         transmitter.bytes_sent)
+            if progressed:
+                delay = SharedRing.MIN_WAIT
+            elif active:
+                # 모든 링이 비어 있음: 생성 워커를 기다림
+                started = time.perf_counter_ns()
+                time.sleep(delay)
+                waited = time.perf_counter_ns() - started
+                for index in active:
+                    rings[index].add(SharedRing.CONSUMER_WAIT, waited)
+                delay = min(delay * 2, SharedRing.MAX_WAIT)
+    finally:
+        # ctypes 참조가 남아 있으면 공유 메모리를 닫을 수 없음
+        anchors.clear()
+        transmitter.close()
+        for ring in rings:
+            ring.close()
+    if _worker_slots:
+        _worker_slots.update(worker_id - 1, transmitter.packets_sent, failed_count, transmitter.syscalls,
+                             transmitter.bytes_sent)
+    
+    connection_stats = []
+    if isinstance(transmitter, StreamConnectionPool):
+        connection_stats = transmitter.connection_stats()
+        for stat in connection_stats:
+            stat['label'] = f"전송 워커 {worker_id} 연결 {stat['connection']}"
+    return connection_stats, _profile_snapshot(sender)
 
 class UTMLogSender:
-    def __init__(self, target_host: str = None, target_port: int = None):
+    def __init__(self, target_host: str = None, target_port: int = None, use_sendmmsg: bool = True,
+                 generator: str = 'dict', transport: str = 'udp', connections: int = 4, framing: str = 'octet',
+                 tls_insecure: bool = False, tls_ca: str = None, sequence: bool = False,
+                 log_format: str = 'rfc3164-json', scenario: Dict[str, Any] = None, seed: int = None,
+                 payload: Dict[str, Any] = None, pack: bool = False, mtu: int = 1500, drain_timeout: float = 5.0,
+                 clock_tick: float = 0.001, profile_interval: float = None, timestamp_precision: str = 'microseconds'):
         # .env 파일에서 설정 로드
         self.target_host = target_host or os.getenv('TARGET_HOST', '192.168.203')
         self.target_port = target_port or int(os.getenv('TARGET_PORT', '514'))
         self.hostname = os.getenv('HOSTNAME', 'utm-sender')
         self.facility = os.getenv('FACILITY', 'local0')
         self.socket = None
-        self.running = False
+        self.transmitter = None
+        self.use_sendmmsg = use_sendmmsg
+        self.transport = transport
+        self.connections = connections
+        self.framing = framing
+        self.tls_insecure = tls_insecure
+        self.tls_ca = tls_ca
+        self.sequence = sequence  # 데이터그램에 손실 검출용 일련번호 필드 추가
+        self.payload = payload  # 메시지 크기 분포 명세 (PayloadSizer.from_dict 형식)
+        self.pack = pack  # UDP 데이터그램 하나에 여러 메시지를 MTU 크기까지 묶음
+        self.mtu = mtu
+        if generator == 'numpy' and np is None:
+            print("⚠️  NumPy가 설치되어 있지 않아 template 생성 모드를 사용합니다.")
+            generator = 'template'
+        self.generator = generator
+        self.log_format = log_format
+        self.scenario = scenario or {}  # session 생성 모드 설정 (SessionEventEncoder 인자)
+        # 기본 시드. 워커(호스트명)별 RNG 스트림은 이 시드와 호스트명에서 파생
+        self.seed = seed if seed is not None else random.SystemRandom().randrange(2 ** 32)
+        self.rngs: Dict[str, random.Random] = {}
+        self.formatters = {}
+        self.encoders = {}
+        self.event_weights: Optional[List[float]] = None  # event_type별 가중치 (EVENT_TYPES 순서)
+        self.event_cum_weights: Optional[List[float]] = None
+        self.metrics: Optional[MetricsCollector] = None
+        # 중단 플래그와 시그널 처리 (모든 워커가 공유)
+        self.controller = RunController(drain_timeout)
+        # 이벤트 타임스탬프 시계 (모든 워커가 공유, tick마다 한 번만 시각 문자열을 렌더링)
+        self.clock = CachedClock(clock_tick, timestamp_precision)
+        # 단계별 비용 프로파일러 (profile_interval이 None이면 계측하지 않음, 0이면 샘플링 없이 단계 타이머만)
+        self.profiler: Optional[StageProfiler] = None
+        self.profile_snapshots: List[Dict[str, Any]] = []  # 워커 프로세스에서 받은 프로파일 결과
+        if profile_interval is not None:
+            self.profiler = StageProfiler(profile_interval)
+            self.generate_utm_event = self.profiler.timed(self.generate_utm_event, 'generate')
+            self.generate_utm_event_batch = self.profiler.timed(self.generate_utm_event_batch, 'generate')
+            self.generate_utm_event_generator = self.profiler.timed_iterator(self.generate_utm_event_generator,
+                                                                             'generate')
+    
+    @property
+    def running(self) -> bool:
+        """전송 중 여부. 실행 제어기의 중단 플래그를 반영하므로 다른 쓰레드에서 False로 설정해도 안전합니다."""
+        return not self.controller.stopped
+    
+    @running.setter
+    def running(self, value: bool):
+        if value:
+            self.controller.start()
+        else:
+            self.controller.stop()
+    
+    def sender_options(self) -> Dict[str, Any]:
+        """워커 프로세스에서 동일한 설정의 UTMLogSender를 만들기 위한 생성자 인자를 반환합니다."""
+        return {
+            'target_host': self.target_host,
+            'target_port': self.target_port,
+            'use_sendmmsg': self.use_sendmmsg,
+            'generator': self.generator,
+            'transport': self.transport,
+            'connections': self.connections,
+            'framing': self.framing,
+            'tls_insecure': self.tls_insecure,
+            'tls_ca': self.tls_ca,
+            'sequence': self.sequence,
+            'log_format': self.log_format,
+            'scenario': self.scenario,
+            'seed': self.seed,
+            'payload': self.payload,
+            'pack': self.pack,
+            'mtu': self.mtu,
+            'drain_timeout': self.controller.drain_timeout,
+            'clock_tick': self.clock.tick,
+            'timestamp_precision': self.clock.timespec,
+            'profile_interval': self.profiler.interval if self.profiler else None,
+        }
+    
+    def create_transmitter(self, metrics: MetricsShard = None, stream: str = "main", address: Tuple[str, int] = None):
+        """전송 방식(udp/tcp/tls)에 맞는 전송기를 생성합니다. stream은 일련번호 필드의 스트림 이름입니다."""
+        address = address or (self.target_host, self.target_port)
+        if self.transport == 'udp':
+            # connect()된 UDP 소켓: 커널이 패킷마다 목적지 주소를 해석하지 않음
+            transmitter = UDPBatchTransmitter(create_udp_socket(), address, use_sendmmsg=self.use_sendmmsg,
+                                              metrics=metrics)
+        else:
+            transmitter = StreamConnectionPool(address, self.connections, self.framing, use_tls=self.transport == 'tls',
+                                               tls_insecure=self.tls_insecure, tls_ca=self.tls_ca, metrics=metrics)
+        return self.configure_transmitter(transmitter, stream)
+    
+    def configure_transmitter(self, transmitter, stream: str = "main"):
+        """전송기에 일련번호 필드, 크기 분포, 데이터그램 묶음 설정을 적용합니다."""
+        if self.sequence:
+            transmitter.sequence = SequenceStamper(stream, self.get_formatter())
+        if self.payload:
+            # 크기 분포 RNG도 스트림(워커)별로 시드에서 파생
+            transmitter.payload = PayloadSizer.from_dict(self.payload, rng=self.get_rng(f"{self.hostname}:{stream}:payload"))
+            transmitter.formatter = self.get_formatter()
+        if isinstance(transmitter, UDPBatchTransmitter):
+            transmitter.max_datagram = self.mtu - DatagramPacker.HEADER_SIZE
+            if self.pack:
+                # 일련번호 필드는 묶은 뒤 데이터그램마다 들어가므로 그만큼 남겨 둠
+                transmitter.packer = DatagramPacker.for_mtu(self.mtu, 40 if self.sequence else 0)
+        if self.profiler:
+            self.profiler.instrument_transmitter(transmitter)
+        return transmitter
+    
+    def new_metrics_shard(self, label: str) -> Optional[MetricsShard]:
+        """지표 수집이 켜져 있으면 워커용 카운터 묶음을 발급합니다."""
+        return self.metrics.new_shard(label) if self.metrics else None
+    
+    def get_rng(self, hostname: str = None) -> random.Random:
+        """호스트명(워커)별 독립 RNG를 반환합니다.
+        
+        시드는 (기본 시드, 호스트명) 문자열에서 파생하므로 같은 시드/워커 수/개수면
+        실행할 때마다 같은 이벤트 스트림이 생성되고, 쓰레드 간 RNG 상태 경합도 없습니다.
+        """
+        hostname = hostname or self.hostname
+        rng = self.rngs.get(hostname)
+        if rng is None:
+            rng = self.rngs[hostname] = random.Random(f"{self.seed}:{hostname}")
+        return rng
+    
+    @property
+    def rng(self) -> random.Random:
+        """기본 호스트명의 RNG"""
+        return self.get_rng()
+    
+    def get_formatter(self, hostname: str = None) -> LogFormatter:
+        """호스트명별 출력 형식 인코더를 반환합니다 (헤더/템플릿을 한 번만 렌더링하도록 캐시)."""
+        hostname = hostname or self.hostname
+        formatter = self.formatters.get(hostname)
+        if formatter is None:
+            formatter = self.formatters[hostname] = FORMATTERS[self.log_format](hostname, self.facility, self.clock)
+            if self.profiler:
+                self.profiler.wrap(formatter, 'encode_events', 'format')
+                self.profiler.wrap(formatter, 'encode_record', 'format')
+        return formatter
+    
+    def get_encoder(self, hostname: str = None):
+        """현재 생성 모드의 이벤트 인코더를 반환합니다 (dict 모드는 None)."""
+        hostname = hostname or self.hostname
+        if self.generator == 'dict':
+            return None
+        # 호스트명별로 인코더를 캐시 (필드 조각 풀 생성 비용이 크므로 재사용)
+        encoder = self.encoders.get(hostname)
+        if encoder is None:
+            options = self.scenario if self.generator == 'session' else {}
+            encoder = self.encoders[hostname] = ENCODER_CLASSES[self.generator](
+                hostname, self.get_rng(hostname), formatter=self.get_formatter(hostname), **options)
+            encoder.set_event_weights(self.event_weights)
+            if self.profiler:
+                self.profiler.wrap(encoder, 'encode_batch', 'format')
+                self.profiler.wrap(encoder, '_draw_fields', 'generate')
+        return encoder
         
     def connect(self):
         """소켓 연결을 설정합니다."""
+        if self.transport != 'udp':
+            try:
+                self.transmitter = self.create_transmitter(self.new_metrics_shard("main"))
+                print(f"✅ {self.transport.upper()} 연결 {len(self.transmitter.connections)}개가 {self.target_host}:{self.target_port}로 설정되었습니다. (프레이밍: {self.framing})")
+                return True
+            except Exception as e:
+                print(f"❌ {self.transport.upper()} 연결 실패: {e}")
+                return False
         try: 
             self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
             
@@ -56,7 +3364,10 @@ class UTMLogSender:
             self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 1024 * 1024)  # 1MB 송신 버퍼
             self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1024 * 1024)  # 1MB 수신 버퍼
             
-            # UDP는 연결을 설정하지 않고 바로 사용 가능
+            # connect()된 UDP 소켓: 커널이 패킷마다 목적지 주소를 해석하지 않음
+            self.transmitter = self.configure_transmitter(
+                UDPBatchTransmitter(self.socket, (self.target_host, self.target_port), use_sendmmsg=self.use_sendmmsg,
+                                    metrics=self.new_metrics_shard("main")))
             print(f"✅ UDP 소켓이 {self.target_host}:{self.target_port}로 설정되었습니다.")
             print(f"📊 소켓 버퍼 크기: 송신 {self.socket.getsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF)} bytes, 수신 {self.socket.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF)} bytes")
             return True
@@ -66,12 +3377,30 @@ class UTMLogSender:
     
     def disconnect(self):
         """소켓 연결을 종료합니다."""
-        if self.socket:
+        if self.transmitter:
+            self.transmitter.close()
+            print("🔌 연결이 종료되었습니다.")
+        elif self.socket:
             self.socket.close()
             print("🔌 연결이 종료되었습니다.")
     
-    def generate_utm_event(self) -> Dict[str, Any]:
+    def set_event_weights(self, event_weights: Dict[str, float] = None):
+        """event_type별 가중치를 설정합니다 (None이면 균등). 이미 만든 인코더에도 적용합니다."""
+        weights = [float(event_weights.get(event_type, 0)) for event_type in EVENT_TYPES] if event_weights else None
+        self.event_cum_weights = list(itertools.accumulate(weights)) if weights else None
+        self.event_weights = weights
+        for encoder in self.encoders.values():
+            encoder.set_event_weights(weights)
+    
+    def _choose_event_type(self, rng: random.Random, event_types: List[str]) -> str:
+        """가중치가 설정되어 있으면 가중치대로, 아니면 균등하게 event_type을 고릅니다."""
+        if self.event_cum_weights:
+            return rng.choices(event_types, cum_weights=self.event_cum_weights)[0]
+        return rng.choice(event_types)
+    
+    def generate_utm_event(self, rng: random.Random = None) -> Dict[str, Any]:
         """UTM 이벤트를 생성합니다."""
+        rng = rng or self.rng
         event_types = [
             "firewall_block", "firewall_allow", "ips_alert", "antivirus_scan",
             "web_filter", "email_filter", "vpn_connection", "vpn_disconnection",
@@ -82,30 +3411,35 @@ class UTMLogSender:
         protocols = ["TCP", "UDP", "HTTP", "HTTPS", "FTP", "SSH", "SMTP"]
         
         # 랜덤 IP 주소 생성
-        source_ip = f"{random.randint(1, 254)}.{random.randint(1, 254)}.{random.randint(1, 254)}.{random.randint(1, 254)}"
-        dest_ip = f"{random.randint(1, 254)}.{random.randint(1, 254)}.{random.randint(1, 254)}.{random.randint(1, 254)}"
+        source_ip = f"{rng.randint(1, 254)}.{rng.randint(1, 254)}.{rng.randint(1, 254)}.{rng.randint(1, 254)}"
+        dest_ip = f"{rng.randint(1, 254)}.{rng.randint(1, 254)}.{rng.randint(1, 254)}.{rng.randint(1, 254)}"
         
         event = {
-            "timestamp": datetime.now().isoformat(),
-            "event_type": random.choice(event_types),
+            "timestamp": self.clock.iso_time(),
+            "event_type": self._choose_event_type(rng, event_types),
             "source_ip": source_ip,
             "destination_ip": dest_ip,
-            "source_port": random.randint(1024, 65535),
-            "destination_port": random.choice([80, 443, 22, 21, 25, 53, 3389]),
-            "protocol": random.choice(protocols),
-            "threat_level": random.choice(threat_levels),
-            "action": random.choice(["block", "allow", "log", "alert"]),
-            "user": f"user_{random.randint(1, 100)}",
-            "session_id": f"sess_{random.randint(100000, 999999)}",
-            "bytes_sent": random.randint(100, 1000000),
-            "bytes_received": random.randint(100, 1000000),
-            "message": f"UTM event: {random.choice(event_types)} from {source_ip} to {dest_ip}"
+            "source_port": rng.randint(1024, 65535),
+            "destination_port": rng.choice([80, 443, 22, 21, 25, 53, 3389]),
+            "protocol": rng.choice(protocols),
+            "threat_level": rng.choice(threat_levels),
+            "action": rng.choice(["block", "allow", "log", "alert"]),
+            "user": f"user_{rng.randint(1, 100)}",
+            "session_id": f"sess_{rng.randint(100000, 999999)}",
+            "bytes_sent": rng.randint(100, 1000000),
+            "bytes_received": rng.randint(100, 1000000),
+            "message": f"UTM event: {rng.choice(event_types)} from {source_ip} to {dest_ip}"
         }
         
         return event
     
-    def generate_utm_event_batch(self, batch_size: int = 100) -> List[Dict[str, Any]]:
+    def generate_utm_event_batch(self, batch_size: int = 100, rng: random.Random = None) -> List[Dict[str, Any]]:
         """UTM 이벤트를 배치로 생성합니다."""
+        rng = rng or self.rng
+        if self.generator == 'numpy':
+            # NumPy 모드: 배치 전체의 필드를 벡터 연산으로 추출
+            return list(self.get_encoder().generate_events(batch_size))
+        
         events = []
         event_types = [
             "firewall_block", "firewall_allow", "ips_alert", "antivirus_scan",
@@ -117,38 +3451,44 @@ class UTMLogSender:
         protocols = ["TCP", "UDP", "HTTP", "HTTPS", "FTP", "SSH", "SMTP"]
         ports = [80, 443, 22, 21, 25, 53, 3389]
         
-        # 현재 시간을 미리 생성 (성능 최적화)
-        current_time = datetime.now().isoformat()
+        # 타임스탬프는 공유 시계의 캐시된 문자열 (tick마다 한 번만 렌더링)
+        iso_time = self.clock.iso_time
         
         for _ in range(batch_size):
             # 랜덤 IP 주소 생성 (최적화된 버전)
-            source_ip = f"{random.randint(1, 254)}.{random.randint(1, 254)}.{random.randint(1, 254)}.{random.randint(1, 254)}"
-            dest_ip = f"{random.randint(1, 254)}.{random.randint(1, 254)}.{random.randint(1, 254)}.{random.randint(1, 254)}"
+            source_ip = f"{rng.randint(1, 254)}.{rng.randint(1, 254)}.{rng.randint(1, 254)}.{rng.randint(1, 254)}"
+            dest_ip = f"{rng.randint(1, 254)}.{rng.randint(1, 254)}.{rng.randint(1, 254)}.{rng.randint(1, 254)}"
             
-            event_type = random.choice(event_types)
+            event_type = self._choose_event_type(rng, event_types)
             
             event = {
-                "timestamp": current_time,
+                "timestamp": iso_time(),
                 "event_type": event_type,
                 "source_ip": source_ip,
                 "destination_ip": dest_ip,
-                "source_port": random.randint(1024, 65535),
-                "destination_port": random.choice(ports),
-                "protocol": random.choice(protocols),
-                "threat_level": random.choice(threat_levels),
-                "action": random.choice(["block", "allow", "log", "alert"]),
-                "user": f"user_{random.randint(1, 100)}",
-                "session_id": f"sess_{random.randint(100000, 999999)}",
-                "bytes_sent": random.randint(100, 1000000),
-                "bytes_received": random.randint(100, 1000000),
+                "source_port": rng.randint(1024, 65535),
+                "destination_port": rng.choice(ports),
+                "protocol": rng.choice(protocols),
+                "threat_level": rng.choice(threat_levels),
+                "action": rng.choice(["block", "allow", "log", "alert"]),
+                "user": f"user_{rng.randint(1, 100)}",
+                "session_id": f"sess_{rng.randint(100000, 999999)}",
+                "bytes_sent": rng.randint(100, 1000000),
+                "bytes_received": rng.randint(100, 1000000),
                 "message": f"UTM event: {event_type} from {source_ip} to {dest_ip}"
             }
             events.append(event)
         
         return events
 
-    def generate_utm_event_generator(self, batch_size: int = 100):
-        """UTM 이벤트를 제너레이터로 생성합니다 (메모리 효율적)."""
+    def generate_utm_event_generator(self, batch_size: int = 100, rng: random.Random = None):
+        """UTM 이벤트를 제너레이터로 생성합니다 (메모리 효율적). rng를 생략하면 기본 호스트명의 RNG를 사용합니다."""
+        rng = rng or self.rng
+        if self.generator == 'numpy':
+            # NumPy 모드: 배치 전체의 필드를 벡터 연산으로 추출
+            yield from self.get_encoder().generate_events(batch_size)
+            return
+        
         event_types = [
             "firewall_block", "firewall_allow", "ips_alert", "antivirus_scan",
             "web_filter", "email_filter", "vpn_connection", "vpn_disconnection",
@@ -159,48 +3499,49 @@ class UTMLogSender:
         protocols = ["TCP", "UDP", "HTTP", "HTTPS", "FTP", "SSH", "SMTP"]
         ports = [80, 443, 22, 21, 25, 53, 3389]
         
-        # 현재 시간을 미리 생성 (성능 최적화)
-        current_time = datetime.now().isoformat()
+        # 타임스탬프는 공유 시계의 캐시된 문자열 (tick마다 한 번만 렌더링)
+        iso_time = self.clock.iso_time
         
         for _ in range(batch_size):
             # 랜덤 IP 주소 생성 (최적화된 버전)
-            source_ip = f"{random.randint(1, 254)}.{random.randint(1, 254)}.{random.randint(1, 254)}.{random.randint(1, 254)}"
-            dest_ip = f"{random.randint(1, 254)}.{random.randint(1, 254)}.{random.randint(1, 254)}.{random.randint(1, 254)}"
+            source_ip = f"{rng.randint(1, 254)}.{rng.randint(1, 254)}.{rng.randint(1, 254)}.{rng.randint(1, 254)}"
+            dest_ip = f"{rng.randint(1, 254)}.{rng.randint(1, 254)}.{rng.randint(1, 254)}.{rng.randint(1, 254)}"
             
-            event_type = random.choice(event_types)
+            event_type = self._choose_event_type(rng, event_types)
             
             event = {
-                "timestamp": current_time,
+                "timestamp": iso_time(),
                 "event_type": event_type,
                 "source_ip": source_ip,
                 "destination_ip": dest_ip,
-                "source_port": random.randint(1024, 65535),
-                "destination_port": random.choice(ports),
-                "protocol": random.choice(protocols),
-                "threat_level": random.choice(threat_levels),
-                "action": random.choice(["block", "allow", "log", "alert"]),
-                "user": f"user_{random.randint(1, 100)}",
-                "session_id": f"sess_{random.randint(100000, 999999)}",
-                "bytes_sent": random.randint(100, 1000000),
-                "bytes_received": random.randint(100, 1000000),
+                "source_port": rng.randint(1024, 65535),
+                "destination_port": rng.choice(ports),
+                "protocol": rng.choice(protocols),
+                "threat_level": rng.choice(threat_levels),
+                "action": rng.choice(["block", "allow", "log", "alert"]),
+                "user": f"user_{rng.randint(1, 100)}",
+                "session_id": f"sess_{rng.randint(100000, 999999)}",
+                "bytes_sent": rng.randint(100, 1000000),
+                "bytes_received": rng.randint(100, 1000000),
                 "message": f"UTM event: {event_type} from {source_ip} to {dest_ip}"
             }
             yield event
 
+    def encode_logs(self, count: int, hostname: str = None) -> List[bytes]:
+        """count개의 UTM 로그를 인코딩된 syslog 데이터그램 목록으로 생성합니다."""
+        hostname = hostname or self.hostname
+        encoder = self.get_encoder(hostname)
+        if encoder:
+            return encoder.encode_batch(count)
+        
+        return self.get_formatter(hostname).encode_events(
+            self.generate_utm_event_generator(count, self.get_rng(hostname)))
+    
     def send_log(self, log_data: Dict[str, Any]) -> bool:
         """로그를 전송합니다."""
         try:
-            # JSON 형식으로 직렬화
-            log_message = json.dumps(log_data, ensure_ascii=False)
-            
-            # RFC3164 형식으로 포맷팅 (Syslog 표준)
-            priority = random.randint(0, 191)  # facility * 8 + severity
-            timestamp = datetime.now().strftime("%b %d %H:%M:%S")
-            syslog_message = f"<{priority}>{timestamp} {self.hostname}: {log_message}\n"
-            
-            # UDP로 전송
-            self.socket.sendto(syslog_message.encode('utf-8'), (self.target_host, self.target_port))
-            return True
+            # 선택한 출력 형식(--format)으로 인코딩하여 전송 (호출자의 필드를 그대로 보존)
+            return self.transmitter.send(self.get_formatter().encode_record(log_data))
         except Exception as e:
             print(f"❌ 로그 전송 실패: {e}")
             return False
@@ -208,50 +3549,114 @@ class UTMLogSender:
     def send_log_batch(self, log_batch: List[Dict[str, Any]]) -> int:
         """로그 배치를 전송합니다."""
         sent_count = 0
+        formatter = self.get_formatter()
+        datagrams = []
+        # 레코드마다 따로 인코딩하여 잘못된 레코드 하나가 배치 전체를 막지 않게 함
+        for index, log_data in enumerate(log_batch):
+            try:
+                datagrams.append(formatter.encode_record(log_data))
+            except Exception as e:
+                print(f"❌ 로그 인코딩 실패 (배치 인덱스 {index}): {e}")
+        
         try:
-            # 현재 시간을 미리 생성 (성능 최적화)
-            current_time = datetime.now().strftime("%b %d %H:%M:%S")
-            
-            for log_data in log_batch:
-                # JSON 형식으로 직렬화
-                log_message = json.dumps(log_data, ensure_ascii=False)
-                
-                # RFC3164 형식으로 포맷팅 (Syslog 표준)
-                priority = random.randint(0, 191)  # facility * 8 + severity
-                syslog_message = f"<{priority}>{current_time} {self.hostname}: {log_message}\n"
-                
-                # UDP로 전송
-                self.socket.sendto(syslog_message.encode('utf-8'), (self.target_host, self.target_port))
-                sent_count += 1
+            # sendmmsg로 묶어서 UDP 전송
+            if datagrams:
+                sent_count = self.transmitter.send_many(datagrams)
         except Exception as e:
             print(f"❌ 배치 로그 전송 실패: {e}")
         
         return sent_count
     
-    def send_log_batch_generator(self, batch_size: int = 100) -> int:
-        """제너레이터를 사용하여 로그 배치를 전송합니다 (메모리 효율적)."""
+    def send_log_batch_generator(self, batch_size: int = 100, transmitter=None,
+                                 hostname: str = None) -> Tuple[int, int]:
+        """제너레이터를 사용하여 로그 배치를 청크 단위로 전송합니다 (메모리 효율적).
+        
+        청크마다 중단 요청을 확인하고, 청크에서 예외가 나면 그 청크만 실패로 세고 계속합니다.
+        (전송 성공 수, 실패 수)를 반환하며, 중단으로 보내지 않은 로그는 어느 쪽에도 세지 않습니다.
+        transmitter/hostname을 지정하면 해당 워커(쓰레드)의 전송기와 RNG 스트림을 사용합니다.
+        """
+        transmitter = transmitter or self.transmitter
+        controller = self.controller
+        sent_before = transmitter.packets_sent
+        encoder = self.get_encoder(hostname)
+        if encoder:
+            # 템플릿/NumPy 모드: 인코딩된 데이터그램을 청크 단위로 생성하여 바로 전송
+            chunk_size = encoder.chunk_size
+            encode = encoder.encode_batch
+        else:
+            # dict 모드: 1,000개씩 이벤트를 생성/인코딩하여 전송
+            formatter = self.get_formatter(hostname)
+            events = self.generate_utm_event_generator(batch_size, self.get_rng(hostname))
+            chunk_size = 1000
+            
+            def encode(size: int) -> List[bytes]:
+                return formatter.encode_events(itertools.islice(events, size))
+        
+        attempted = 0
+        for i in range(0, batch_size, chunk_size):
+            if controller.stopped:
+                break
+            size = min(chunk_size, batch_size - i)
+            attempted += size
+            try:
+                transmitter.send_many(encode(size))
+            except Exception as e:
+                controller.record_error(e, "템플릿 배치 로그" if encoder else "제너레이터 배치 로그")
+        
+        sent = transmitter.packets_sent - sent_before
+        return sent, attempted - sent
+    
+    def _resolve_rate_profile(self, delay: float, increase_rate: float, rate: float = None,
+                              ramp_profile: RateProfile = None) -> RateProfile:
+        """옵션 조합으로부터 목표 EPS 프로파일을 결정합니다 (ramp_profile > rate > delay/increase_rate)."""
+        if ramp_profile:
+            return ramp_profile
+        if rate:
+            return RateProfile.constant(rate)
+        return RateProfile.from_increase_rate(delay, increase_rate)
+    
+    def _send_paced(self, profile: RateProfile, count: int = None, start_time: float = None) -> Tuple[int, int]:
+        """토큰 버킷으로 목표 EPS를 유지하며 전송합니다. (성공 수, 실패 수)를 반환합니다.
+        
+        count가 None이면 self.running이 False가 될 때까지 전송합니다.
+        """
+        start = time.perf_counter()
+        start_time = start_time or start
+        bucket = TokenBucket(profile.rate_at(0))
+        if self.profiler:
+            self.profiler.wrap(bucket, 'acquire', 'pacing')
+        next_rate_update = start + 0.1
+        last_log_time = start
         sent_count = 0
-        try:
-            # 현재 시간을 미리 생성 (성능 최적화)
-            current_time = datetime.now().strftime("%b %d %H:%M:%S")
+        failed_count = 0
+        
+        while self.running and (count is None or sent_count + failed_count < count):
+            now = time.perf_counter()
+            if now >= next_rate_update:
+                # 100ms마다 램프 프로파일에 따라 목표 속도 갱신
+                bucket.set_rate(profile.rate_at(now - start))
+                next_rate_update = now + 0.1
             
-            for log_data in self.generate_utm_event_generator(batch_size):
-                # JSON 형식으로 직렬화
-                log_message = json.dumps(log_data, ensure_ascii=False)
-                
-                # RFC3164 형식으로 포맷팅 (Syslog 표준)
-                priority = random.randint(0, 191)  # facility * 8 + severity
-                syslog_message = f"<{priority}>{current_time} {self.hostname}: {log_message}\n"
-                
-                # UDP로 전송
-                self.socket.sendto(syslog_message.encode('utf-8'), (self.target_host, self.target_port))
-                sent_count += 1
-        except Exception as e:
-            print(f"❌ 제너레이터 배치 로그 전송 실패: {e}")
+            remaining = bucket.capacity if count is None else count - sent_count - failed_count
+            batch_size = bucket.acquire(remaining)
+            if batch_size == 0:
+                continue
+            batch_sent, batch_failed = self.send_log_batch_generator(batch_size)
+            sent_count += batch_sent
+            failed_count += batch_failed
+            
+            now = time.perf_counter()
+            # 10초마다 로그 출력
+            if now - last_log_time >= 10:
+                elapsed = now - start_time
+                speed = sent_count / elapsed if elapsed > 0 else 0
+                print(f"📊 {sent_count}개 로그 전송 완료 (평균 속도: {speed:.1f} 로그/초, 목표 속도: {bucket.rate:.1f} 로그/초, 경과시간: {elapsed:.1f}초)")
+                last_log_time = now
         
-        return sent_count
+        return sent_count, failed_count
     
-    def send_bulk_logs(self, count: int, delay: float = 0.1, increase_rate: float = 1.0, max_speed: bool = False):
+    def send_bulk_logs(self, count: int, delay: float = 0.1, increase_rate: float = 1.0, max_speed: bool = False,
+                       rate: float = None, ramp_profile: RateProfile = None):
         """대량의 로그를 전송합니다."""
         if not self.connect():
             return
@@ -259,19 +3664,17 @@ class UTMLogSender:
         self.running = True
         sent_count = 0
         failed_count = 0
+        profile = self._resolve_rate_profile(delay, increase_rate, rate, ramp_profile)
         
         if max_speed:
             print(f"🚀 {count}개의 UTM 로그를 {self.target_host}:{self.target_port}로 최대 속도로 전송을 시작합니다...")
-            print(f"⚡ delay, increase_rate 옵션은 무시됩니다. (최대 속도)")
+            print("⚡ delay, increase_rate, rate 옵션은 무시됩니다. (최대 속도)")
         else:
             print(f"🚀 {count}개의 UTM 로그를 {self.target_host}:{self.target_port}로 전송을 시작합니다...")
-            print(f"⏱️  초기 로그 간격: {delay}초")
-            if increase_rate > 1.0:
-                print(f"📈 증가율: {increase_rate}배 (시간이 지날수록 전송량 증가)")
+            print(f"⏱️  목표 속도: {profile.describe()}")
         
-        start_time = time.time()
+        start_time = time.perf_counter()
         last_log_time = start_time
-        current_delay = delay
         
         try:
             if max_speed:
@@ -280,12 +3683,77 @@ class UTMLogSender:
                 for i in range(0, count, batch_size):
                     if not self.running:
                         break
-                    current_batch_size = min(batch_size, count - i)
-                    batch_sent = self.send_log_batch_generator(current_batch_size)
+                    batch_sent, batch_failed = self.send_log_batch_generator(min(batch_size, count - i))
+                    sent_count += batch_sent
+                    failed_count += batch_failed
+                    
+                    now = time.perf_counter()
+                    elapsed = now - start_time
+                    # 10초마다 로그 출력
+                    if now - last_log_time >= 10:
+                        speed = sent_count / elapsed if elapsed > 0 else 0
+                        print(f"📊 {sent_count}개 로그 전송 완료 (평균 속도: {speed:.1f} 로그/초, 경과시간: {elapsed:.1f}초)")
+                        last_log_time = now
+            else:
+                # 토큰 버킷 페이싱: 목표 EPS에 맞춰 버스트 단위로 전송
+                sent_count, failed_count = self._send_paced(profile, count, start_time)
+        except KeyboardInterrupt:
+            print("\n⏹️  사용자에 의해 중단되었습니다.")
+        except Exception as e:
+            print(f"❌ 오류 발생: {e}")
+        finally:
+            self.running = False
+            self.disconnect()
+            # 배치 도중 강제 중단되어도 전송기의 누적 카운터로 부분 합계를 맞춤
+            sent_count = self.transmitter.packets_sent
+            failed_count = max(failed_count, self.transmitter.failed)
+        
+        end_time = time.perf_counter()
+        duration = end_time - start_time
+        
+        print("\n📈 전송 완료:")
+        self.controller.print_summary()
+        print(f"   ✅ 성공: {sent_count}개")
+        print(f"   ❌ 실패: {failed_count}개")
+        print(f"   ⏱️  소요시간: {duration:.2f}초")
+        bytes_sent = self.transmitter.bytes_sent if self.transmitter else 0
+        print(f"   📊 평균 속도: {sent_count/duration:.2f} 로그/초 ({bytes_sent/duration/1024/1024:.2f} MB/초)")
+        if self.transmitter:
+            print(f"   📦 syscall당 패킷: {self.transmitter.packets_per_syscall:.1f} ({self.transmitter.method})")
+            print_datagram_stats(self.transmitter)
+            if isinstance(self.transmitter, StreamConnectionPool):
+                print_connection_stats(self.transmitter.connection_stats())
+
+    def continuous_sending(self, delay: float = 0.1, increase_rate: float = 1.0, max_speed: bool = False,
+                           rate: float = None, ramp_profile: RateProfile = None):
+        """연속적으로 로그를 전송합니다."""
+        if not self.connect():
+            return
+        
+        self.running = True
+        sent_count = 0
+        profile = self._resolve_rate_profile(delay, increase_rate, rate, ramp_profile)
+        
+        if max_speed:
+            print(f"🔄 {self.target_host}:{self.target_port}로 연속 최대 속도 로그 전송을 시작합니다...")
+            print("⚡ delay, increase_rate, rate 옵션은 무시됩니다. (최대 속도)")
+        else:
+            print(f"🔄 {self.target_host}:{self.target_port}로 연속 로그 전송을 시작합니다...")
+            print(f"⏱️  목표 속도: {profile.describe()}")
+        print("⏹️  중단하려면 Ctrl+C를 누르세요.")
+        
+        start_time = time.perf_counter()
+        last_log_time = start_time
+        
+        try:
+            if max_speed:
+                # 최대 속도 모드: 제너레이터 배치 전송 사용 (메모리 효율적)
+                batch_size = 50000  # 5만개로 증가 (기존 5000에서 10배 증가)
+                while self.running:
+                    batch_sent, _ = self.send_log_batch_generator(batch_size)
                     sent_count += batch_sent
-                    failed_count += (current_batch_size - batch_sent)
                     
-                    now = time.time()
+                    now = time.perf_counter()
                     elapsed = now - start_time
                     # 10초마다 로그 출력
                     if now - last_log_time >= 10:
@@ -293,106 +3761,402 @@ class UTMLogSender:
                         print(f"📊 {sent_count}개 로그 전송 완료 (평균 속도: {speed:.1f} 로그/초, 경과시간: {elapsed:.1f}초)")
                         last_log_time = now
             else:
-                # 기존 방식: 개별 전송
-                for i in range(count):
+                # 토큰 버킷 페이싱: 목표 EPS에 맞춰 버스트 단위로 전송
+                sent_count, _ = self._send_paced(profile, None, start_time)
+        except KeyboardInterrupt:
+            print("\n⏹️  사용자에 의해 중단되었습니다.")
+        except Exception as e:
+            print(f"❌ 오류 발생: {e}")
+        finally:
+            self.running = False
+            self.disconnect()
+            sent_count = self.transmitter.packets_sent
+            duration = time.perf_counter() - start_time
+            self.controller.print_summary(indent="")
+            print(f"📈 총 {sent_count}개 로그 전송 완료 ({self.transmitter.bytes_sent/1024/1024:.2f} MB, "
+                  f"평균 {sent_count/duration:.1f} 로그/초, {self.transmitter.bytes_sent/duration/1024/1024:.2f} MB/초)")
+            print(f"📦 syscall당 패킷: {self.transmitter.packets_per_syscall:.1f} ({self.transmitter.method})")
+            print_datagram_stats(self.transmitter, indent="")
+            if isinstance(self.transmitter, StreamConnectionPool):
+                print_connection_stats(self.transmitter.connection_stats(), indent="")
+
+    def generate_corpus(self, path: str, count: int):
+        """count개의 syslog 데이터그램을 미리 생성하여 재생용 코퍼스 파일로 저장합니다."""
+        print(f"📝 {count}개의 UTM 로그를 {path}에 생성합니다...")
+        self.running = True
+        start_time = time.perf_counter()
+        chunk_size = 10000
+        
+        formatter = self.get_formatter()
+        sequence = SequenceStamper("corpus", formatter) if self.sequence else None
+        payload = PayloadSizer.from_dict(self.payload, rng=self.get_rng(f"{self.hostname}:payload")) if self.payload else None
+        # 크기 분포와 묶음은 생성 시 적용하므로 재생 시에는 레코드를 그대로 전송
+        packer = DatagramPacker.for_mtu(self.mtu, 40 if sequence else 0) if self.pack else None
+        
+        def batches():
+            for i in range(0, count, chunk_size):
+                if not self.running:
+                    break
+                datagrams = self.encode_logs(min(chunk_size, count - i))
+                if payload:
+                    datagrams = payload.apply(datagrams, formatter)
+                if packer:
+                    datagrams, _ = packer.pack(datagrams)
+                yield sequence.stamp_many(datagrams) if sequence else datagrams
+        
+        try:
+            written, total_bytes = ReplayCorpus.write(path, batches())
+        except OSError as e:
+            print(f"❌ 코퍼스 파일 생성 실패: {e}")
+            return
+        
+        duration = time.perf_counter() - start_time
+        print("\n📈 코퍼스 생성 완료:")
+        self.controller.print_summary()
+        print(f"   ✅ 레코드: {written}개")
+        print(f"   💾 파일 크기: {os.path.getsize(path)/1024/1024:.2f} MB (평균 데이터그램 {total_bytes/max(written, 1):.0f} bytes)")
+        print(f"   ⏱️  소요시간: {duration:.2f}초")
+    
+    def replay_corpus(self, path: str, loops: int = 1, rewrite_timestamp: bool = False, rate: float = None):
+        """코퍼스 파일을 mmap으로 매핑하여 재인코딩 없이 그대로 전송합니다.
+        
+        UDP + sendmmsg에서는 iovec이 매핑 영역을 직접 가리키므로 패킷별 복사나 객체 생성이 없습니다.
+        loops가 0이면 Ctrl+C까지 반복 재생합니다.
+        """
+        try:
+            corpus = ReplayCorpus(path)
+        except (OSError, ValueError) as e:
+            print(f"❌ 코퍼스 파일을 열 수 없습니다: {e}")
+            return
+        if not self.connect():
+            corpus.close()
+            return
+        
+        transmitter = self.transmitter
+        # 코퍼스 레코드는 그대로 재생 (일련번호, 크기 분포, 묶음은 코퍼스 생성 시에 적용)
+        transmitter.sequence = None
+        transmitter.payload = None
+        if isinstance(transmitter, UDPBatchTransmitter):
+            transmitter.packer = None
+        record_count = len(corpus)
+        zero_copy = isinstance(transmitter, UDPBatchTransmitter) and transmitter.method == "sendmmsg"
+        stream = isinstance(transmitter, StreamConnectionPool)
+        anchor = ctypes.c_char.from_buffer(corpus.mmap) if zero_copy else None
+        base_address = ctypes.addressof(anchor) if zero_copy else 0
+        offsets, lengths, view = corpus.offsets, corpus.lengths, corpus.view
+        bucket = TokenBucket(rate) if rate else None
+        batch_size = transmitter.batch_size
+        if self.profiler:
+            if bucket:
+                self.profiler.wrap(bucket, 'acquire', 'pacing')
+            self.profiler.wrap(corpus, 'rewrite_timestamps', 'format')
+        
+        loop_text = "무한 반복" if loops == 0 else f"{loops}회"
+        print(f"🔁 {record_count}개 레코드({corpus.total_bytes/1024/1024:.2f} MB)를 {self.target_host}:{self.target_port}로 {loop_text} 재생합니다...")
+        print(f"⚡ 전송 방식: {'zero-copy sendmmsg' if zero_copy else transmitter.method}"
+              f"{', 타임스탬프 갱신' if rewrite_timestamp else ''}"
+              f"{f', 목표 속도 {rate:,.1f} EPS' if rate else ', 최대 속도'}")
+        
+        self.running = True
+        sent_count = 0
+        failed_count = 0
+        completed_loops = 0
+        start_time = time.perf_counter()
+        last_log_time = start_time
+        
+        try:
+            while self.running and record_count and (loops == 0 or completed_loops < loops):
+                i = 0
+                while self.running and i < record_count:
+                    size = min(batch_size, record_count - i)
+                    if bucket:
+                        size = bucket.acquire(size)
+                        if size == 0:
+                            continue
+                    if rewrite_timestamp:
+                        corpus.rewrite_timestamps(i, i + size, self.clock.syslog_time())
+                    
+                    if zero_copy:
+                        batch_sent = transmitter.send_regions(base_address, offsets, lengths, i, size)
+                    elif stream:
+                        batch_sent = transmitter.send_many([bytes(view[offsets[j]:offsets[j] + lengths[j]]) for j in range(i, i + size)])
+                    else:
+                        batch_sent = transmitter.send_many([view[offsets[j]:offsets[j] + lengths[j]] for j in range(i, i + size)])
+                    sent_count += batch_sent
+                    failed_count += size - batch_sent
+                    i += size
+                    
+                    now = time.perf_counter()
+                    # 10초마다 로그 출력
+                    if now - last_log_time >= 10:
+                        elapsed = now - start_time
+                        print(f"📊 {sent_count}개 로그 전송 완료 (평균 속도: {sent_count/elapsed:.1f} 로그/초, 경과시간: {elapsed:.1f}초)")
+                        last_log_time = now
+                if i >= record_count:
+                    completed_loops += 1
+        except KeyboardInterrupt:
+            print("\n⏹️  사용자에 의해 중단되었습니다.")
+        except Exception as e:
+            print(f"❌ 오류 발생: {e}")
+        finally:
+            self.running = False
+            del anchor
+            self.disconnect()
+            corpus.close()
+        
+        duration = time.perf_counter() - start_time
+        print("\n📈 재생 완료:")
+        self.controller.print_summary()
+        print(f"   ✅ 성공: {sent_count}개")
+        print(f"   ❌ 실패: {failed_count}개")
+        print(f"   🔁 재생 횟수: {completed_loops}회")
+        print(f"   ⏱️  소요시간: {duration:.2f}초")
+        print(f"   📊 평균 속도: {sent_count/duration:.2f} 로그/초 ({transmitter.bytes_sent/duration/1024/1024:.2f} MB/초)")
+        print(f"   📦 syscall당 패킷: {transmitter.packets_per_syscall:.1f} ({transmitter.method})")
+        if stream:
+            print_connection_stats(transmitter.connection_stats())
+
+    def run_workload(self, workload: Workload):
+        """워크로드 파일의 단계들을 순서대로 실행합니다.
+
+        실행 전에 Workload.compile()로 틱별·목적지별 전송 개수를 모두 계산해 두므로, 실행 중에는
+        틱마다 절대 시각(단계 시작 + i × tick)까지 대기한 뒤 미리 정해진 개수만큼 인코딩·전송합니다.
+        단계 전환 시에만 이벤트 가중치와 크기 분포를 바꿉니다. repeat가 0이면 Ctrl+C까지 반복합니다.
+        """
+        plan = workload.compile(Destination(self.target_host, self.target_port))
+        transmitters = {}
+        try:
+            for _, destinations, _ in plan:
+                for destination in destinations:
+                    key = (destination.host, destination.port)
+                    if key not in transmitters:
+                        label = str(destination)
+                        transmitters[key] = self.create_transmitter(self.new_metrics_shard(label), label, key)
+        except Exception as e:
+            print(f"❌ {self.transport.upper()} 전송기 생성 실패: {e}")
+            for transmitter in transmitters.values():
+                transmitter.close()
+            return
+
+        tick = workload.tick
+        repeat_text = "무한 반복" if workload.repeat == 0 else f"{workload.repeat}회"
+        print(f"🗂️  워크로드: {len(plan)}개 단계, 1회 {workload.duration:g}초, {repeat_text} (틱 {tick * 1000:g}ms)")
+        for phase, _, counts in plan:
+            print(f"   • {phase.name}: {phase.describe()} → 계획 {sum(sum(c) for c in counts):,}개")
+
+        formatter = self.get_formatter()
+        default_payloads = {key: transmitter.payload for key, transmitter in transmitters.items()}
+        self.get_encoder(self.hostname)  # 첫 틱이 인코더 초기화 시간만큼 밀리지 않도록 미리 생성
+        sleep, clock = time.sleep, time.perf_counter
+        self.running = True
+        sent_count = 0
+        failed_count = 0
+        completed_loops = 0
+        start_time = time.perf_counter()
+
+        try:
+            while self.running and (workload.repeat == 0 or completed_loops < workload.repeat):
+                for phase, destinations, counts in plan:
                     if not self.running:
                         break
-                    log_event = self.generate_utm_event()
-                    if self.send_log(log_event):
-                        sent_count += 1
-                        now = time.time()
-                        elapsed = now - start_time
-                        # 10초마다 로그 출력
-                        if now - last_log_time >= 10:
-                            speed = sent_count / elapsed if elapsed > 0 else 0
-                            print(f"📊 {sent_count}개 로그 전송 완료 (평균 속도: {speed:.1f} 로그/초, 경과시간: {elapsed:.1f}초)")
-                            last_log_time = now
-                    else:
-                        failed_count += 1
-                    # 기존 방식: delay 및 increase_rate 적용
-                    elapsed_time = time.time() - start_time
-                    if increase_rate > 1.0:
-                        current_delay = max(0.01, delay / (1 + (increase_rate - 1) * elapsed_time / 60))
-                    time.sleep(current_delay)
+                    self.set_event_weights(phase.event_weights)
+                    # 단계의 크기 분포가 없으면 --payload-size 설정(또는 원래 크기)으로 전송
+                    sizer = phase.payload
+                    if sizer:
+                        sizer.rng = self.get_rng(f"{self.hostname}:payload")
+                    for key, transmitter in transmitters.items():
+                        transmitter.payload = sizer or default_payloads[key]
+                        transmitter.formatter = formatter
+                    targets = [(transmitters[(d.host, d.port)], c) for d, c in zip(destinations, counts)]
+                    tick_count = len(counts[0])
+                    phase_sent = 0
+                    phase_failed = 0
+                    max_lag = 0.0
+                    phase_start = clock()
+
+                    for i in range(tick_count):
+                        if not self.running:
+                            break
+                        delay = phase_start + i * tick - clock()
+                        if delay > 0:
+                            sleep(delay)
+                        elif -delay > max_lag:
+                            max_lag = -delay
+                        for transmitter, tick_counts in targets:
+                            n = tick_counts[i]
+                            if not n:
+                                continue
+                            batch_sent = transmitter.send_many(self.encode_logs(n))
+                            phase_sent += batch_sent
+                            phase_failed += n - batch_sent
+
+                    phase_duration = clock() - phase_start
+                    sent_count += phase_sent
+                    failed_count += phase_failed
+                    target_eps = sum(sum(c) for c in counts) / phase.duration
+                    print(f"📊 단계 '{phase.name}': {phase_sent:,}개 전송 (실패 {phase_failed:,}개), "
+                          f"{phase_sent / phase_duration if phase_duration > 0 else 0:,.1f} EPS "
+                          f"(목표 {target_eps:,.1f}), 최대 지연 {max_lag * 1000:.1f}ms")
+                else:
+                    completed_loops += 1
         except KeyboardInterrupt:
             print("\n⏹️  사용자에 의해 중단되었습니다.")
         except Exception as e:
             print(f"❌ 오류 발생: {e}")
         finally:
             self.running = False
-            self.disconnect()
-        
-        end_time = time.time()
-        duration = end_time - start_time
-        
-        print(f"\n📈 전송 완료:")
+            self.set_event_weights(None)
+            for transmitter in transmitters.values():
+                transmitter.close()
+
+        duration = time.perf_counter() - start_time
+        bytes_sent = sum(transmitter.bytes_sent for transmitter in transmitters.values())
+        print("\n📈 워크로드 완료:")
+        self.controller.print_summary()
         print(f"   ✅ 성공: {sent_count}개")
         print(f"   ❌ 실패: {failed_count}개")
+        print(f"   🔁 반복 횟수: {completed_loops}회")
         print(f"   ⏱️  소요시간: {duration:.2f}초")
-        print(f"   📊 평균 속도: {sent_count/duration:.2f} 로그/초")
+        print(f"   📊 평균 속도: {sent_count/duration:.2f} 로그/초 ({bytes_sent/duration/1024/1024:.2f} MB/초)")
 
-    def continuous_sending(self, delay: float = 0.1, increase_rate: float = 1.0, max_speed: bool = False):
-        """연속적으로 로그를 전송합니다."""
-        if not self.connect():
-            return
+    def send_async_multi_destination(self, destinations: List[Destination], count: int = None, rate: float = None):
+        """asyncio 이벤트 루프 하나로 여러 목적지에 동시에 로그를 전송합니다.
         
-        self.running = True
-        sent_count = 0
+        count는 목적지 가중치 비율로 나누어 전송하며, None이면 Ctrl+C까지 연속 전송합니다.
+        목적지별 rate가 없으면 전체 rate를 가중치 비율로 나누고, 둘 다 없으면 최대 속도로 전송합니다.
+        """
+        total_weight = sum(d.weight for d in destinations) or 1.0
         
-        if max_speed:
-            print(f"🔄 {self.target_host}:{self.target_port}로 연속 최대 속도 로그 전송을 시작합니다...")
-            print(f"⚡ delay, increase_rate 옵션은 무시됩니다. (최대 속도)")
-        else:
-            print(f"🔄 {self.target_host}:{self.target_port}로 연속 로그 전송을 시작합니다...")
-            print(f"⏱️  초기 로그 간격: {delay}초")
-            if increase_rate > 1.0:
-                print(f"📈 증가율: {increase_rate}배 (시간이 지날수록 전송량 증가)")
-        print("⏹️  중단하려면 Ctrl+C를 누르세요.")
+        # 가중치 비율로 로그 개수/속도 분배
+        counts = [None] * len(destinations)
+        if count is not None:
+            counts = [int(count * d.weight / total_weight) for d in destinations]
+            for i in range(count - sum(counts)):
+                counts[i % len(counts)] += 1
+        rates = [d.rate or (rate * d.weight / total_weight if rate else None) for d in destinations]
         
-        start_time = time.time()
-        last_log_time = start_time
-        current_delay = delay
+        print(f"🚀 {len(destinations)}개 목적지로 비동기 전송을 시작합니다...")
+        for destination, destination_count, destination_rate in zip(destinations, counts, rates):
+            count_text = f"{destination_count}개" if destination_count is not None else "연속"
+            rate_text = f"{destination_rate:,.1f} EPS" if destination_rate else "최대 속도"
+            print(f"   🎯 {destination} (가중치 {destination.weight:g}): {count_text}, {rate_text}")
+        if count is None:
+            print("⏹️  중단하려면 Ctrl+C를 누르세요.")
         
+        self.running = True
+        protocols: List[_DestinationProtocol] = []
+        start_time = time.perf_counter()
         try:
-            if max_speed:
-                # 최대 속도 모드: 제너레이터 배치 전송 사용 (메모리 효율적)
-                batch_size = 50000  # 5만개로 증가 (기존 5000에서 10배 증가)
-                while self.running:
-                    batch_sent = self.send_log_batch_generator(batch_size)
-                    sent_count += batch_sent
-                    
-                    now = time.time()
-                    elapsed = now - start_time
-                    # 10초마다 로그 출력
-                    if now - last_log_time >= 10:
-                        speed = sent_count / elapsed if elapsed > 0 else 0
-                        print(f"📊 {sent_count}개 로그 전송 완료 (평균 속도: {speed:.1f} 로그/초, 경과시간: {elapsed:.1f}초)")
-                        last_log_time = now
-            else:
-                # 기존 방식: 개별 전송
-                while self.running:
-                    log_event = self.generate_utm_event()
-                    if self.send_log(log_event):
-                        sent_count += 1
-                        now = time.time()
-                        elapsed = now - start_time
-                        # 10초마다 로그 출력
-                        if now - last_log_time >= 10:
-                            speed = sent_count / elapsed if elapsed > 0 else 0
-                            print(f"📊 {sent_count}개 로그 전송 완료 (평균 속도: {speed:.1f} 로그/초, 경과시간: {elapsed:.1f}초)")
-                            last_log_time = now
-                    elapsed_time = time.time() - start_time
-                    if increase_rate > 1.0:
-                        current_delay = max(0.01, delay / (1 + (increase_rate - 1) * elapsed_time / 60))
-                    time.sleep(current_delay)
+            asyncio.run(self._run_async_destinations(destinations, counts, rates, protocols))
         except KeyboardInterrupt:
             print("\n⏹️  사용자에 의해 중단되었습니다.")
         except Exception as e:
             print(f"❌ 오류 발생: {e}")
         finally:
             self.running = False
-            self.disconnect()
-            print(f"📈 총 {sent_count}개 로그 전송 완료")
+        
+        duration = time.perf_counter() - start_time
+        total_sent = sum(p.sent for p in protocols)
+        total_bytes = sum(p.bytes_sent for p in protocols)
+        
+        print("\n📈 비동기 다중 목적지 전송 완료:")
+        self.controller.print_summary()
+        for destination, protocol in zip(destinations, protocols):
+            elapsed = protocol.elapsed or duration
+            print(f"   🎯 {destination}: {protocol.sent}개 ({protocol.sent/elapsed:.1f} 로그/초, "
+                  f"{protocol.bytes_sent/elapsed/1024/1024:.2f} MB/초), 일시정지 {protocol.pauses}회, 오류 {protocol.errors}개")
+        print(f"   ✅ 총 전송: {total_sent}개")
+        print(f"   ⏱️  소요시간: {duration:.2f}초")
+        print(f"   📊 평균 속도: {total_sent/duration:.2f} 로그/초 ({total_bytes/duration/1024/1024:.2f} MB/초)")
+    
+    async def _run_async_destinations(self, destinations: List[Destination], counts: List[Optional[int]],
+                                      rates: List[Optional[float]], protocols: List[_DestinationProtocol]):
+        """목적지별 데이터그램 엔드포인트를 만들고 전송 작업을 동시에 실행합니다."""
+        loop = asyncio.get_running_loop()
+        transports = []
+        try:
+            for index, destination in enumerate(destinations):
+                metrics = self.new_metrics_shard(f"dest{index + 1}")
+                transport, protocol = await loop.create_datagram_endpoint(
+                    lambda: _DestinationProtocol(metrics), remote_addr=(destination.host, destination.port))
+                transport.get_extra_info('socket').setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 1024 * 1024)
+                transports.append(transport)
+                protocols.append(protocol)
+            
+            await asyncio.gather(*(
+                self._async_destination_worker(index + 1, transport, protocol, destination_count, destination_rate)
+                for index, (transport, protocol, destination_count, destination_rate)
+                in enumerate(zip(transports, protocols, counts, rates))
+            ))
+        finally:
+            for transport in transports:
+                transport.close()
+    
+    async def _async_destination_worker(self, index: int, transport, protocol: _DestinationProtocol,
+                                        count: Optional[int], rate: Optional[float]):
+        """한 목적지에 대해 생성과 전송을 번갈아 수행합니다. 전송 버퍼가 차면 해당 목적지만 대기합니다."""
+        hostname = f"{self.hostname}-dest{index}"
+        bucket = TokenBucket(rate) if rate else None
+        chunk_size = 1024
+        remaining = count
+        metrics = protocol.metrics
+        formatter = self.get_formatter(hostname)
+        sequence = SequenceStamper(f"dest{index}", formatter) if self.sequence else None
+        payload = None
+        if self.payload:
+            payload = PayloadSizer.from_dict(self.payload, rng=self.get_rng(f"{hostname}:payload"))
+        packer = DatagramPacker.for_mtu(self.mtu, 40 if sequence else 0) if self.pack else None
+        sendto = transport.sendto
+        profiler = self.profiler
+        if profiler:
+            # 전송기를 거치지 않으므로 단계별 객체와 sendto를 직접 계측
+            for target, name, stage in ((payload, 'apply', 'payload'), (packer, 'pack', 'pack'),
+                                        (sequence, 'stamp_many', 'sequence')):
+                if target:
+                    profiler.wrap(target, name, stage)
+            sendto = profiler.timed(sendto, 'syscall')
+        started = time.perf_counter()
+        
+        while self.running and (remaining is None or remaining > 0):
+            batch_size = chunk_size if remaining is None else min(chunk_size, remaining)
+            if bucket:
+                wait = bucket.wait_time(batch_size)
+                if wait > 0:
+                    wait_started = time.perf_counter_ns()
+                    await asyncio.sleep(wait)
+                    if profiler:
+                        profiler.add('pacing', time.perf_counter_ns() - wait_started)
+                batch_size = bucket.take(batch_size)
+                if batch_size == 0:
+                    continue
+            
+            if profiler:
+                profiler.count_events(batch_size)
+            datagrams = self.encode_logs(batch_size, hostname)
+            if payload:
+                datagrams = payload.apply(datagrams, formatter)
+            counts = itertools.repeat(1)
+            if packer:
+                datagrams, counts = packer.pack(datagrams)
+            if sequence:
+                datagrams = sequence.stamp_many(datagrams)
+            for data, messages in zip(datagrams, counts):
+                if not protocol.writable.is_set():
+                    # 이 목적지의 전송 버퍼가 가득 참: 다른 목적지는 계속 진행
+                    await protocol.writable.wait()
+                send_started = time.perf_counter_ns()
+                sendto(data)
+                protocol.sent += messages
+                protocol.bytes_sent += len(data)
+                if metrics:
+                    metrics.record_send(time.perf_counter_ns() - send_started, messages, len(data))
+            
+            if remaining is not None:
+                remaining -= batch_size
+            # 다른 목적지 작업에 실행 기회를 양보
+            await asyncio.sleep(0)
+        
+        protocol.elapsed = time.perf_counter() - started
 
     def send_bulk_logs_multi_thread(self, count: int, thread_count: int = 4, max_speed: bool = True):
         """멀티쓰레드를 사용하여 대량의 로그를 전송합니다."""
@@ -407,62 +4171,1002 @@ class UTMLogSender:
         remaining_logs = count % thread_count
         
         threads = []
-        results = []
+        # 쓰레드별 결과 칸: 목록 append 순서나 반복 변수 캡처와 무관하게 쓰레드 번호로 기록
+        slots = WorkerSlots(thread_count)
+        connection_stats: List[List[Dict[str, Any]]] = [[] for _ in range(thread_count)]
+        self.running = True
         
-        def thread_worker(thread_id: int, log_count: int):
-            """개별 쓰레드에서 실행되는 작업"""
+        def thread_worker(index: int, log_count: int):
+            """개별 쓰레드에서 실행되는 작업. 배치마다 중단 요청을 확인하고 결과 칸을 갱신합니다."""
+            thread_id = index + 1
+            try:
+                # 각 쓰레드마다 새로운 소켓 및 배치 전송기 생성
+                transmitter = self.create_transmitter(self.new_metrics_shard(f"thread{thread_id}"), f"thread{thread_id}")
+            except Exception as e:
+                print(f"❌ 쓰레드 {thread_id} 오류: {e}")
+                slots.update(index, 0, log_count, 0, 0)
+                return
+            
+            batch_size = 10000  # 쓰레드당 배치 크기
+            hostname = f"{self.hostname}-thread{thread_id}"  # 쓰레드별 독립 RNG 스트림
+            sent_count = 0
+            failed_count = 0
             try:
-                # 각 쓰레드마다 새로운 소켓 생성
-                thread_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-                thread_socket.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 1024 * 1024)
-                
-                sent_count = 0
-                batch_size = 10000  # 쓰레드당 배치 크기
-                
                 for i in range(0, log_count, batch_size):
-                    current_batch_size = min(batch_size, log_count - i)
-                    
-                    # 제너레이터로 이벤트 생성 및 전송
-                    for _ in range(current_batch_size):
-                        event = next(self.generate_utm_event_generator(1))
-                        log_message = json.dumps(event, ensure_ascii=False)
-                        priority = random.randint(0, 191)
-                        timestamp = datetime.now().strftime("%b %d %H:%M:%S")
-                        syslog_message = f"<{priority}>{timestamp} {self.hostname}-thread{thread_id}: {log_message}\n"
-                        
-                        thread_socket.sendto(syslog_message.encode('utf-8'), (self.target_host, self.target_port))
-                        sent_count += 1
-                
-                thread_socket.close()
-                return sent_count
-                
+                    if not self.running:
+                        break
+                    batch_sent, batch_failed = self.send_log_batch_generator(
+                        min(batch_size, log_count - i), transmitter, hostname)
+                    sent_count += batch_sent
+                    failed_count += batch_failed
+                    slots.update(index, sent_count, failed_count, transmitter.syscalls, transmitter.bytes_sent)
             except Exception as e:
                 print(f"❌ 쓰레드 {thread_id} 오류: {e}")
-                return 0
+            finally:
+                transmitter.close()
+            
+            if isinstance(transmitter, StreamConnectionPool):
+                stats = transmitter.connection_stats()
+                for stat in stats:
+                    stat['label'] = f"쓰레드 {thread_id} 연결 {stat['connection']}"
+                connection_stats[index] = stats
         
-        start_time = time.time()
+        start_time = time.perf_counter()
         
-        # 쓰레드 생성 및 시작
+        # 쓰레드 생성 및 시작 (데몬 쓰레드: 종료 대기 시간을 넘기면 기다리지 않고 종료)
         for i in range(thread_count):
             thread_log_count = logs_per_thread + (1 if i < remaining_logs else 0)
-            thread = threading.Thread(target=lambda: results.append(thread_worker(i+1, thread_log_count)))
+            thread = threading.Thread(target=thread_worker, args=(i, thread_log_count), daemon=True)
             threads.append(thread)
             thread.start()
         
         # 모든 쓰레드 완료 대기
-        for thread in threads:
-            thread.join()
+        try:
+            self.controller.join(threads)
+        except KeyboardInterrupt:
+            print("\n⏹️  사용자에 의해 중단되었습니다.")
+        finally:
+            self.running = False
         
-        end_time = time.time()
+        end_time = time.perf_counter()
         duration = end_time - start_time
-        total_sent = sum(results)
+        total_sent, total_failed, total_syscalls, total_bytes = slots.totals()
+        unfinished = sum(1 for thread in threads if thread.is_alive())
         
-        print(f"\n📈 멀티쓰레드 전송 완료:")
+        print("\n📈 멀티쓰레드 전송 완료:")
+        self.controller.print_summary()
         print(f"   ✅ 총 전송: {total_sent}개")
-        print(f"   🧵 사용된 쓰레드: {thread_count}개")
+        print(f"   ❌ 실패: {total_failed}개")
+        print(f"   🧵 사용된 쓰레드: {thread_count}개" + (f" (종료되지 않은 쓰레드 {unfinished}개)" if unfinished else ""))
         print(f"   ⏱️  소요시간: {duration:.2f}초")
-        print(f"   📊 평균 속도: {total_sent/duration:.2f} 로그/초")
+        print(f"   📊 평균 속도: {total_sent/duration:.2f} 로그/초 ({total_bytes/duration/1024/1024:.2f} MB/초)")
         print(f"   📊 쓰레드당 평균: {total_sent/thread_count:.0f} 로그")
+        print(f"   📦 syscall당 패킷: {total_sent/total_syscalls if total_syscalls else 0:.1f}")
+        print_connection_stats([stat for stats in connection_stats for stat in stats])
+
+    def send_bulk_logs_multi_process(self, count: int, process_count: int = None):
+        """멀티프로세스를 사용하여 대량의 로그를 전송합니다 (GIL 우회)."""
+        if not process_count or process_count <= 0:
+            process_count = os.cpu_count() or 1
+        
+        print(f"🚀 {count}개의 UTM 로그를 {process_count}개 프로세스로 {self.target_host}:{self.target_port}에 전송을 시작합니다...")
+        
+        # 프로세스당 처리할 로그 개수
+        logs_per_process = count // process_count
+        remaining_logs = count % process_count
+        
+        tasks = []
+        for i in range(process_count):
+            process_log_count = logs_per_process + (1 if i < remaining_logs else 0)
+            tasks.append((i + 1, process_log_count, self.hostname, self.sender_options()))
+        
+        results = []
+        # 지표 카운터, 결과 칸, 중단 플래그는 공유 메모리이므로 부모에서 만들어 워커 프로세스에 전달
+        metrics_shards = {}
+        if self.metrics:
+            metrics_shards = {i + 1: self.metrics.new_shard(f"proc{i + 1}") for i in range(process_count)}
+        slots = WorkerSlots(process_count)
+        stop_event = multiprocessing.Event()
+        self.running = True
+        start_time = time.perf_counter()
+        
+        pool = multiprocessing.Pool(process_count, initializer=_init_worker_process,
+                                    initargs=(metrics_shards, stop_event, slots))
+        try:
+            pending = pool.starmap_async(_process_worker, tasks)
+            pool.close()
+            # 대기 중에도 시그널을 처리하고, 중단 요청을 워커 프로세스에 전달
+            while not pending.ready():
+                if not self.running:
+                    stop_event.set()
+                pending.wait(0.1)
+            results = pending.get()
+            self.profile_snapshots.extend(result[5] for result in results)
+        except KeyboardInterrupt:
+            print("\n⏹️  사용자에 의해 중단되었습니다.")
+            pool.terminate()
+        finally:
+            pool.join()
+            self.running = False
+        
+        end_time = time.perf_counter()
+        duration = end_time - start_time
+        # 합계는 결과 칸에서 읽으므로 강제 종료된 워커도 마지막 배치까지 포함
+        total_sent, total_failed, total_syscalls, total_bytes = slots.totals()
+        
+        print("\n📈 멀티프로세스 전송 완료:")
+        self.controller.print_summary()
+        print(f"   ✅ 총 전송: {total_sent}개")
+        print(f"   ❌ 실패: {total_failed}개")
+        print(f"   ⚙️  사용된 프로세스: {process_count}개")
+        print(f"   ⏱️  소요시간: {duration:.2f}초")
+        print(f"   📊 평균 속도: {total_sent/duration:.2f} 로그/초 ({total_bytes/duration/1024/1024:.2f} MB/초)")
+        print(f"   📊 프로세스당 평균: {total_sent/process_count:.0f} 로그")
+        print(f"   📦 syscall당 패킷: {total_sent/total_syscalls if total_syscalls else 0:.1f}")
+        print_connection_stats([stat for result in results for stat in result[3]])
+    
+    def send_bulk_logs_pipeline(self, count: Optional[int], generator_count: int = 2, sender_count: int = 1,
+                                ring_size: int = 8 * 1024 * 1024):
+        """생성 워커와 전송 워커를 분리한 파이프라인으로 전송합니다 (공유 메모리 링 버퍼).
+        
+        생성 워커 프로세스마다 링 버퍼가 하나씩 있고, 전송 워커 프로세스는 할당된 링을 비우며 배치 전송합니다.
+        생성이 잠시 멈춰도(GC, 포맷 비용 급증) 링에 쌓인 데이터로 전송이 이어집니다. 링 점유율과 양쪽의
+        대기 시간으로 생성과 전송 중 어느 쪽이 병목인지 보고합니다. count가 None이면 중단될 때까지 전송합니다.
+        """
+        if sender_count > generator_count:
+            print(f"⚠️  전송 워커는 생성 워커 수({generator_count}개)보다 많을 수 없어 {generator_count}개로 줄입니다.")
+            sender_count = generator_count
+        
+        target = f"{count}개의 UTM 로그를" if count else "연속으로 UTM 로그를"
+        print(f"🚀 {target} 파이프라인(생성 워커 {generator_count}개 → 링 버퍼 → 전송 워커 {sender_count}개)으로 "
+              f"{self.target_host}:{self.target_port}에 전송합니다...")
+        if not count:
+            print("⏹️  중단하려면 Ctrl+C를 누르세요.")
+        
+        try:
+            rings = [SharedRing(ring_size) for _ in range(generator_count)]
+        except OSError as e:
+            print(f"❌ 공유 메모리 링 버퍼를 만들 수 없습니다: {e}")
+            return
+        print(f"🔄 링 버퍼: 생성 워커당 {rings[0].capacity/1024/1024:.1f} MB")
+        
+        tasks = []
+        for i in range(generator_count):
+            generator_log_count = None
+            if count:
+                generator_log_count = count // generator_count + (1 if i < count % generator_count else 0)
+            tasks.append((_pipeline_generator, (i + 1, generator_log_count, self.hostname, self.sender_options(),
+                                                rings[i].name)))
+        # 링 i는 전송 워커 i % sender_count가 비움
+        for i in range(sender_count):
+            ring_names = [ring.name for ring in rings[i::sender_count]]
+            tasks.append((_pipeline_sender, (i + 1, ring_names, self.hostname, self.sender_options())))
+        
+        metrics_shards = {}
+        if self.metrics:
+            metrics_shards = {i + 1: self.metrics.new_shard(f"send{i + 1}") for i in range(sender_count)}
+        slots = WorkerSlots(sender_count)
+        stop_event = multiprocessing.Event()
+        occupancy_sums = [0.0] * generator_count
+        samples = 0
+        results = []
+        self.running = True
+        start_time = time.perf_counter()
+        last_log_time = start_time
+        
+        # 워커는 모두 동시에 실행되어야 하므로 작업 수만큼 프로세스를 띄움
+        pool = multiprocessing.Pool(len(tasks), initializer=_init_worker_process,
+                                    initargs=(metrics_shards, stop_event, slots))
+        try:
+            pending = [pool.apply_async(function, args) for function, args in tasks]
+            pool.close()
+            # 대기하면서 링 점유율을 표본 추출하고, 중단 요청을 워커 프로세스에 전달
+            while not all(result.ready() for result in pending):
+                if not self.running:
+                    stop_event.set()
+                for i, ring in enumerate(rings):
+                    occupancy_sums[i] += ring.occupancy
+                samples += 1
+                now = time.perf_counter()
+                # 10초마다 로그 출력
+                if now - last_log_time >= 10:
+                    elapsed = now - start_time
+                    sent = slots.totals()[WorkerSlots.SENT]
+                    occupancy = ", ".join(f"{ring.occupancy * 100:.0f}%" for ring in rings)
+                    print(f"📊 {sent}개 로그 전송 완료 (평균 속도: {sent/elapsed:.1f} 로그/초, 링 점유율: {occupancy}, "
+                          f"경과시간: {elapsed:.1f}초)")
+                    last_log_time = now
+                next(result for result in pending if not result.ready()).wait(0.1)
+            results = [result.get() for result in pending]
+            self.profile_snapshots.extend(profile for _, profile in results)
+        except KeyboardInterrupt:
+            print("\n⏹️  사용자에 의해 중단되었습니다.")
+            pool.terminate()
+        finally:
+            pool.join()
+            self.running = False
+            ring_stats = [ring.stats() for ring in rings]
+            capacity = rings[0].capacity
+            for ring in rings:
+                ring.close()
+        
+        duration = time.perf_counter() - start_time
+        # 합계는 결과 칸에서 읽으므로 강제 종료된 전송 워커도 마지막 레코드까지 포함
+        total_sent, total_failed, total_syscalls, total_bytes = slots.totals()
+        produced = sum(stat['produced'] for stat in ring_stats)
+        generation_failed = sum(stat['failed'] for stat in ring_stats)
+        left_over = produced - sum(stat['consumed'] for stat in ring_stats)
+        
+        print("\n📈 파이프라인 전송 완료:")
+        self.controller.print_summary()
+        print(f"   ✅ 총 전송: {total_sent}개")
+        print(f"   ❌ 실패: {total_failed + generation_failed}개")
+        print(f"   🏭 생성: {produced}개 (생성 워커 {generator_count}개, 전송 워커 {sender_count}개)")
+        if left_over:
+            print(f"   📦 링에 남아 전송하지 못한 로그: {left_over}개")
+        print(f"   ⏱️  소요시간: {duration:.2f}초")
+        print(f"   📊 평균 속도: {total_sent/duration:.2f} 로그/초 ({total_bytes/duration/1024/1024:.2f} MB/초)")
+        print(f"   📦 syscall당 패킷: {total_sent/total_syscalls if total_syscalls else 0:.1f}")
+        
+        print(f"   🔄 링 버퍼 ({capacity/1024/1024:.1f} MB):")
+        producer_waits = []
+        consumer_waits = []
+        occupancies = []
+        for i, stat in enumerate(ring_stats):
+            occupancy = occupancy_sums[i] / samples if samples else 0.0
+            producer_wait = stat['producer_wait_ns'] / 1e9 / duration
+            consumer_wait = stat['consumer_wait_ns'] / 1e9 / duration
+            occupancies.append(occupancy)
+            producer_waits.append(producer_wait)
+            consumer_waits.append(consumer_wait)
+            print(f"      링 {i + 1} (생성 워커 {i + 1} → 전송 워커 {i % sender_count + 1}): "
+                  f"평균 점유율 {occupancy * 100:.1f}%, 최대 {stat['high_water'] / capacity * 100:.1f}%, "
+                  f"생성 대기 {producer_wait * 100:.1f}%, 전송 대기 {consumer_wait * 100:.1f}%")
+        print(f"   🔍 병목: {self._pipeline_bottleneck(occupancies, producer_waits, consumer_waits)}")
+        print_connection_stats([stat for stats, _ in results[generator_count:] for stat in stats])
+    
+    @staticmethod
+    def _pipeline_bottleneck(occupancies: List[float], producer_waits: List[float], consumer_waits: List[float]) -> str:
+        """링 평균 점유율과 생성/전송 워커의 대기 시간 비율로 병목 위치를 판정합니다."""
+        occupancy = sum(occupancies) / len(occupancies)
+        producer_wait = sum(producer_waits) / len(producer_waits)
+        consumer_wait = sum(consumer_waits) / len(consumer_waits)
+        if producer_wait >= 0.2 and occupancy >= 0.5:
+            return ("전송 측 (링이 대부분 차 있고 생성 워커가 빈 공간을 기다림). "
+                    "--senders를 늘리거나 네트워크/수신 측을 확인하세요.")
+        if consumer_wait >= 0.2 and occupancy < 0.5:
+            return ("생성 측 (링이 대부분 비어 있고 전송 워커가 데이터를 기다림). "
+                    "--generators를 늘리거나 template/numpy 생성 방식을 사용하세요.")
+        return "뚜렷하지 않음 (생성과 전송 속도가 비슷함)"
+
+    def coordinate_agents(self, agents: List[Destination], count: int = None, duration: float = None,
+                          rate: float = None, threads: int = None, processes: int = None,
+                          start_delay: float = 2.0, interval: float = 1.0, report_file: str = None,
+                          token: str = None):
+        """코디네이터 모드: 여러 에이전트에 실행 계획을 보내 동시에 전송시키고 결과를 합쳐 보고합니다.
+        
+        count와 rate는 에이전트 가중치 비율로 나눕니다. hello 왕복으로 에이전트별 시계 차이를 추정하여
+        각 에이전트 시계 기준의 시작 시각을 보내므로, 모든 에이전트가 같은 순간에 시작합니다.
+        에이전트의 초당 누적 카운터를 같은 초끼리 합산하여 출력하고, report_file에 JSON으로 저장합니다.
+        count와 duration이 모두 없으면 Ctrl+C까지 전송합니다. token은 에이전트의 --agent-token과 같아야 합니다.
+        """
+        if (threads or processes) and count is None:
+            print("❌ 에이전트의 멀티쓰레드/멀티프로세스 모드에는 --count가 필요합니다.")
+            return
+        
+        links: List[_AgentLink] = []
+        try:
+            for agent in agents:
+                channel = ControlChannel(socket.create_connection((agent.host, agent.port), timeout=5))
+                channel.socket.settimeout(None)
+                sent_at = time.time()
+                channel.send('hello', version=1, token=token)
+                try:
+                    hello = channel.expect('hello')
+                except Exception:
+                    channel.close()
+                    raise
+                received_at = time.time()
+                links.append(_AgentLink(agent, channel, hello, received_at - sent_at,
+                                        hello['time'] - (sent_at + received_at) / 2))
+        except (OSError, ValueError, KeyError) as e:
+            print(f"❌ 에이전트 {agent} 연결 실패: {e}")
+            for link in links:
+                link.channel.close()
+            return
+        
+        # 가중치 비율로 로그 개수/속도 분배
+        total_weight = sum(link.agent.weight for link in links) or 1.0
+        counts = [None] * len(links)
+        if count is not None:
+            counts = [int(count * link.agent.weight / total_weight) for link in links]
+            for i in range(count - sum(counts)):
+                counts[i % len(counts)] += 1
+        rates = [rate * link.agent.weight / total_weight if rate else None for link in links]
+        
+        print(f"🛰️  {len(links)}개 에이전트로 {self.target_host}:{self.target_port}에 분산 전송합니다 "
+              f"({count if count is not None else '연속'}{'개' if count is not None else ''}"
+              f"{f', {duration:g}초' if duration else ''}{f', 목표 {rate:,.1f} EPS' if rate else ', 최대 속도'})")
+        start_at = time.time() + start_delay
+        options = self.sender_options()
+        options['profile_interval'] = None  # 프로파일은 로컬 실행에서만 (에이전트는 결과를 돌려보내지 않음)
+        try:
+            for i, (link, agent_count, agent_rate) in enumerate(zip(links, counts, rates)):
+                run = {'count': agent_count, 'duration': duration, 'rate': agent_rate,
+                       'threads': threads, 'processes': processes}
+                link.channel.send('plan', start_at=start_at + link.offset, interval=interval,
+                                  hostname=f"{self.hostname}-agent{i + 1}", options=options, run=run)
+                link.channel.expect('ready')
+                count_text = f"{agent_count}개" if agent_count is not None else "연속"
+                rate_text = f"{agent_rate:,.1f} EPS" if agent_rate else "최대 속도"
+                print(f"   🤖 {link} ({link.hostname}, CPU {link.cpus}개, 가중치 {link.agent.weight:g}): {count_text}, {rate_text} "
+                      f"| RTT {link.rtt * 1000:.1f}ms, 시계 차이 {link.offset * 1000:+.1f}ms")
+        except (OSError, ValueError) as e:
+            print(f"❌ 실행 계획 전달 실패: {e}")
+            for link in links:
+                link.channel.close()
+            return
+        print(f"⏳ {max(start_at - time.time(), 0):.2f}초 후 동시에 시작합니다. (중단: Ctrl+C)")
+        
+        events = queue.Queue()
+        for i, link in enumerate(links):
+            threading.Thread(target=_read_agent, args=(i, link.channel, events), daemon=True).start()
+        
+        seconds: List[Dict[str, Any]] = []
+        
+        def merge(second: int):
+            # 모든 에이전트의 second초 구간 카운터를 합산하여 출력
+            deltas = [[now - before for now, before in zip(link.at(second), link.at(second - 1))] for link in links]
+            row = {
+                'second': second,
+                'eps': round(sum(delta[0] for delta in deltas) / interval, 1),
+                'bytes_per_second': round(sum(delta[1] for delta in deltas) / interval, 1),
+                'errors': sum(delta[2] for delta in deltas),
+                'agents': {str(link): round(delta[0] / interval, 1) for link, delta in zip(links, deltas)},
+            }
+            seconds.append(row)
+            print(f"📊 {second * interval:>6.1f}초: {row['eps']:>12,.0f} EPS ({row['bytes_per_second']/1024/1024:.1f} MB/s, "
+                  f"오류 {row['errors']}) | " + ", ".join(f"{agent} {eps:,.0f}" for agent, eps in row['agents'].items()))
+        
+        def request_stop():
+            print("⏹️  모든 에이전트에 중단을 요청합니다... (다시 Ctrl+C: 즉시 종료)")
+            for link in links:
+                try:
+                    link.channel.send('stop')
+                except OSError:
+                    pass
+        
+        pending = len(links)
+        next_second = 1
+        stop_sent = False
+        self.running = True
+        while pending:
+            if not self.running and not stop_sent:
+                # SIGINT/SIGTERM: 실행 제어기가 중단 플래그를 세움
+                request_stop()
+                stop_sent = True
+            try:
+                index, message = events.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            except KeyboardInterrupt:
+                if stop_sent:
+                    break
+                print()
+                request_stop()
+                stop_sent = True
+                continue
+            
+            link = links[index]
+            if message is None:
+                if link.result is None:
+                    print(f"⚠️  에이전트 {link} 연결이 끊겼습니다.")
+                    link.result = {'lost': True}
+                    pending -= 1
+            elif message['type'] == 'stats':
+                link.timeline.append((message['packets'], message['bytes'], message['errors']))
+            elif message['type'] == 'done':
+                link.timeline.append((message['packets'], message['bytes'], message['errors']))
+                link.result = message
+                pending -= 1
+            
+            # 모든 에이전트가 보고한(또는 끝난) 초까지 합산 출력
+            while (all(link.result is not None or len(link.timeline) >= next_second for link in links)
+                   and any(len(link.timeline) >= next_second for link in links)):
+                merge(next_second)
+                next_second += 1
+        
+        for link in links:
+            link.channel.close()
+        
+        total_packets = sum(link.at(len(link.timeline))[0] for link in links)
+        total_bytes = sum(link.at(len(link.timeline))[1] for link in links)
+        total_errors = sum(link.at(len(link.timeline))[2] for link in links)
+        elapsed = max([link.result.get('elapsed', 0) for link in links if link.result] or [0])
+        start_lags = [link.result['start_lag'] for link in links if link.result and 'start_lag' in link.result]
+        peak = max((row['eps'] for row in seconds), default=0)
+        
+        print("\n📈 분산 전송 완료:")
+        self.controller.print_summary()
+        for link in links:
+            result = link.result or {}
+            packets = link.at(len(link.timeline))[0]
+            agent_elapsed = result.get('elapsed', 0)
+            status = "연결 끊김" if result.get('lost') else ("중단" if result.get('stopped') else "완료")
+            print(f"   🤖 {link}: {packets:,}개, {packets / agent_elapsed if agent_elapsed else 0:,.1f} EPS, "
+                  f"오류 {link.at(len(link.timeline))[2]}, p99 ≤ {result.get('p99', 0) * 1e6:.0f}us ({status})")
+        print(f"   ✅ 총 전송: {total_packets:,}개 ({total_bytes/1024/1024:.2f} MB)")
+        print(f"   ❌ 전송 오류: {total_errors}개")
+        print(f"   ⏱️  소요시간: {elapsed:.2f}초")
+        print(f"   📊 평균 속도: {total_packets / elapsed if elapsed else 0:,.1f} 로그/초 (최고 {peak:,.0f} 로그/초)")
+        if start_lags:
+            print(f"   🕐 시작 시각 편차: {(max(start_lags) - min(start_lags)) * 1000:.1f}ms")
+        
+        if report_file:
+            report = {
+                'target': f"{self.target_host}:{self.target_port}",
+                'agents': [{'agent': str(link), 'hostname': link.hostname, 'weight': link.agent.weight,
+                            'rtt': link.rtt, 'clock_offset': link.offset, 'count': agent_count, 'rate': agent_rate,
+                            **{key: value for key, value in (link.result or {}).items() if key != 'type'}}
+                           for link, agent_count, agent_rate in zip(links, counts, rates)],
+                'seconds': seconds,
+                'total': {'packets': total_packets, 'bytes': total_bytes, 'errors': total_errors,
+                          'elapsed': elapsed, 'eps': total_packets / elapsed if elapsed else 0, 'peak_eps': peak},
+            }
+            try:
+                with open(report_file, 'w', encoding='utf-8') as f:
+                    json.dump(report, f, ensure_ascii=False, indent=2)
+                print(f"   💾 보고서: {report_file}")
+            except OSError as e:
+                print(f"❌ 보고서를 저장할 수 없습니다: {e}")
+
+class UDPSink:
+    """로컬 UDP 수신기. 수신한 syslog 데이터그램을 세고 일련번호 필드로 손실/순서 뒤바뀜을 검출합니다.
+    
+    스트림별로 [수신 수, 최대 일련번호, 순서 뒤바뀜 수]를 유지합니다. 손실은 스트림별
+    (최대 일련번호 + 1 - 수신 수)로 계산하므로, 스트림 끝부분의 손실은 송신 측 전송 수와
+    비교해야 알 수 있습니다 (벤치마크는 전송 수와 비교).
+    """
+    
+    def __init__(self, host: str = '0.0.0.0', port: int = 514, buffer_size: int = 32 * 1024 * 1024):
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, buffer_size)
+        self.socket.bind((host, port))
+        self.address = self.socket.getsockname()
+        self.lock = threading.Lock()  # HTTP 통계 엔드포인트와 수신 루프 사이의 통계 보호
+        self.reset()
+    
+    def reset(self):
+        """수신 통계를 초기화합니다."""
+        self.packets = 0
+        self.messages = 0  # 묶음 데이터그램(--pack)은 줄 단위로 메시지를 셈
+        self.bytes_received = 0
+        self.invalid = 0
+        self.streams: Dict[bytes, List[int]] = {}
+        self.first_time = None
+        self.last_time = None
+    
+    def receive(self, timeout: float = 0.05, max_packets: int = 4096) -> int:
+        """대기 중인 데이터그램을 최대 max_packets개 수신해 집계하고 수신 수를 반환합니다."""
+        sock = self.socket
+        sock.settimeout(timeout)
+        buffer = bytearray(65536)
+        streams = self.streams
+        match_field = SequenceStamper.FIELD.match
+        received = 0
+        messages = 0
+        nbytes = 0
+        invalid = 0
+        try:
+            while received < max_packets:
+                length = sock.recv_into(buffer)
+                data = bytes(buffer[:length])
+                received += 1
+                messages += data.count(b'\n', 0, length - 1) + 1
+                nbytes += length
+                if not data.startswith(b'<'):
+                    # syslog PRI가 없는 데이터그램
+                    invalid += 1
+                # 일련번호 필드는 마지막 레코드에 있으므로 뒤에서부터 찾음
+                position = data.rfind(b'seq')
+                match = None
+                while position >= 0:
+                    match = match_field(data, position)
+                    if match:
+                        break
+                    position = data.rfind(b'seq', 0, position)
+                if match is None:
+                    continue
+                stream_id = match.group(1)
+                sequence = int(match.group(2))
+                state = streams.get(stream_id)
+                if state is None:
+                    streams[stream_id] = [1, sequence, 0]
+                    continue
+                state[0] += 1
+                if sequence > state[1]:
+                    state[1] = sequence
+                else:
+                    state[2] += 1
+                # 이후에는 빠르게 비우기 위해 타임아웃 없이 수신
+                if received == 1:
+                    sock.settimeout(0)
+        except (socket.timeout, BlockingIOError):
+            pass
+        if received:
+            now = time.perf_counter()
+            self.first_time = self.first_time or now
+            self.last_time = now
+            self.packets += received
+            self.messages += messages
+            self.bytes_received += nbytes
+            self.invalid += invalid
+        return received
+    
+    def stats(self) -> Dict[str, Any]:
+        """수신 통계를 반환합니다."""
+        expected = sum(state[1] + 1 for state in self.streams.values())
+        sequenced = sum(state[0] for state in self.streams.values())
+        duration = (self.last_time - self.first_time) if self.first_time else 0.0
+        return {
+            'packets': self.packets,
+            'messages': self.messages,
+            'bytes': self.bytes_received,
+            'invalid': self.invalid,
+            'streams': len(self.streams),
+            'sequence_gaps': max(expected - sequenced, 0),
+            'reordered': sum(state[2] for state in self.streams.values()),
+            'duration': duration,
+        }
+    
+    def start_http(self, port: int, host: str = '127.0.0.1') -> ThreadingHTTPServer:
+        """수신 통계를 JSON으로 제공하는 HTTP 엔드포인트를 시작합니다 (적응형 속도 제어의 피드백).
+        
+        기본은 로컬 주소에만 엽니다. 다른 호스트의 송신기가 피드백으로 읽으려면 host를 지정합니다.
+        """
+        sink = self
+        
+        class SinkStatsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                with sink.lock:
+                    body = json.dumps(sink.stats()).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def log_message(self, format, *args):
+                pass
+        
+        server = ThreadingHTTPServer((host, port), SinkStatsHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        print(f"📡 수신 통계 엔드포인트: http://{host}:{port}/ (JSON)")
+        return server
+    
+    def serve(self, interval: float = 1.0, idle_timeout: float = None, http_port: int = None,
+              http_host: str = '127.0.0.1'):
+        """Ctrl+C(또는 idle_timeout초 동안 수신 없음)까지 수신하며 주기적으로 통계를 출력합니다."""
+        host, port = self.address
+        print(f"📥 UDP 수신기가 {host}:{port}에서 대기 중입니다... (중단: Ctrl+C)")
+        server = self.start_http(http_port, http_host) if http_port else None
+        last_report = time.perf_counter()
+        last_messages = last_bytes = 0
+        idle_since = time.perf_counter()
+        lock = self.lock
+        try:
+            while True:
+                now = time.perf_counter()
+                # 수신 대기는 잠금 밖에서 하여 HTTP 통계 요청이 대기하지 않도록 함
+                received = 0
+                if select.select([self.socket], [], [], 0.05)[0]:
+                    with lock:
+                        received = self.receive(0)
+                if received:
+                    idle_since = now
+                elif idle_timeout and now - idle_since >= idle_timeout:
+                    break
+                if now - last_report >= interval:
+                    elapsed = now - last_report
+                    if self.messages != last_messages:
+                        print(f"📊 수신 {self.messages}개 ({(self.messages - last_messages)/elapsed:,.0f} 로그/초, "
+                              f"{(self.bytes_received - last_bytes)/elapsed/1024/1024:.2f} MB/초)")
+                    last_report, last_messages, last_bytes = now, self.messages, self.bytes_received
+        except KeyboardInterrupt:
+            print("\n⏹️  사용자에 의해 중단되었습니다.")
+        finally:
+            if server:
+                server.shutdown()
+                server.server_close()
+            self.socket.close()
+        
+        stats = self.stats()
+        print("\n📈 수신 완료:")
+        print(f"   📥 수신: {stats['packets']}개 ({stats['bytes']/1024/1024:.2f} MB), 잘못된 형식 {stats['invalid']}개")
+        if stats['messages'] != stats['packets']:
+            print(f"   📦 묶음 데이터그램 속 메시지: {stats['messages']}개 "
+                  f"(데이터그램당 {stats['messages']/max(stats['packets'], 1):.1f}개)")
+        print(f"   🔢 일련번호 스트림: {stats['streams']}개, 누락 {stats['sequence_gaps']}개, 순서 뒤바뀜 {stats['reordered']}개")
+        if stats['duration'] > 0:
+            print(f"   📊 평균 수신 속도: {stats['messages']/stats['duration']:.2f} 로그/초 "
+                  f"({stats['bytes']/stats['duration']/1024/1024:.2f} MB/초)")
+
+def _sink_process(connection, host: str, port: int):
+    """벤치마크용 수신기 프로세스. 파이프로 reset/collect/stop 명령을 받습니다."""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    sink = UDPSink(host, port)
+    connection.send(sink.address[1])
+    while True:
+        sink.receive()
+        if not connection.poll():
+            continue
+        command, argument = connection.recv()
+        if command == 'reset':
+            sink.reset()
+            connection.send(True)
+        elif command == 'collect':
+            # 마지막 수신 후 argument초 동안 더 들어오는 데이터그램이 없을 때까지 비움
+            idle_since = time.perf_counter()
+            while time.perf_counter() - idle_since < argument:
+                if sink.receive():
+                    idle_since = time.perf_counter()
+            connection.send(sink.stats())
+        else:
+            break
+    sink.socket.close()
+
+def _bench_send(sender: 'UTMLogSender', count: int, send_batch):
+    """단일 송신기로 count개를 전송합니다 (벤치마크 single/batch 모드)."""
+    if not sender.connect():
+        return
+    try:
+        for i in range(0, count, 1000):
+            send_batch(min(1000, count - i))
+        sender.transmitter.flush()
+    finally:
+        sender.disconnect()
+
+# 벤치마크 모드: 이름 -> (생성 방식, 실행 함수(sender, count, 옵션))
+BENCH_MODES = {
+    'single': ('dict', lambda sender, count, options: _bench_send(
+        sender, count, lambda size: [sender.send_log(sender.generate_utm_event()) for _ in range(size)])),
+    'batch': ('dict', lambda sender, count, options: _bench_send(
+        sender, count, lambda size: sender.send_log_batch(sender.generate_utm_event_batch(size)))),
+    'generator': ('dict', lambda sender, count, options: sender.send_bulk_logs(count, max_speed=True)),
+    'template': ('template', lambda sender, count, options: sender.send_bulk_logs(count, max_speed=True)),
+    'numpy': ('numpy', lambda sender, count, options: sender.send_bulk_logs(count, max_speed=True)),
+    'session': ('session', lambda sender, count, options: sender.send_bulk_logs(count, max_speed=True)),
+    'multi-thread': ('template', lambda sender, count, options: sender.send_bulk_logs_multi_thread(
+        count, options['threads'])),
+    'multi-process': ('template', lambda sender, count, options: sender.send_bulk_logs_multi_process(
+        count, options['processes'])),
+    'pipeline': ('template', lambda sender, count, options: sender.send_bulk_logs_pipeline(count)),
+    'async': ('template', lambda sender, count, options: sender.send_async_multi_destination(
+        [Destination(sender.target_host, sender.target_port)], count)),
+    'replay': ('template', lambda sender, count, options: sender.replay_corpus(options['corpus'])),
+}
+
+def run_benchmark(count: int, modes: List[str] = None, output_format: str = 'table', threads: int = 4,
+                  processes: int = None, seed: int = None, use_sendmmsg: bool = True,
+                  log_format: str = 'rfc3164-json') -> List[Dict[str, Any]]:
+    """내장 UDP 수신기를 띄우고 모든 전송 모드를 차례로 실행하여 종단 간 성능을 측정합니다.
+    
+    모드별로 EPS(수신 기준), 손실률, 순서 뒤바뀜, 바이트/초, 사용 CPU 코어 수, 코어당 EPS를 보고합니다.
+    """
+    modes = modes or list(BENCH_MODES)
+    unknown = [mode for mode in modes if mode not in BENCH_MODES]
+    if unknown:
+        raise ValueError(f"알 수 없는 벤치마크 모드: {', '.join(unknown)} (사용 가능: {', '.join(BENCH_MODES)})")
+    if 'numpy' in modes and np is None:
+        print("⚠️  NumPy가 설치되어 있지 않아 numpy 모드를 건너뜁니다.", file=sys.stderr)
+        modes = [mode for mode in modes if mode != 'numpy']
+    
+    parent, child = multiprocessing.Pipe()
+    sink = multiprocessing.Process(target=_sink_process, args=(child, '127.0.0.1', 0), daemon=True)
+    sink.start()
+    port = parent.recv()
+    options = {'threads': threads, 'processes': processes, 'corpus': None}
+    results = []
+    
+    print(f"🏁 {len(modes)}개 모드를 모드당 {count}개 로그로 벤치마크합니다 (수신기: 127.0.0.1:{port})...", file=sys.stderr)
+    try:
+        if 'replay' in modes:
+            # 코퍼스 생성 시간은 측정에서 제외
+            options['corpus'] = os.path.join(tempfile.mkdtemp(prefix='utm-bench-'), 'corpus.bin')
+            corpus_sender = UTMLogSender('127.0.0.1', port, generator='template', sequence=True, log_format=log_format,
+                                         seed=seed)
+            with contextlib.redirect_stdout(io.StringIO()):
+                corpus_sender.generate_corpus(options['corpus'], count)
+        
+        for mode in modes:
+            generator, run = BENCH_MODES[mode]
+            sender = UTMLogSender('127.0.0.1', port, use_sendmmsg=use_sendmmsg, generator=generator, sequence=True,
+                                  log_format=log_format, seed=seed)
+            sender.metrics = MetricsCollector()
+            parent.send(('reset', None))
+            parent.recv()
+            
+            usage_before = resource.getrusage(resource.RUSAGE_SELF), resource.getrusage(resource.RUSAGE_CHILDREN)
+            start_time = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                run(sender, count, options)
+            duration = time.perf_counter() - start_time
+            usage_after = resource.getrusage(resource.RUSAGE_SELF), resource.getrusage(resource.RUSAGE_CHILDREN)
+            cpu_time = sum(after.ru_utime + after.ru_stime - before.ru_utime - before.ru_stime
+                           for before, after in zip(usage_before, usage_after))
+            
+            parent.send(('collect', 0.5))
+            received = parent.recv()
+            totals = sender.metrics.totals()
+            sent = totals[MetricsShard.PACKETS]
+            result = {
+                'mode': mode,
+                'generator': generator,
+                'sent': sent,
+                'received': received['packets'],
+                'loss_percent': round((sent - received['packets']) / sent * 100, 3) if sent else 0.0,
+                'reordered': received['reordered'],
+                'invalid': received['invalid'],
+                'send_errors': sum(totals[MetricsShard.ERRORS:MetricsShard.HISTOGRAM]),
+                'duration': round(duration, 3),
+                'eps': round(received['packets'] / duration, 1),
+                'bytes_per_second': round(received['bytes'] / duration, 1),
+                'cpu_cores': round(cpu_time / duration, 2),
+                'eps_per_core': round(received['packets'] / cpu_time, 1) if cpu_time else 0.0,
+            }
+            results.append(result)
+            print(f"   ✅ {mode}: {result['eps']:,.0f} 로그/초, 손실 {result['loss_percent']}%", file=sys.stderr)
+    finally:
+        parent.send(('stop', None))
+        sink.join(timeout=5)
+        if options['corpus']:
+            shutil.rmtree(os.path.dirname(options['corpus']), ignore_errors=True)
+    
+    if output_format == 'json':
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+    else:
+        print_benchmark_table(results)
+    return results
+
+def print_benchmark_table(results: List[Dict[str, Any]]):
+    """벤치마크 결과를 표로 출력합니다."""
+    # 한글은 터미널에서 두 칸을 차지해 정렬이 어긋나므로 열 이름은 영문으로 표기
+    header = f"{'mode':<14}{'sent':>11}{'received':>11}{'loss%':>9}{'reorder':>8}{'EPS':>12}{'MB/s':>9}{'cores':>9}{'EPS/core':>11}"
+    print("\n📈 벤치마크 결과:")
+    print(header)
+    print("-" * 94)
+    for result in results:
+        print(f"{result['mode']:<14}{result['sent']:>11,}{result['received']:>11,}{result['loss_percent']:>9.2f}"
+              f"{result['reordered']:>8}{result['eps']:>12,.0f}{result['bytes_per_second']/1024/1024:>9.1f}"
+              f"{result['cpu_cores']:>9.2f}{result['eps_per_core']:>11,.0f}")
+
+CONTROL_PORT = 5140  # 분산 부하 생성의 에이전트 제어 포트 기본값
+
+# 에이전트가 코디네이터의 plan에서 받아들이는 송신 설정 (그 밖의 키는 무시)
+# 파일 경로(tls_ca)와 프로파일 설정은 에이전트 자신의 명령행 값을 씀
+AGENT_OPTIONS = ('target_host', 'target_port', 'use_sendmmsg', 'generator', 'transport', 'connections', 'framing',
+                 'tls_insecure', 'sequence', 'log_format', 'scenario', 'seed', 'payload', 'pack', 'mtu',
+                 'drain_timeout', 'clock_tick', 'timestamp_precision')
+
+class ControlChannel:
+    """코디네이터와 에이전트 사이의 제어 채널 (TCP 위의 JSON-lines 메시지).
+    
+    메시지는 {"type": ...} 딕셔너리 한 줄입니다:
+      코디네이터 → 에이전트: hello(공유 토큰), plan(시작 시각, 송신 설정, 실행 계획), stop
+      에이전트 → 코디네이터: hello(에이전트 시계), error(인증 실패), ready, stats(초당 누적 카운터), done(최종 결과)
+    """
+    
+    def __init__(self, sock: socket.socket):
+        self.socket = sock
+        self.reader = sock.makefile('rb')
+        self.lock = threading.Lock()
+    
+    def send(self, message_type: str, **fields):
+        """메시지 한 줄을 전송합니다 (여러 쓰레드에서 호출 가능)."""
+        data = json.dumps({'type': message_type, **fields}, ensure_ascii=False).encode('utf-8') + b'\n'
+        with self.lock:
+            self.socket.sendall(data)
+    
+    def receive(self) -> Optional[Dict[str, Any]]:
+        """메시지 한 줄을 읽습니다. 연결이 끊기면 None을 반환합니다."""
+        line = self.reader.readline()
+        if not line:
+            return None
+        return json.loads(line)
+    
+    def expect(self, message_type: str) -> Dict[str, Any]:
+        """지정한 종류의 메시지를 읽습니다. 다른 메시지가 오면 ValueError를 발생시킵니다."""
+        message = self.receive()
+        if not message or message.get('type') != message_type:
+            raise ValueError(f"{message_type} 메시지를 기대했지만 {message and message.get('type')}을(를) 받았습니다")
+        return message
+    
+    def close(self):
+        """채널을 닫습니다."""
+        try:
+            self.reader.close()
+        finally:
+            self.socket.close()
+
+class _AgentLink:
+    """코디네이터가 관리하는 에이전트 연결과 보고 받은 초당 누적 카운터"""
+    
+    def __init__(self, agent: Destination, channel: ControlChannel, hello: Dict[str, Any], rtt: float, offset: float):
+        self.agent = agent
+        self.channel = channel
+        self.hostname = hello.get('hostname', '')
+        self.cpus = hello.get('cpus')
+        self.rtt = rtt
+        self.offset = offset  # 에이전트 시계 - 코디네이터 시계 (초)
+        self.timeline: List[Tuple[int, int, int]] = []  # 초별 누적 (패킷, 바이트, 오류)
+        self.result: Optional[Dict[str, Any]] = None
+    
+    def at(self, second: int) -> Tuple[int, int, int]:
+        """second초 시점의 누적 카운터 (보고가 끝난 에이전트는 마지막 값 유지)"""
+        if second <= 0 or not self.timeline:
+            return 0, 0, 0
+        return self.timeline[min(second, len(self.timeline)) - 1]
+    
+    def __str__(self):
+        return str(self.agent)
+
+def _read_agent(index: int, channel: ControlChannel, events: queue.Queue):
+    """에이전트 메시지를 읽어 코디네이터 큐에 넣습니다. 연결이 끊기면 (index, None)을 넣습니다."""
+    while True:
+        try:
+            message = channel.receive()
+        except (OSError, ValueError):
+            message = None
+        events.put((index, message))
+        if message is None or message.get('type') == 'done':
+            return
+
+def _agent_counters(metrics: MetricsCollector) -> Dict[str, int]:
+    """에이전트가 보고하는 누적 카운터 (패킷, 바이트, 전송 오류)"""
+    totals = metrics.totals()
+    return {
+        'packets': totals[MetricsShard.PACKETS],
+        'bytes': totals[MetricsShard.BYTES],
+        'errors': sum(totals[MetricsShard.ERRORS:MetricsShard.ERRORS + len(TRACKED_ERRNOS) + 1]),
+    }
+
+def _serve_coordinator(channel: ControlChannel, token: str = None, tls_ca: str = None):
+    """코디네이터 한 곳의 실행 계획을 받아 전송하고, 초마다 누적 카운터를 보고합니다.
+    
+    token이 있으면 hello의 토큰이 같은 코디네이터만 받습니다. plan의 송신 설정은 AGENT_OPTIONS 키만 씁니다.
+    """
+    hello = channel.expect('hello')
+    if token and not hmac.compare_digest(str(hello.get('token') or '').encode(), token.encode()):
+        channel.send('error', message="에이전트 토큰이 일치하지 않습니다")
+        raise ValueError("코디네이터의 에이전트 토큰이 일치하지 않습니다")
+    channel.send('hello', time=time.time(), hostname=socket.gethostname(), cpus=os.cpu_count())
+    plan = channel.expect('plan')
+    
+    options = {key: value for key, value in plan['options'].items() if key in AGENT_OPTIONS}
+    sender = UTMLogSender(**options, tls_ca=tls_ca)
+    # 에이전트별 호스트명: RNG 스트림과 syslog 호스트명이 에이전트마다 달라짐
+    sender.hostname = plan['hostname']
+    sender.metrics = MetricsCollector(plan.get('interval', 1.0))
+    run = plan['run']
+    interval = sender.metrics.interval
+    sender.get_encoder(sender.hostname)  # 첫 구간이 인코더 초기화 시간만큼 밀리지 않도록 미리 생성
+    channel.send('ready')
+    
+    stopped = threading.Event()  # 코디네이터가 중단을 요청함
+    finished = threading.Event()
+    
+    def stop():
+        stopped.set()
+        sender.running = False
+    
+    def expire():
+        sender.running = False
+    
+    def watch_control():
+        # 코디네이터의 stop 메시지나 연결 종료 시 전송 중단
+        while not finished.is_set():
+            try:
+                message = channel.receive()
+            except (OSError, ValueError):
+                message = None
+            if message is None or message.get('type') == 'stop':
+                stop()
+                return
+    
+    def run_plan():
+        try:
+            rate = run.get('rate')
+            if stopped.is_set():
+                return
+            if run.get('processes'):
+                sender.send_bulk_logs_multi_process(run['count'], run['processes'])
+            elif run.get('threads'):
+                sender.send_bulk_logs_multi_thread(run['count'], run['threads'])
+            elif run.get('count') is not None:
+                sender.send_bulk_logs(run['count'], rate=rate, max_speed=not rate)
+            else:
+                sender.continuous_sending(rate=rate, max_speed=not rate)
+        except Exception as e:
+            print(f"❌ 실행 계획 오류: {e}")
+        finally:
+            finished.set()
+    
+    threading.Thread(target=watch_control, daemon=True).start()
+    
+    # 코디네이터가 이 에이전트의 시계 기준으로 계산해 보낸 시작 시각까지 대기
+    delay = plan['start_at'] - time.time()
+    print(f"⏳ {max(delay, 0):.2f}초 후 시작합니다: {json.dumps(run, ensure_ascii=False)}")
+    if delay > 0:
+        time.sleep(delay)
+    start_lag = time.time() - plan['start_at']
+    start = time.monotonic()
+    
+    runner = threading.Thread(target=run_plan)
+    runner.start()
+    timer = None
+    if run.get('duration'):
+        timer = threading.Timer(run['duration'], expire)
+        timer.daemon = True
+        timer.start()
+    
+    second = 0
+    try:
+        # 시작 시각 기준 절대 시각마다 누적 카운터 보고 (에이전트 간 초 구간이 일치)
+        while not finished.wait(max(start + (second + 1) * interval - time.monotonic(), 0)):
+            second += 1
+            channel.send('stats', second=second, **_agent_counters(sender.metrics))
+    except OSError:
+        stop()
+        runner.join()
+        raise
+    finally:
+        if timer:
+            timer.cancel()
+    runner.join()
+    
+    elapsed = time.monotonic() - start
+    channel.send('done', second=second + 1, elapsed=elapsed, start_lag=start_lag, stopped=stopped.is_set(),
+                 p99=sender.metrics.latency_percentile(99), **_agent_counters(sender.metrics))
+    print(f"📤 코디네이터에 결과를 보고했습니다 ({elapsed:.2f}초, 시작 오차 {start_lag * 1000:+.1f}ms)")
+
+def run_agent(host: str = '127.0.0.1', port: int = CONTROL_PORT, token: str = None, tls_ca: str = None):
+    """에이전트 모드: 코디네이터의 접속을 기다렸다가 받은 실행 계획대로 전송합니다 (Ctrl+C까지 반복).
+    
+    기본은 로컬 주소에서만 받습니다. 다른 호스트의 코디네이터를 받으려면 host를 지정하고 token을 함께 씁니다.
+    """
+    server = socket.create_server((host, port))
+    print(f"🛰️  에이전트가 {host}:{port}에서 코디네이터 접속을 기다립니다... (중단: Ctrl+C)")
+    if not token and not ipaddress.ip_address(socket.gethostbyname(host)).is_loopback:
+        print("⚠️  --agent-token 없이 외부 주소에서 대기합니다. 접속하는 누구나 부하 전송을 지시할 수 있습니다.")
+    try:
+        while True:
+            connection, address = server.accept()
+            print(f"🔗 코디네이터 접속: {address[0]}:{address[1]}")
+            channel = ControlChannel(connection)
+            try:
+                _serve_coordinator(channel, token, tls_ca)
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                print(f"❌ 제어 채널 오류: {e}")
+            finally:
+                channel.close()
+    except KeyboardInterrupt:
+        print("\n👋 에이전트를 종료합니다.")
+    finally:
+        server.close()
+
+def print_profile(sender: 'UTMLogSender', path: str):
+    """이 프로세스와 워커 프로세스의 프로파일 결과를 합쳐 단계별 비용을 출력하고 collapsed-stack 파일로 저장합니다."""
+    sender.profiler.stop()
+    snapshot = StageProfiler.merge([sender.profiler.snapshot()] + sender.profile_snapshots)
+    StageProfiler.print_report(snapshot)
+    if not snapshot['samples']:
+        return
+    try:
+        samples = StageProfiler.write_collapsed(snapshot, path)
+    except OSError as e:
+        print(f"❌ 프로파일 파일을 저장할 수 없습니다: {e}")
+        return
+    print(f"🔥 스택 샘플 {samples}개를 저장했습니다: {path} (예: flamegraph.pl {path} > profile.svg)")
 
 def create_env_file():
     """환경변수 설정 파일을 생성합니다."""
@@ -494,15 +5198,117 @@ def main():
     parser.add_argument("--port", type=int, help="대상 포트 (.env 파일의 TARGET_PORT보다 우선)")
     parser.add_argument("--count", type=int, help="전송할 로그 개수")
     parser.add_argument("--delay", type=float, help="로그 간격 (초)")
-    parser.add_argument("--increase-rate", type=float, default=1.0, help="전송량 증가율 (기본값: 1.0, 증가 없음)")
+    parser.add_argument("--increase-rate", type=float, default=1.0, help="전송량 증가율 (기본값: 1.0, 증가 없음). --ramp-profile 사용 권장")
+    parser.add_argument("--rate", type=float, help="목표 전송 속도 (EPS, 토큰 버킷 페이싱. --delay보다 우선)")
+    parser.add_argument("--ramp-profile", help="램프 프로파일 파일 (JSON/YAML/TOML: linear, step, exponential)")
+    parser.add_argument("--workload", metavar="FILE",
+                        help="단계별 워크로드 파일 (JSON/YAML/TOML: duration, rate, events, payload, destinations)")
+    parser.add_argument("--adaptive", action="store_true",
+                        help="적응형 AIMD 속도 제어로 최대 지속 가능 EPS(knee point) 탐색 (--rate: 시작 속도)")
+    parser.add_argument("--feedback-url",
+                        help="적응형 모드의 수신 측 누적 카운터 HTTP 엔드포인트 (JSON 또는 Prometheus 텍스트)")
+    parser.add_argument("--feedback-metric", default="messages",
+                        help="피드백 엔드포인트의 카운터 이름 (JSON 키 경로 또는 Prometheus 지표, 기본값: messages)")
+    parser.add_argument("--aimd-step", type=float, default=1000.0, help="적응형 모드의 구간당 속도 증가량 (EPS, 기본값: 1000)")
+    parser.add_argument("--aimd-decrease", type=float, default=0.5, help="적응형 모드의 손실 시 속도 감소 배수 (기본값: 0.5)")
+    parser.add_argument("--loss-threshold", type=float, default=0.01, help="적응형 모드의 허용 손실률 (기본값: 0.01)")
+    parser.add_argument("--probes", type=int, default=5, help="적응형 모드의 종료 전 속도 감소 횟수 (기본값: 5)")
     parser.add_argument("--continuous", action="store_true", help="연속 전송 모드")
+    parser.add_argument("--drain-timeout", type=float, default=5.0,
+                        help="SIGINT/SIGTERM 후 진행 중인 배치를 마칠 때까지 기다리는 최대 시간 (초, 기본값: 5)")
     parser.add_argument("--max-speed", action="store_true", help="최대 속도로 전송 (delay/increase-rate 무시)")
     parser.add_argument("--multi-thread", action="store_true", help="멀티쓰레드 모드 사용")
     parser.add_argument("--threads", type=int, default=4, help="멀티쓰레드 모드에서 사용할 쓰레드 수 (기본값: 4)")
+    parser.add_argument("--processes", type=int, help="멀티프로세스 모드에서 사용할 프로세스 수 (지정 시 멀티프로세스 모드)")
+    parser.add_argument("--pipeline", action="store_true",
+                        help="생성 워커와 전송 워커를 공유 메모리 링 버퍼로 분리한 파이프라인 모드 (최대 속도)")
+    parser.add_argument("--generators", type=int, default=2, help="파이프라인 모드의 생성 워커 프로세스 수 (기본값: 2)")
+    parser.add_argument("--senders", type=int, default=1, help="파이프라인 모드의 전송 워커 프로세스 수 (기본값: 1)")
+    parser.add_argument("--ring-size", type=float, default=8.0, help="파이프라인 모드의 생성 워커당 링 버퍼 크기 (MB, 기본값: 8)")
+    parser.add_argument("--seed", type=int,
+                        help="기본 RNG 시드 (워커별 RNG 스트림을 파생, 같은 시드/워커 수/개수면 같은 이벤트 스트림, 기본값: 임의)")
+    parser.add_argument("--generator", choices=GENERATOR_MODES, default="dict",
+                        help="이벤트 생성 방식 (dict: 이벤트별 dict 생성 후 형식 템플릿으로 인코딩, template: 사전 렌더링 템플릿, "
+                             "numpy: NumPy 벡터화 배치 생성, session: 상태 기반 세션/흐름 모델, 기본값: dict)")
+    parser.add_argument("--sessions", type=int, default=10000, help="session 모드의 라이브 세션 풀 크기 (기본값: 10000)")
+    parser.add_argument("--hosts", type=int, default=1000, help="session 모드의 출발지 호스트 수 (기본값: 1000)")
+    parser.add_argument("--dest-hosts", type=int, default=5000, help="session 모드의 목적지 호스트 수 (기본값: 5000)")
+    parser.add_argument("--users", type=int, default=100, help="session 모드의 사용자 수 (기본값: 100)")
+    parser.add_argument("--zipf-skew", type=float, default=1.1,
+                        help="session 모드의 호스트/사용자/포트 Zipf 분포 기울기 (0: 균등, 기본값: 1.1)")
+    parser.add_argument("--session-length", type=float, default=8.0,
+                        help="session 모드의 세션당 평균 중간 이벤트 수 (기본값: 8)")
+    parser.add_argument("--format", choices=list(FORMATTERS), default="rfc3164-json", dest="log_format",
+                        help="출력 형식 (rfc3164-json: RFC 3164 + JSON, rfc5424: 구조화 데이터, cef, leef, "
+                             "kv: FortiGate 스타일 key=value, 기본값: rfc3164-json)")
+    parser.add_argument("--clock-tick", type=float, default=0.001,
+                        help="이벤트 타임스탬프 갱신 간격 (초, 시각 문자열을 tick마다 한 번만 렌더링, 기본값: 0.001)")
+    parser.add_argument("--timestamp-precision", choices=CachedClock.TIMESPECS, default="microseconds",
+                        help="ISO 8601 타임스탬프 소수 자릿수 (milliseconds/seconds는 명시적으로 선택, 기본값: microseconds)")
+    parser.add_argument("--no-sendmmsg", action="store_true", help="sendmmsg 배치 전송 대신 패킷별 send() 사용")
+    parser.add_argument("--transport", choices=TRANSPORTS, default="udp", help="전송 프로토콜 (기본값: udp)")
+    parser.add_argument("--connections", type=int, default=4, help="TCP/TLS 연결 풀 크기 (기본값: 4)")
+    parser.add_argument("--framing", choices=FRAMINGS, default="octet",
+                        help="TCP/TLS 프레이밍 (RFC 6587 octet-counting 또는 newline, 기본값: octet)")
+    parser.add_argument("--tls-ca", help="TLS 서버 인증서 검증용 CA 파일")
+    parser.add_argument("--tls-insecure", action="store_true", help="TLS 서버 인증서 검증 생략")
+    parser.add_argument("--destination", action="append", metavar="HOST:PORT[:WEIGHT[:RATE]]",
+                        help="비동기 다중 목적지 모드의 목적지 (여러 번 지정 가능, 지정 시 asyncio 모드)")
+    parser.add_argument("--generate", metavar="FILE", help="--count개의 syslog 데이터그램을 재생용 코퍼스 파일로 생성")
+    parser.add_argument("--replay", metavar="FILE", help="코퍼스 파일을 mmap으로 재생 (재인코딩 없음)")
+    parser.add_argument("--replay-loops", type=int, default=1, help="코퍼스 재생 횟수 (0: 무한 반복, 기본값: 1)")
+    parser.add_argument("--rewrite-timestamp", action="store_true", help="재생 시 syslog 타임스탬프를 현재 시각으로 갱신")
+    parser.add_argument("--metrics-port", type=int, help="Prometheus 형식 지표 HTTP 엔드포인트 포트 (/metrics)")
+    parser.add_argument("--metrics-listen", default="127.0.0.1",
+                        help="지표/수신 통계 HTTP 엔드포인트의 바인드 주소 (기본값: 127.0.0.1)")
+    parser.add_argument("--stats-file", help="구간별 통계를 JSON-lines로 기록할 파일")
+    parser.add_argument("--stats-interval", type=float, default=1.0, help="지표 집계 구간 (초, 기본값: 1.0)")
+    parser.add_argument("--sink", action="store_true", help="내장 UDP 수신기 모드 (--listen:--port에서 수신, 손실/순서 검출)")
+    parser.add_argument("--listen", help="수신기/에이전트 모드의 바인드 주소 (기본값: 수신기 0.0.0.0, 에이전트 127.0.0.1)")
+    parser.add_argument("--sequence", action="store_true", help="데이터그램에 손실 검출용 일련번호 필드(seq) 추가 (JSON은 \"seq\" 키, RFC 5424는 구조화 데이터)")
+    parser.add_argument("--payload-size", metavar="SPEC",
+                        help="메시지 크기 분포 (1400, 200-8192, normal:평균[:표준편차[:최소:최대]], uniform:A:B, fixed:N)")
+    parser.add_argument("--pack", action="store_true", help="여러 syslog 줄을 MTU 이하의 UDP 데이터그램 하나로 묶어 전송")
+    parser.add_argument("--mtu", type=int, default=1500, help="묶음 크기와 IP 단편화 판단 기준 MTU (점보 프레임: 9000, 기본값: 1500)")
+    parser.add_argument("--profile", action="store_true",
+                        help="단계별 비용(ns/이벤트)을 측정하고 호출 스택 샘플을 collapsed-stack 파일로 저장 (모든 로컬 전송 모드)")
+    parser.add_argument("--profile-file", default="utm_profile.folded",
+                        help="프로파일 샘플을 저장할 collapsed-stack 파일 (flamegraph.pl/speedscope 입력, 기본값: utm_profile.folded)")
+    parser.add_argument("--profile-interval", type=float, default=0.005,
+                        help="프로파일 스택 샘플링 간격 (초, 0: 샘플링 없이 단계 타이머만, 기본값: 0.005)")
+    parser.add_argument("--bench", action="store_true", help="내장 수신기로 모든 전송 모드를 종단 간 벤치마크")
+    parser.add_argument("--bench-modes", help=f"벤치마크할 모드 (쉼표 구분, 기본값: 전체 = {','.join(BENCH_MODES)})")
+    parser.add_argument("--bench-format", choices=["table", "json"], default="table", help="벤치마크 결과 형식 (기본값: table)")
+    parser.add_argument("--agent", action="store_true",
+                        help="분산 부하 생성 에이전트 모드 (--listen:--control-port에서 코디네이터 접속 대기)")
+    parser.add_argument("--control-port", type=int, default=CONTROL_PORT,
+                        help=f"에이전트 제어 포트 (기본값: {CONTROL_PORT})")
+    parser.add_argument("--agent-token", default=os.getenv('UTM_AGENT_TOKEN'),
+                        help="에이전트와 코디네이터의 공유 토큰 (hello에서 확인, 기본값: 환경변수 UTM_AGENT_TOKEN)")
+    parser.add_argument("--coordinator", action="append", metavar="AGENT_HOST:PORT[:WEIGHT]",
+                        help="코디네이터 모드: 지정한 에이전트들로 분산 전송 (여러 번 지정, count/rate는 가중치 비율로 분배)")
+    parser.add_argument("--duration", type=float, help="코디네이터 모드의 전송 시간 (초)")
+    parser.add_argument("--start-delay", type=float, default=2.0, help="코디네이터 모드의 동시 시작 대기 시간 (초, 기본값: 2.0)")
+    parser.add_argument("--report-file", help="코디네이터 모드의 병합 결과(에이전트별, 초별)를 저장할 JSON 파일")
     parser.add_argument("--create-env", action="store_true", help=".env 파일 생성")
     
     args = parser.parse_args()
     
+    # 조용히 무시되는 옵션 조합은 시작 전에 거부
+    if args.destination and args.transport != 'udp':
+        parser.error("--destination(asyncio 다중 목적지 모드)은 UDP 전송만 지원합니다 (--transport udp)")
+    if args.adaptive:
+        # 적응형 제어기는 단일 쓰레드 전송(send_bulk_logs/continuous_sending)의 페이싱에만 연결됨
+        other_modes = [option for option, used in (
+            ("--multi-thread", args.multi_thread), ("--processes", args.processes), ("--pipeline", args.pipeline),
+            ("--destination", args.destination), ("--coordinator", args.coordinator), ("--workload", args.workload),
+            ("--generate", args.generate), ("--replay", args.replay)) if used]
+        if other_modes:
+            parser.error(f"--adaptive는 단일 쓰레드 전송에서만 사용할 수 있습니다 ({', '.join(other_modes)}와 함께 사용 불가)")
+    if args.coordinator and args.rate and (args.multi_thread or args.processes):
+        # 에이전트의 멀티쓰레드/멀티프로세스 모드는 최대 속도로만 전송
+        parser.error("--coordinator의 --rate는 에이전트의 --multi-thread/--processes 모드와 함께 사용할 수 없습니다")
+    
     # .env 파일 생성 옵션
     if args.create_env:
         create_env_file()
@@ -518,19 +5324,181 @@ def main():
     delay = args.delay or default_delay
     increase_rate = args.increase_rate if args.increase_rate != 1.0 else default_increase_rate
     
-    sender = UTMLogSender(args.host, args.port)
+    if args.sink:
+        # 내장 수신기 모드
+        try:
+            sink = UDPSink(args.listen or '0.0.0.0', args.port or int(os.getenv('TARGET_PORT', '514')))
+        except OSError as e:
+            print(f"❌ 수신기 소켓 바인드 실패: {e}")
+            sys.exit(1)
+        sink.serve(args.stats_interval, http_port=args.metrics_port, http_host=args.metrics_listen)
+        return
+    
+    if args.agent:
+        # 분산 부하 생성 에이전트 모드
+        try:
+            run_agent(args.listen or '127.0.0.1', args.control_port, args.agent_token, args.tls_ca)
+        except OSError as e:
+            print(f"❌ 제어 포트 바인드 실패: {e}")
+            sys.exit(1)
+        return
+    
+    if args.bench:
+        # 종단 간 벤치마크 모드 (모드당 --count개, 기본값 200,000개)
+        try:
+            run_benchmark(args.count or 200000, args.bench_modes.split(',') if args.bench_modes else None,
+                          args.bench_format, args.threads, args.processes, args.seed, not args.no_sendmmsg,
+                          args.log_format)
+        except ValueError as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+        except KeyboardInterrupt:
+            print("\n⏹️  사용자에 의해 중단되었습니다.")
+        return
+    
+    ramp_profile = None
+    if args.ramp_profile:
+        try:
+            ramp_profile = RateProfile.load(args.ramp_profile)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"❌ 램프 프로파일을 읽을 수 없습니다: {e}")
+            sys.exit(1)
+    
+    if args.adaptive:
+        # 적응형 속도 제어기는 램프 프로파일 자리에 연결 (send_bulk_logs/continuous_sending의 토큰 버킷)
+        try:
+            ramp_profile = AdaptiveRateController(
+                args.rate or 1000.0, args.aimd_step, args.aimd_decrease, args.loss_threshold, args.stats_interval,
+                args.probes, feedback=HttpCounterFeedback(args.feedback_url, args.feedback_metric) if args.feedback_url else None)
+        except ValueError as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+    
+    if args.mtu <= DatagramPacker.HEADER_SIZE + 64:
+        print(f"❌ MTU가 너무 작습니다: {args.mtu}")
+        sys.exit(1)
+    payload = None
+    if args.payload_size:
+        try:
+            payload = PayloadSizer.parse(args.payload_size)
+            # 분포 인자 검증: 크기는 UDP 최대 페이로드(--pack이면 MTU 묶음 크기) 이하, 일련번호 필드 자리는 남김
+            reserve = 40 if args.sequence else 0
+            limit = DatagramPacker.for_mtu(args.mtu, reserve).max_size if args.pack else PayloadSizer.MAX_DATAGRAM - reserve
+            PayloadSizer.from_dict(payload, limit=limit)
+            if payload["distribution"] == "normal":
+                # 정규 분포 꼬리도 같은 한도에서 자르도록 max를 고정
+                payload.setdefault("max", limit)
+        except ValueError as e:
+            print(f"❌ {e}" + (f" (--pack: MTU {args.mtu} 기준 묶음 크기)" if args.pack else ""))
+            sys.exit(1)
+    if not args.clock_tick > 0:
+        print(f"❌ 시계 tick은 0보다 커야 합니다: {args.clock_tick}")
+        sys.exit(1)
+    if args.profile and args.profile_interval < 0:
+        print(f"❌ 프로파일 샘플링 간격은 0 이상이어야 합니다: {args.profile_interval}")
+        sys.exit(1)
+    if args.pipeline and (args.generators < 1 or args.senders < 1 or args.ring_size < 1):
+        print("❌ 파이프라인 모드의 --generators/--senders는 1 이상, --ring-size는 1MB 이상이어야 합니다.")
+        sys.exit(1)
+    
+    workload = None
+    if args.workload:
+        try:
+            workload = Workload.load(args.workload)
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"❌ 워크로드 파일을 읽을 수 없습니다: {e}")
+            sys.exit(1)
+    
+    sender = UTMLogSender(args.host, args.port, use_sendmmsg=not args.no_sendmmsg, generator=args.generator,
+                          transport=args.transport, connections=args.connections, framing=args.framing,
+                          tls_insecure=args.tls_insecure, tls_ca=args.tls_ca, sequence=args.sequence,
+                          log_format=args.log_format,
+                          scenario={'sessions': args.sessions, 'hosts': args.hosts, 'dest_hosts': args.dest_hosts,
+                                    'users': args.users, 'skew': args.zipf_skew, 'session_length': args.session_length},
+                          seed=args.seed, payload=payload, pack=args.pack, mtu=args.mtu,
+                          drain_timeout=args.drain_timeout, clock_tick=args.clock_tick,
+                          profile_interval=args.profile_interval if args.profile else None,
+                          timestamp_precision=args.timestamp_precision)
+    
+    if args.adaptive:
+        ramp_profile.attach(sender)
+    
+    if args.metrics_port or args.stats_file:
+        sender.metrics = MetricsCollector(args.stats_interval, args.metrics_port, args.stats_file, args.metrics_listen)
+        try:
+            sender.metrics.start()
+        except OSError as e:
+            print(f"❌ 지표 수집기를 시작할 수 없습니다: {e}")
+            sys.exit(1)
+    
+    if not args.replay:
+        print(f"🎲 시드: {sender.seed} (같은 시드로 다시 실행하면 같은 이벤트 스트림 생성)")
     
+    # Ctrl+C/SIGTERM은 중단 플래그만 세우고, 각 모드가 진행 중인 배치를 마친 뒤 부분 합계를 보고
+    sender.controller.install_signal_handlers()
+    if sender.profiler:
+        sender.profiler.start(sender.hostname)
     try:
-        if args.multi_thread:
+        if args.generate:
+            # 코퍼스 생성 모드
+            sender.generate_corpus(args.generate, count)
+        elif args.replay:
+            # 코퍼스 재생 모드
+            sender.replay_corpus(args.replay, 0 if args.continuous else args.replay_loops,
+                                 args.rewrite_timestamp, args.rate)
+        elif workload:
+            # 단계별 워크로드 모드
+            sender.run_workload(workload)
+        elif args.coordinator:
+            # 분산 부하 생성 코디네이터 모드
+            try:
+                agents = [Destination.parse(spec) for spec in args.coordinator]
+            except ValueError as e:
+                print(f"❌ {e}")
+                sys.exit(1)
+            # --duration/--continuous만 지정하면 개수 제한 없이 시간/중단 기준으로 전송
+            agent_count = args.count or (None if args.continuous or args.duration else count)
+            sender.coordinate_agents(agents, agent_count, args.duration, args.rate,
+                                     args.threads if args.multi_thread else None, args.processes,
+                                     args.start_delay, args.stats_interval, args.report_file, args.agent_token)
+        elif args.destination:
+            # asyncio 다중 목적지 모드
+            try:
+                destinations = [Destination.parse(spec) for spec in args.destination]
+            except ValueError as e:
+                print(f"❌ {e}")
+                sys.exit(1)
+            sender.send_async_multi_destination(destinations, None if args.continuous else count, args.rate)
+        elif args.pipeline:
+            # 생성/전송 분리 파이프라인 모드
+            sender.send_bulk_logs_pipeline(None if args.continuous else count, args.generators, args.senders,
+                                           int(args.ring_size * 1024 * 1024))
+        elif args.processes:
+            # 멀티프로세스 모드
+            sender.send_bulk_logs_multi_process(count, args.processes)
+        elif args.multi_thread:
             # 멀티쓰레드 모드
             sender.send_bulk_logs_multi_thread(count, args.threads, args.max_speed)
-        elif args.continuous:
-            sender.continuous_sending(delay, increase_rate, args.max_speed)
+        elif args.continuous or args.adaptive:
+            # 적응형 모드는 --count가 없으면 knee point를 찾을 때까지 연속 전송
+            if args.adaptive and args.count:
+                sender.send_bulk_logs(count, delay, increase_rate, False, args.rate, ramp_profile)
+            else:
+                sender.continuous_sending(delay, increase_rate, args.max_speed and not args.adaptive, args.rate, ramp_profile)
         else:
-            sender.send_bulk_logs(count, delay, increase_rate, args.max_speed)
+            sender.send_bulk_logs(count, delay, increase_rate, args.max_speed, args.rate, ramp_profile)
     except KeyboardInterrupt:
         print("\n👋 프로그램을 종료합니다.")
         sys.exit(0)
+    finally:
+        sender.controller.restore_signal_handlers()
+        if sender.profiler:
+            print_profile(sender, args.profile_file)
+        if args.adaptive:
+            ramp_profile.print_report()
+        if sender.metrics:
+            sender.metrics.stop()
+            sender.metrics.print_summary()
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file